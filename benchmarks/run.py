@@ -0,0 +1,371 @@
+"""Benchmarks for the mock's generation, batching and delivery hot paths.
+
+Run from the repository root with the service package installed::
+
+    python benchmarks/run.py                          # print results
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+Every metric records whether higher or lower values are better. ``--compare``
+reports each metric against the baseline and exits with status 1 when any of
+them is worse by more than ``--tolerance``. Timings take the lowest CPU time of
+several repeats, and peak memory is measured in a fresh subprocess per corpus size, so
+the numbers are reproducible enough to compare runs on the same machine.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from scrapper_service import CorpusSpec, ScrapperManager, SyntheticCorpus
+from scrapper_service.columnar import JobBatch
+from scrapper_service.descriptions import LENGTH_DISTRIBUTIONS, DescriptionGenerator
+from scrapper_service.jobs_data import get_mock_jobs, get_mock_jobs_as_dicts, job_from_dict
+from scrapper_service.loadtest import peak_rss_kib
+from scrapper_service.providers import MERGE_MODES, FanOut, uniform_providers
+
+BASELINE_VERSION = 1
+DEFAULT_TOLERANCE = 0.15
+BATCH_SIZES = (1, 10, 50, 500, 5000)
+MEMORY_CORPUS_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_MEMORY_CORPUS_SIZES = (10_000, 100_000)
+REPRESENTATION_JOBS = 20_000
+FANOUT_PROVIDERS = (1, 4, 16)
+DESCRIPTION_BATCH = 4096
+
+
+@dataclass
+class Metric:
+    """A single benchmark result.
+
+    Attributes:
+        name: Stable identifier used to match metrics across runs.
+        value: Measured value.
+        unit: Unit of ``value``, for display only.
+        higher_is_better: Direction in which ``value`` improves.
+    """
+
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def best_of(repeats: int, func: Callable[[], Any]) -> float:
+    """Return the lowest CPU time of ``repeats`` calls to ``func``, after a warm-up.
+
+    The benchmarks are single-threaded, and CPU time is far less sensitive than
+    wall-clock time to other load on the machine.
+    """
+    func()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.process_time()
+        func()
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def bench_mock_jobs(repeats: int) -> List[Metric]:
+    """Cost per job of building the canonical listings as dicts and as `Job` objects."""
+    count = len(get_mock_jobs_as_dicts())
+    rounds = 20
+    as_dicts = best_of(repeats, lambda: [get_mock_jobs_as_dicts() for _ in range(rounds)])
+    as_jobs = best_of(repeats, lambda: [get_mock_jobs() for _ in range(rounds)])
+    per_round = rounds * count
+    return [
+        Metric("mock_jobs.dicts_us_per_job", as_dicts / per_round * 1e6, "us", False),
+        Metric("mock_jobs.jobs_us_per_job", as_jobs / per_round * 1e6, "us", False),
+    ]
+
+
+def bench_batching(corpus_size: int, repeats: int) -> List[Metric]:
+    """Throughput of `scrape_jobs` into a no-op sink across batch sizes.
+
+    The relative cost of each batch size is its time divided by the time to
+    iterate the same jobs without batching at all, so 1.0 means no overhead.
+    """
+    manager = ScrapperManager(SyntheticCorpus(CorpusSpec(size=corpus_size)), streaming=True)
+
+    def drain() -> None:
+        for _ in manager.iter_jobs():
+            pass
+
+    unbatched = best_of(repeats, drain)
+    metrics = [Metric("batching.unbatched_jobs_per_s", corpus_size / unbatched, "jobs/s", True)]
+    for batch_size in BATCH_SIZES:
+        elapsed = best_of(
+            repeats,
+            partial(manager.scrape_jobs, {}, batch_size=batch_size, on_jobs_batch=_no_op),
+        )
+        metrics.append(
+            Metric(f"batching.b{batch_size}_jobs_per_s", corpus_size / elapsed, "jobs/s", True)
+        )
+        metrics.append(
+            Metric(f"batching.b{batch_size}_relative_cost", elapsed / unbatched, "x", False)
+        )
+    return metrics
+
+
+def bench_end_to_end(corpus_size: int, repeats: int) -> List[Metric]:
+    """Jobs per second from `scrape_jobs` into a no-op ``on_jobs_batch``, both modes."""
+    corpus = SyntheticCorpus(CorpusSpec(size=corpus_size))
+    metrics = []
+    for mode, streaming in (("eager", False), ("streaming", True)):
+        manager = ScrapperManager(corpus, streaming=streaming)
+        elapsed = best_of(
+            repeats, partial(manager.scrape_jobs, {}, batch_size=50, on_jobs_batch=_no_op)
+        )
+        metrics.append(
+            Metric(f"end_to_end.{mode}_jobs_per_s", corpus_size / elapsed, "jobs/s", True)
+        )
+    return metrics
+
+
+def bench_representation(count: int, repeats: int) -> List[Metric]:
+    """Bytes per job of a held result set as dicts, `Job` objects and a `JobBatch`.
+
+    Each representation is built from freshly rendered corpus rows and measured
+    with `tracemalloc` once the intermediate dicts are gone. Strings the corpus
+    renderer already caches (descriptions, titles) are shared by all three and
+    not counted for any of them.
+    """
+    corpus = SyntheticCorpus(CorpusSpec(size=count))
+    columns = corpus.all_columns()
+    rows = range(count)
+    corpus.dicts(columns, rows)
+
+    def held_bytes(build: Callable[[], Any]) -> float:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            held = build()
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del held
+        return size / count
+
+    batch = JobBatch.from_dicts(corpus.dicts(columns, rows))
+    lazy = best_of(repeats, lambda: list(batch))
+    return [
+        Metric(
+            "representation.dicts_bytes_per_job",
+            held_bytes(lambda: corpus.dicts(columns, rows)),
+            "B",
+            False,
+        ),
+        Metric(
+            "representation.jobs_bytes_per_job",
+            held_bytes(lambda: [job_from_dict(d) for d in corpus.dicts(columns, rows)]),
+            "B",
+            False,
+        ),
+        Metric(
+            "representation.columnar_bytes_per_job",
+            held_bytes(lambda: JobBatch.from_dicts(corpus.dicts(columns, rows))),
+            "B",
+            False,
+        ),
+        Metric("representation.lazy_job_us", lazy / count * 1e6, "us", False),
+    ]
+
+
+def bench_fanout(corpus_size: int, repeats: int) -> List[Metric]:
+    """Cost of merging provider streams as the number of providers grows.
+
+    Providers have no simulated latency, so the relative cost against a plain
+    streaming scrape of the same corpus is the overhead of paging, tagging,
+    queueing and merging. CPU time covers the provider threads as well.
+    """
+    corpus = SyntheticCorpus(CorpusSpec(size=corpus_size))
+    plain = ScrapperManager(corpus, streaming=True)
+    baseline = best_of(repeats, lambda: plain.scrape_jobs({}, batch_size=50, on_jobs_batch=_no_op))
+    metrics = []
+    for merge in MERGE_MODES:
+        for count in FANOUT_PROVIDERS:
+            fanout = FanOut(uniform_providers(count), merge=merge)
+            manager = ScrapperManager(corpus, streaming=True, fanout=fanout)
+            elapsed = best_of(
+                repeats, partial(manager.scrape_jobs, {}, batch_size=50, on_jobs_batch=_no_op)
+            )
+            fanout.shutdown()
+            name = f"fanout.{merge}_p{count}"
+            metrics.append(Metric(f"{name}_jobs_per_s", corpus_size / elapsed, "jobs/s", True))
+            metrics.append(Metric(f"{name}_relative_cost", elapsed / baseline, "x", False))
+    return metrics
+
+
+def bench_descriptions(repeats: int) -> List[Metric]:
+    """Megabytes of description text generated per minute for each length distribution."""
+    generator = DescriptionGenerator(seed=0)
+    metrics = []
+    for name, distribution in sorted(LENGTH_DISTRIBUTIONS.items()):
+        distribution.table()
+        texts = generator.sample(DESCRIPTION_BATCH, distribution, random.Random(0))
+        size = sum(len(text) for text in texts)
+        elapsed = best_of(
+            repeats,
+            lambda distribution=distribution: generator.sample(
+                DESCRIPTION_BATCH, distribution, random.Random(0)
+            ),
+        )
+        metrics.append(
+            Metric(f"descriptions.{name}_mb_per_min", size / elapsed * 60 / 1e6, "MB/min", True)
+        )
+    return metrics
+
+
+def bench_peak_memory(sizes: Sequence[int]) -> List[Metric]:
+    """Peak RSS of a full scrape at each corpus size, each in a fresh interpreter."""
+    metrics = []
+    for size in sizes:
+        for mode in ("eager", "streaming"):
+            peak_kib = _run_memory_probe(size, mode == "streaming")
+            metrics.append(Metric(f"memory.{mode}_{size}_peak_mib", peak_kib / 1024, "MiB", False))
+    return metrics
+
+
+def memory_probe(size: int, streaming: bool) -> None:
+    """Scrape a corpus of ``size`` jobs and print the peak RSS in KiB."""
+    manager = ScrapperManager(SyntheticCorpus(CorpusSpec(size=size)), streaming=streaming)
+    manager.scrape_jobs({}, batch_size=50, on_jobs_batch=_no_op)
+    peak_kib = peak_rss_kib()
+    if peak_kib is None:
+        raise SystemExit("Peak RSS is not available on this platform")
+    print(peak_kib)
+
+
+def run_all(quick: bool) -> List[Metric]:
+    repeats = 3 if quick else 5
+    corpus_size = 20_000 if quick else 100_000
+    metrics: List[Metric] = []
+    metrics += bench_mock_jobs(repeats)
+    metrics += bench_batching(corpus_size, repeats)
+    metrics += bench_end_to_end(corpus_size, repeats)
+    metrics += bench_representation(REPRESENTATION_JOBS, repeats)
+    metrics += bench_fanout(corpus_size, repeats)
+    metrics += bench_descriptions(repeats)
+    metrics += bench_peak_memory(QUICK_MEMORY_CORPUS_SIZES if quick else MEMORY_CORPUS_SIZES)
+    return metrics
+
+
+def compare(metrics: Sequence[Metric], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print a comparison table and return the names of regressed metrics."""
+    previous = {entry["name"]: entry for entry in baseline["metrics"]}
+    regressions = []
+    print(f"{'metric':<40} {'baseline':>14} {'current':>14} {'change':>9}")
+    for metric in metrics:
+        entry = previous.get(metric.name)
+        if entry is None:
+            print(f"{metric.name:<40} {'-':>14} {metric.value:>14.2f}      new")
+            continue
+        change = _relative_change(entry["value"], metric.value)
+        worse = -change if metric.higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(metric.name)
+        print(
+            f"{metric.name:<40} {entry['value']:>14.2f} {metric.value:>14.2f} "
+            f"{change * 100:>+8.1f}%{flag}"
+        )
+    return regressions
+
+
+def _relative_change(before: float, after: float) -> float:
+    if before == 0:
+        return 0.0 if after == 0 else float("inf") if after > 0 else float("-inf")
+    return (after - before) / abs(before)
+
+
+def _run_memory_probe(size: int, streaming: bool) -> int:
+    result = subprocess.run(
+        [sys.executable, __file__, "--memory-probe", str(size)]
+        + (["--streaming"] if streaming else []),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def _no_op(jobs: List[Any], is_last: bool) -> None:
+    pass
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scrapper mock benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpora and fewer repeats")
+    parser.add_argument("--save", type=Path, help="Write the results to this baseline file")
+    parser.add_argument("--compare", type=Path, help="Compare the results with this baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Relative slowdown tolerated before flagging a regression (default: "
+        f"{DEFAULT_TOLERANCE})",
+    )
+    parser.add_argument("--memory-probe", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--streaming", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.memory_probe is not None:
+        memory_probe(args.memory_probe, args.streaming)
+        return 0
+
+    metrics = run_all(args.quick)
+    results = {
+        "version": BASELINE_VERSION,
+        "quick": args.quick,
+        "environment": _environment(),
+        "metrics": [asdict(metric) for metric in metrics],
+    }
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("quick") != args.quick:
+            print("warning: baseline and current run use different --quick settings")
+        regressions = compare(metrics, baseline, args.tolerance)
+    else:
+        regressions = []
+        for metric in metrics:
+            print(f"{metric.name:<40} {metric.value:>14.2f} {metric.unit}")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved {len(metrics)} metrics to {args.save}")
+
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: "
+            + ", ".join(regressions)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,11 @@
 Mock scrapper service package that surfaces the contract-compatible manager.
 
 Importing the package exposes `ScrapperManager`, a stand-in implementation that
-delivers fabricated job listings for integration tests and demos.
+delivers fabricated job listings for integration tests and demos, together with
+`CorpusSpec` and `SyntheticCorpus` for generating large seeded corpora.
 """
 
+from .corpus import CorpusSpec, SyntheticCorpus
 from .manager import ScrapperManager
 
-__all__ = ["ScrapperManager"]
+__all__ = ["CorpusSpec", "ScrapperManager", "SyntheticCorpus"]
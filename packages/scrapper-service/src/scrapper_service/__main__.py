@@ -3,12 +3,26 @@
 import argparse
 import logging
 import sys
+from typing import Any
 
 from dotenv import load_dotenv
 
-from scrapper_messaging import ScrapperConsumer
-from scrapper_service.manager import ScrapperManager
-from telemetry import init_telemetry
+from scrapper_service.cache import DEFAULT_TTL_SECONDS
+from scrapper_service.changelog import EvolutionSpec
+from scrapper_service.corpus import SyntheticCorpus
+from scrapper_service.descriptions import LENGTH_DISTRIBUTIONS
+from scrapper_service.providers import MERGE_MODES
+from scrapper_service.shaping import NO_PROFILE, PROFILES
+from scrapper_service.snapshot import write_snapshot
+from scrapper_service.startup import prewarm_in_background, start_telemetry
+from scrapper_service.workers import (
+    WorkerConfig,
+    build_manager,
+    corpus_spec,
+    create_consumer,
+    run_workers,
+    start_reporting,
+)
 
 
 def setup_logging(log_level: str = "INFO") -> None:
@@ -24,6 +38,27 @@ def setup_logging(log_level: str = "INFO") -> None:
     )
 
 
+def run_load_test(args: argparse.Namespace, config: WorkerConfig, filters: Any) -> None:
+    """Run the load test requested on the command line and print its report."""
+    from scrapper_service.loadtest import LoadSpec, run_local_load
+
+    logger = logging.getLogger(__name__)
+    spec = LoadSpec(
+        requests=args.load_test,
+        concurrency=args.load_concurrency,
+        filters=filters if isinstance(filters, list) else [filters],
+        batch_size=args.load_batch_size,
+        rate=args.load_rate,
+    )
+    service = build_manager(config)
+    start_reporting(service, config)
+    logger.info("Load testing with %d requests from %d clients", spec.requests, spec.concurrency)
+    report = run_local_load(service, spec, prefetch=config.prefetch)
+    for line in report.summary().splitlines():
+        logger.info(line)
+    print(report.to_json())
+
+
 def main() -> None:
     """Main entry point for scrapper-service-mock."""
     load_dotenv()
@@ -41,6 +76,239 @@ def main() -> None:
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Logging level (default: INFO)",
     )
+    parser.add_argument(
+        "--corpus-size",
+        type=int,
+        default=0,
+        help="Serve a seeded synthetic corpus of this many jobs (default: 10 canonical listings)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the synthetic corpus (default: 0)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=str,
+        default=None,
+        help="Serve the corpus snapshot at this path through mmap",
+    )
+    parser.add_argument(
+        "--build-snapshot",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write the corpus given by --corpus-size/--seed to PATH and exit",
+    )
+    parser.add_argument(
+        "--descriptions",
+        choices=sorted(LENGTH_DISTRIBUTIONS),
+        default=None,
+        help="Give synthetic jobs generated multi-paragraph descriptions with this length "
+        "distribution (default: short template text)",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Serve the recorded scraper responses in the JSONL capture at PATH",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=None,
+        help="Replay the recorded gaps between batches at this multiple of real time "
+        "(default: as fast as possible)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Deliver batches as they are generated without keeping the full result set",
+    )
+    parser.add_argument(
+        "--evolve",
+        action="store_true",
+        help="Post, update and expire corpus jobs over time and serve deltas for 'since' filters",
+    )
+    parser.add_argument(
+        "--posts-per-minute",
+        type=float,
+        default=EvolutionSpec.posts_per_minute,
+        help="New jobs posted per minute with --evolve "
+        f"(default: {EvolutionSpec.posts_per_minute})",
+    )
+    parser.add_argument(
+        "--updates-per-minute",
+        type=float,
+        default=EvolutionSpec.updates_per_minute,
+        help=f"Jobs updated per minute with --evolve (default: {EvolutionSpec.updates_per_minute})",
+    )
+    parser.add_argument(
+        "--expiries-per-minute",
+        type=float,
+        default=EvolutionSpec.expiries_per_minute,
+        help="Jobs expired per minute with --evolve "
+        f"(default: {EvolutionSpec.expiries_per_minute})",
+    )
+    parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=None,
+        help="Flush a batch before its encoded size exceeds this many bytes (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-linger-ms",
+        type=float,
+        default=None,
+        help="Flush a batch once it has been open this long (default: no limit)",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=int,
+        default=0,
+        metavar="ENTRIES",
+        help="Cache the results of this many distinct filters (default: 0, no cache)",
+    )
+    parser.add_argument(
+        "--result-cache-mb",
+        type=int,
+        default=256,
+        help="Memory budget of the result cache in MiB (default: 256)",
+    )
+    parser.add_argument(
+        "--result-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL_SECONDS,
+        help="Seconds a cached result is served before it expires "
+        f"(default: {DEFAULT_TTL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--providers",
+        type=int,
+        default=0,
+        help="Split the corpus across this many simulated providers fetched concurrently "
+        "and merge their jobs (default: 0, a single source)",
+    )
+    parser.add_argument(
+        "--provider-latency-ms",
+        type=float,
+        default=0.0,
+        help="Mean latency of a provider page with --providers (default: 0)",
+    )
+    parser.add_argument(
+        "--provider-jitter",
+        type=float,
+        default=0.0,
+        help="Relative spread of the provider page latency, 0-1 (default: 0)",
+    )
+    parser.add_argument(
+        "--provider-failure-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a provider page request fails (default: 0)",
+    )
+    parser.add_argument(
+        "--provider-merge",
+        choices=MERGE_MODES,
+        default="interleave",
+        help="Merge provider jobs in arrival order or newest first (default: interleave)",
+    )
+    parser.add_argument(
+        "--shaping-profile",
+        type=str,
+        default=None,
+        metavar="NAME",
+        help="Pace batch delivery with this load-shaping profile unless a request picks one "
+        f"with its 'profile' filter (built in: {', '.join(PROFILES)})",
+    )
+    parser.add_argument(
+        "--shaping-profiles",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="JSON file of extra load-shaping profiles, keyed by name",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of consumer processes, each serving its own corpus shard (default: 1)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=None,
+        help="Broker prefetch count per worker (default: consumer default)",
+    )
+    parser.add_argument(
+        "--node-index",
+        type=int,
+        default=0,
+        help="Index of this node when sharding the corpus across replicas (default: 0)",
+    )
+    parser.add_argument(
+        "--node-count",
+        type=int,
+        default=1,
+        help="Number of replicas sharing the corpus (default: 1)",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Build the corpus pools and index in the background while the consumer connects",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Record spans and metrics for every scrape (exported through OpenTelemetry)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on this port at /metrics; implies --instrument "
+        "(worker i of --workers uses port + i)",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=None,
+        help="Log a metrics summary every this many seconds; implies --instrument",
+    )
+    parser.add_argument(
+        "--load-test",
+        type=int,
+        default=0,
+        metavar="REQUESTS",
+        help="Serve this many requests through an in-process broker, print a throughput "
+        "report as JSON and exit",
+    )
+    parser.add_argument(
+        "--load-concurrency",
+        type=int,
+        default=8,
+        help="Clients sending requests at once with --load-test (default: 8)",
+    )
+    parser.add_argument(
+        "--load-filters",
+        type=str,
+        default="{}",
+        help="JSON filter object, or list of objects used in turn, for --load-test (default: {})",
+    )
+    parser.add_argument(
+        "--load-batch-size",
+        type=int,
+        default=50,
+        help="Batch size of the --load-test requests (default: 50)",
+    )
+    parser.add_argument(
+        "--load-rate",
+        type=float,
+        default=None,
+        help="Maximum requests started per second with --load-test (default: no limit)",
+    )
     parser.add_argument(
         "--check",
         action="store_true",
@@ -57,18 +325,115 @@ def main() -> None:
 
     logger = logging.getLogger(__name__)
 
+    if args.evolve and args.corpus_size <= 0 and not args.snapshot:
+        parser.error("--evolve needs a corpus (--corpus-size or --snapshot)")
+    if (
+        (args.workers > 1 or args.node_count > 1)
+        and args.corpus_size <= 0
+        and not (args.snapshot or args.replay)
+    ):
+        parser.error("--workers and --node-count need --corpus-size, --snapshot or --replay")
+    if args.replay and (args.evolve or args.snapshot or args.build_snapshot):
+        parser.error("--replay cannot be combined with --snapshot, --build-snapshot or --evolve")
+    if args.providers > 0 and (args.replay or args.evolve):
+        parser.error("--providers cannot be combined with --replay or --evolve")
+
+    if (
+        args.shaping_profile is not None
+        and args.shaping_profiles is None
+        and args.shaping_profile not in (*PROFILES, NO_PROFILE)
+    ):
+        parser.error(f"Unknown --shaping-profile {args.shaping_profile!r}")
+
+    if args.load_test > 0:
+        if args.workers > 1:
+            parser.error("--load-test runs in a single process and cannot use --workers")
+        import json
+
+        try:
+            load_filters = json.loads(args.load_filters)
+        except ValueError as e:
+            parser.error(f"--load-filters is not valid JSON: {e}")
+
+    if args.build_snapshot:
+        spec = corpus_spec(args.corpus_size, args.seed, args.descriptions)
+        path = write_snapshot(SyntheticCorpus(spec), args.build_snapshot)
+        logger.info("Wrote %d jobs to snapshot %s", spec.size, path)
+        return
+
+    config = WorkerConfig(
+        rabbitmq_url=args.rabbitmq_url,
+        log_level=args.log_level,
+        corpus_size=args.corpus_size,
+        seed=args.seed,
+        snapshot=args.snapshot,
+        streaming=args.streaming,
+        prefetch=args.prefetch,
+        shard_index=args.node_index,
+        shard_count=args.node_count,
+        max_batch_bytes=args.max_batch_bytes,
+        max_linger_ms=args.max_linger_ms,
+        evolution=EvolutionSpec(
+            posts_per_minute=args.posts_per_minute,
+            updates_per_minute=args.updates_per_minute,
+            expiries_per_minute=args.expiries_per_minute,
+            seed=args.seed,
+        )
+        if args.evolve
+        else None,
+        prewarm=args.prewarm,
+        instrument=args.instrument,
+        metrics_port=args.metrics_port,
+        stats_interval=args.stats_interval,
+        replay=args.replay,
+        replay_speed=args.replay_speed,
+        result_cache_entries=args.result_cache,
+        result_cache_mb=args.result_cache_mb,
+        result_cache_ttl=args.result_cache_ttl,
+        providers=args.providers,
+        provider_latency_ms=args.provider_latency_ms,
+        provider_jitter=args.provider_jitter,
+        provider_failure_rate=args.provider_failure_rate,
+        provider_merge=args.provider_merge,
+        shaping_profile=args.shaping_profile,
+        shaping_profiles=args.shaping_profiles,
+        descriptions=args.descriptions,
+    )
+
+    if args.load_test > 0:
+        run_load_test(args, config, load_filters)
+        return
+
+    if args.workers > 1:
+        logger.info("Starting Scrapper Service Mock with %d workers...", args.workers)
+        try:
+            run_workers(config, args.workers, args.node_index, args.node_count)
+        except Exception as e:
+            logger.error(f"Fatal error: {e}", exc_info=True)
+            sys.exit(1)
+        return
+
     # Initialize OpenTelemetry for distributed tracing
-    try:
-        init_telemetry(service_name="scrapper-service-mock")
+    if start_telemetry():
         logger.info("OpenTelemetry telemetry initialized")
-    except Exception as e:
-        logger.warning("Failed to initialize telemetry: %s", e)
 
     logger.info("Starting Scrapper Service Mock...")
 
     try:
-        service = ScrapperManager()
-        consumer = ScrapperConsumer.from_url(service, args.rabbitmq_url)
+        service = build_manager(config)
+        if service.replay is not None:
+            logger.info(
+                "Replaying %d jobs in %d batches from %s",
+                len(service.replay),
+                service.replay.batch_count,
+                service.replay.path,
+            )
+        elif service.corpus is not None:
+            logger.info("Serving a corpus of %d jobs", len(service.corpus))
+        start_reporting(service, config)
+        consumer = create_consumer(service, config)
+        if config.prewarm:
+            prewarm_in_background(service)
         consumer.start()
     except KeyboardInterrupt:
         logger.info("Received interrupt signal, shutting down...")
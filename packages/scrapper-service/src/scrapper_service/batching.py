@@ -0,0 +1,441 @@
+"""
+Batching helpers shared by the manager's eager, streaming and asyncio delivery paths.
+
+Batches are built as fresh lists straight from the source iterator, so nothing
+upstream of the current batch is retained and callers never see a list that is
+mutated after delivery. A `Deadline` cuts the source short once a scrape's
+timeout has passed, so whatever was produced goes out as the final batch.
+
+Deliveries hold one batch back so the final one can be flagged. A batch closed
+by the linger timer must not wait for the next one, so it is followed by an
+empty batch: a flush marker on which the held-back batch goes out at once.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+T = TypeVar("T")
+
+DEFAULT_MAX_PENDING_BATCHES = 4
+"""Batches buffered between generation and an asynchronous sink."""
+
+LINGER_READ_AHEAD = 256
+"""Items read ahead of batching when batches are flushed by a linger timer."""
+_POLL_SECONDS = 0.1
+
+
+class Deadline:
+    """A point on the monotonic clock after which a scrape stops producing jobs.
+
+    A missing or non-positive ``timeout`` never expires.
+    """
+
+    def __init__(self, timeout: Optional[float]) -> None:
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.started_at = time.monotonic()
+        self.expires_at = None if self.timeout is None else self.started_at + self.timeout
+        self.expired = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before expiry, or ``None`` without a timeout."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def check(self) -> bool:
+        """Return whether the deadline has passed, remembering the first expiry."""
+        if not self.expired and self.expires_at is not None:
+            self.expired = time.monotonic() >= self.expires_at
+        return self.expired
+
+    def limit(self, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items`` until the deadline passes.
+
+        The clock is read before each item is pulled, so no item is produced
+        after expiry only to be thrown away.
+        """
+        if self.expires_at is None:
+            yield from items
+            return
+        iterator = iter(items)
+        while not self.check():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            yield item
+
+
+@dataclass(frozen=True)
+class ScrapeReport:
+    """Outcome of one scrape, for tuning timeouts against real throughput.
+
+    Attributes:
+        delivered: Jobs produced before the scrape finished or was cut off.
+        total: Jobs matching the filters, when known up front.
+        timed_out: Whether the deadline cut the scrape short.
+        elapsed: Seconds spent generating and delivering.
+        timeout: The timeout applied, or ``None`` when unbounded.
+        cursor: Change-log cursor to poll from next, for evolving corpora.
+        duplicates: Jobs recognised as already delivered to the consumer.
+        dropped: Duplicates left out of the result (``drop`` dedup mode).
+        failed_providers: Simulated providers that failed during the scrape.
+        index_seconds: Seconds of ``elapsed`` spent building (or waiting for) the
+            corpus index before any job was produced. The index is built once,
+            by the first filtered request unless the manager was pre-warmed.
+    """
+
+    delivered: int
+    total: Optional[int]
+    timed_out: bool
+    elapsed: float
+    timeout: Optional[float]
+    cursor: Optional[int] = None
+    duplicates: int = 0
+    dropped: int = 0
+    failed_providers: Tuple[str, ...] = ()
+    index_seconds: float = 0.0
+
+    @property
+    def cut_off(self) -> Optional[int]:
+        """Jobs that matched but were not produced because of the deadline."""
+        if self.total is None:
+            return None
+        return max(self.total - self.delivered - self.dropped, 0)
+
+    @property
+    def jobs_per_second(self) -> float:
+        return self.delivered / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def iter_batches(items: Iterable[T], batch_size: Optional[int]) -> Iterator[List[T]]:
+    """Split ``items`` lazily into lists of at most ``batch_size`` elements.
+
+    A missing or non-positive ``batch_size`` yields everything as a single batch.
+    """
+    if not batch_size or batch_size <= 0:
+        batch = list(items)
+        if batch:
+            yield batch
+        return
+
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+@dataclass(frozen=True)
+class BatchPolicy:
+    """Limits that close a batch; whichever is reached first flushes it.
+
+    Attributes:
+        max_jobs: Jobs per batch. ``None`` or non-positive means unlimited.
+        max_bytes: Encoded size of the batch as a JSON array. A batch is flushed
+            before a job that would overflow it, so only a single job larger than
+            the limit produces an oversized batch.
+        max_linger: Seconds a batch may stay open after its first job. It is
+            flushed when that time passes, even if no further job arrives; the
+            source is then read on a helper thread so a stalled source cannot
+            hold the batch back.
+    """
+
+    max_jobs: Optional[int] = 50
+    max_bytes: Optional[int] = None
+    max_linger: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.max_bytes is not None and self.max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if self.max_linger is not None and self.max_linger < 0:
+            raise ValueError("max_linger must not be negative")
+
+    @classmethod
+    def resolve(
+        cls,
+        batch_size: Optional[int],
+        filters: Any = None,
+        default: Optional["BatchPolicy"] = None,
+    ) -> "BatchPolicy":
+        """Combine a request's ``batch_size`` and filters with a service-wide default.
+
+        ``batch_size`` sets ``max_jobs``. Filters may override the byte and
+        linger limits with ``max_batch_bytes`` and ``max_linger_ms``, which lets
+        remote callers tune them per request.
+        """
+        policy = replace(default or cls(), max_jobs=batch_size)
+        if isinstance(filters, Mapping):
+            max_bytes = filters.get("max_batch_bytes")
+            linger_ms = filters.get("max_linger_ms")
+            if max_bytes is not None:
+                policy = replace(policy, max_bytes=int(max_bytes))
+            if linger_ms is not None:
+                policy = replace(policy, max_linger=float(linger_ms) / 1000)
+        return policy
+
+    @property
+    def counts_only(self) -> bool:
+        return self.max_bytes is None and self.max_linger is None
+
+
+class _ProducerFailed:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_DONE = object()
+_LINGERED = object()
+
+
+def iter_policy_batches(
+    items: Iterable[T], policy: BatchPolicy, size_of: Callable[[T], int]
+) -> Iterator[List[T]]:
+    """Split ``items`` lazily into batches bounded by ``policy``.
+
+    ``size_of`` returns the encoded size of one item and is only called when the
+    policy limits bytes. Every batch flushed by ``max_linger`` is followed by an
+    empty flush marker.
+    """
+    if policy.counts_only:
+        yield from iter_batches(items, policy.max_jobs)
+        return
+
+    max_jobs = policy.max_jobs if policy.max_jobs and policy.max_jobs > 0 else None
+    max_bytes = policy.max_bytes
+    max_linger = policy.max_linger
+    reader = _ReadAhead(items) if max_linger is not None else None
+    iterator = iter(items)
+    batch: List[T] = []
+    # An encoded batch is "[" + items joined by "," + "]".
+    batch_bytes = 1
+    opened_at = 0.0
+    try:
+        while True:
+            if reader is None:
+                item: Any = next(iterator, _DONE)
+            else:
+                wait = None
+                if batch and max_linger is not None:
+                    wait = max(opened_at + max_linger - time.monotonic(), 0.0)
+                item = reader.get(wait)
+            if item is _DONE:
+                break
+            if (
+                batch
+                and max_linger is not None
+                and (item is _LINGERED or time.monotonic() - opened_at >= max_linger)
+            ):
+                yield batch
+                yield []
+                batch = []
+                batch_bytes = 1
+            if item is _LINGERED:
+                continue
+            item_bytes = size_of(item) + 1 if max_bytes is not None else 0
+            if batch and max_bytes is not None and batch_bytes + item_bytes > max_bytes:
+                yield batch
+                batch = []
+                batch_bytes = 1
+            if not batch and max_linger is not None:
+                opened_at = time.monotonic()
+            batch.append(item)
+            batch_bytes += item_bytes
+            if max_jobs is not None and len(batch) >= max_jobs:
+                yield batch
+                batch = []
+                batch_bytes = 1
+        if batch:
+            yield batch
+    finally:
+        if reader is not None:
+            reader.close()
+
+
+class _ReadAhead:
+    """Reads an iterable on a helper thread so items can be awaited with a timeout."""
+
+    def __init__(self, items: Iterable[Any], max_pending: int = LINGER_READ_AHEAD) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        # Read in the caller's context so spans opened by the source keep their parent.
+        context = contextvars.copy_context()
+        threading.Thread(
+            target=context.run,
+            args=(self._read, items),
+            name="scrapper-linger-reader",
+            daemon=True,
+        ).start()
+
+    def get(self, timeout: Optional[float]) -> Any:
+        """Return the next item, ``_DONE`` at the end, or ``_LINGERED`` after ``timeout``."""
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return _LINGERED
+        if isinstance(item, _ProducerFailed):
+            raise item.error
+        return item
+
+    def close(self) -> None:
+        self._stop.set()
+        # Make room so a reader blocked on a full queue sees `_stop`.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _read(self, items: Iterable[Any]) -> None:
+        try:
+            for item in items:
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._put(_ProducerFailed(e))
+            return
+        self._put(_DONE)
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def deliver_batches(
+    batches: Iterable[Sequence[T]], on_batch: Callable[[Sequence[T], bool], None]
+) -> int:
+    """Hand every batch to ``on_batch`` and flag the final one.
+
+    One batch is held back so the last delivery can be marked with ``True``; an
+    empty batch (a linger flush marker) delivers it at once instead. An empty
+    source still produces a single ``on_batch([], True)`` call, matching the
+    contract expected by consumers. Returns the number of delivered items.
+    """
+    delivered = 0
+    pending: Optional[Sequence[T]] = None
+    for batch in batches:
+        if pending is not None:
+            on_batch(pending, False)
+            pending = None
+        if batch:
+            delivered += len(batch)
+            pending = batch
+
+    on_batch(pending if pending is not None else [], True)
+    return delivered
+
+
+async def deliver_batches_async(
+    batches: Iterable[Sequence[T]],
+    on_batch: Callable[[Sequence[T], bool], Awaitable[None]],
+    max_pending: int = DEFAULT_MAX_PENDING_BATCHES,
+    executor: Optional["Executor"] = None,
+    deadline: Optional[Deadline] = None,
+) -> int:
+    """Asynchronous counterpart of `deliver_batches` with bounded buffering.
+
+    ``batches`` is consumed in an executor thread that feeds a queue holding at
+    most ``max_pending`` batches. When the sink falls behind, the queue fills up
+    and the producer blocks, pausing generation until the sink catches up. If
+    the sink raises, the producer is stopped before the error propagates.
+
+    With a ``deadline``, the batch held back when it passes goes out as the final
+    delivery instead of waiting for the producer, which may be stuck behind a
+    slow sink. Batches still queued then are dropped, as if they had not been
+    generated in time, so batches keep their size and type and the sink is
+    called at most once after the deadline. ``batches`` should also be limited
+    by the same deadline so generation stops at the same time.
+    """
+    # Imported here so the synchronous paths (and service startup) don't pay for asyncio.
+    import asyncio
+
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item: Any) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce() -> None:
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    return
+                put(batch)
+        except BaseException as e:
+            put(_ProducerFailed(e))
+        finally:
+            put(_DONE)
+
+    producer = loop.run_in_executor(executor, produce)
+    delivered = 0
+    pending: Optional[Sequence[T]] = None
+    try:
+        while True:
+            if deadline is not None and deadline.check():
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if isinstance(item, _ProducerFailed):
+                        raise item.error
+                break
+            try:
+                item = await asyncio.wait_for(
+                    queue.get(), None if deadline is None else deadline.remaining()
+                )
+            except asyncio.TimeoutError:
+                continue
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerFailed):
+                raise item.error
+            if pending is not None:
+                await on_batch(pending, False)
+                pending = None
+            if item:
+                delivered += len(item)
+                pending = item
+        await on_batch(pending if pending is not None else [], True)
+    finally:
+        stop.set()
+        # Keep draining so a producer blocked on a full queue can observe `stop`.
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait({producer}, timeout=0.05)
+    return delivered
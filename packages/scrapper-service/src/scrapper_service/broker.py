@@ -0,0 +1,188 @@
+"""
+In-process stand-in for the RabbitMQ request/reply path.
+
+`InMemoryBroker` keeps named queues of `Message` objects in memory, and
+`LocalConsumer` serves the scrape requests published to its request queue with
+any `ScrapperServiceInterface`, following the same flow as ``ScrapperConsumer``
+over RabbitMQ: every request is decoded, scraped with a batch callback, and each
+batch is encoded to JSON and published to the request's ``reply_to`` queue
+under its correlation id. Together they let the whole request path run, and
+be profiled, without a broker or a network.
+
+``ScrapperConsumer`` only connects through ``from_url`` and has no pluggable
+transport, so `LocalConsumer` reimplements its loop rather than driving it.
+The service and everything below it are the real ones; the consumer's own
+acknowledgement, prefetch and reply framing are not exercised.
+
+A request body is a JSON object with optional ``filters``, ``timeout`` and
+``batch_size``. A reply body is a JSON object with ``jobs`` (or ``error``), and
+its headers carry ``count``, ``is_last`` and ``error`` so clients can follow a
+stream without decoding it.
+"""
+
+import json
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from job_scrapper_contracts import Job, ScrapperServiceInterface
+
+from .columnar import JobBatch
+from .payloads import encode_batch
+
+logger = logging.getLogger(__name__)
+
+REQUEST_QUEUE = "job.scrape.request"
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_TIMEOUT = 30
+_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class Message:
+    """A message as it sits in a queue.
+
+    Attributes:
+        body: Encoded payload.
+        reply_to: Queue the receiver should answer on.
+        correlation_id: Identifier tying replies to their request.
+        headers: Small metadata readable without decoding the body.
+    """
+
+    body: bytes
+    reply_to: Optional[str] = None
+    correlation_id: Optional[str] = None
+    headers: Mapping[str, Any] = field(default_factory=dict)
+
+
+class InMemoryBroker:
+    """Named, unbounded FIFO queues shared by the threads of one process.
+
+    Attributes:
+        published: Messages published since the broker was created.
+        published_bytes: Body bytes published since the broker was created.
+    """
+
+    def __init__(self) -> None:
+        self._queues: Dict[str, "queue.Queue[Message]"] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.published_bytes = 0
+
+    def declare_queue(self, name: str) -> None:
+        """Create queue ``name`` if it does not exist yet."""
+        self._queue(name)
+
+    def delete_queue(self, name: str) -> None:
+        with self._lock:
+            self._queues.pop(name, None)
+
+    def depth(self, name: str) -> int:
+        """Number of messages waiting in queue ``name``."""
+        return self._queue(name).qsize()
+
+    def publish(self, name: str, message: Message) -> None:
+        """Append ``message`` to queue ``name``, declaring it if needed."""
+        self._queue(name).put(message)
+        with self._lock:
+            self.published += 1
+            self.published_bytes += len(message.body)
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Optional[Message]:
+        """Take the next message from queue ``name``, or ``None`` after ``timeout`` seconds."""
+        try:
+            return self._queue(name).get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _queue(self, name: str) -> "queue.Queue[Message]":
+        with self._lock:
+            found = self._queues.get(name)
+            if found is None:
+                found = self._queues[name] = queue.Queue()
+            return found
+
+
+class LocalConsumer:
+    """Serves scrape requests from an `InMemoryBroker` with a scrapper service.
+
+    ``prefetch`` requests are served at once, each on its own thread, like a
+    broker consumer with that prefetch count.
+    """
+
+    def __init__(
+        self,
+        manager: ScrapperServiceInterface,
+        broker: InMemoryBroker,
+        request_queue: str = REQUEST_QUEUE,
+        prefetch: int = 1,
+    ) -> None:
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        self.manager = manager
+        self.broker = broker
+        self.request_queue = request_queue
+        self.prefetch = prefetch
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start serving in daemon threads and return immediately."""
+        self.broker.declare_queue(self.request_queue)
+        self._stop.clear()
+        for index in range(self.prefetch):
+            thread = threading.Thread(
+                target=self._serve_forever, name=f"scrapper-local-consumer-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop taking requests and wait for the ones in progress."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _serve_forever(self) -> None:
+        while not self._stop.is_set():
+            message = self.broker.get(self.request_queue, timeout=_POLL_SECONDS)
+            if message is not None:
+                self.handle(message)
+
+    def handle(self, message: Message) -> None:
+        """Serve one request message, publishing its replies."""
+        reply_to = message.reply_to
+        correlation_id = message.correlation_id
+
+        def reply(body: bytes, count: int, is_last: bool, error: bool = False) -> None:
+            if reply_to is None:
+                return
+            headers = {"count": count, "is_last": is_last, "error": error}
+            self.broker.publish(
+                reply_to, Message(body, correlation_id=correlation_id, headers=headers)
+            )
+
+        def on_jobs_batch(jobs: Sequence[Job], is_last: bool) -> None:
+            reply(b'{"jobs":' + encode_jobs(jobs) + b"}", len(jobs), is_last)
+
+        try:
+            request = json.loads(message.body) if message.body else {}
+            self.manager.scrape_jobs(
+                request.get("filters") or {},
+                timeout=request.get("timeout", DEFAULT_TIMEOUT),
+                batch_size=request.get("batch_size", DEFAULT_BATCH_SIZE),
+                on_jobs_batch=on_jobs_batch,
+            )
+        except Exception as e:
+            logger.error("Failed to serve scrape request %s: %s", correlation_id, e, exc_info=True)
+            reply(json.dumps({"error": str(e)}).encode("utf-8"), 0, True, error=True)
+
+
+def encode_jobs(jobs: Sequence[Job]) -> bytes:
+    """Encode a batch of jobs as a JSON array, as it would be sent to the platform."""
+    if isinstance(jobs, JobBatch):
+        return jobs.encode()
+    return encode_batch([job.to_dict() for job in jobs])
@@ -0,0 +1,207 @@
+"""
+Per-filter cache of scrape results.
+
+Tests and load runs send the same filter over and over, and every request used
+to render the same jobs again. `ResultCache` keeps the job dictionaries matched
+by a normalised `JobQuery`, so a repeated request only converts cached rows into
+jobs and gets the same jobs (ids included) as the request that filled the entry.
+
+Entries are evicted least recently used first once the entry count or the
+estimated memory of all entries exceeds its limit, and expire ``ttl`` seconds
+after they were filled. A result larger than the whole memory budget is never
+stored, and neither is a result cut short by a timeout. Results still being
+collected by in-flight requests count against the same budget.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from job_scrapper_contracts import JobDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+JOB_DICT_OVERHEAD_BYTES = 1200
+"""Memory of a mock job dictionary beside its description, measured with tracemalloc."""
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of a `ResultCache` since it was created.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that had to generate the result.
+        evictions: Entries dropped to stay within the entry or memory limit.
+        expirations: Entries dropped because their TTL passed.
+        rejected: Results not stored because they were cut short or too large.
+        entries: Entries currently cached.
+        bytes: Estimated memory of the cached entries.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    rejected: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """LRU cache with a TTL of the job dictionaries matched by each query.
+
+    Cached results are shared between requests and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("A result cache needs room for at least one entry")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Sequence[JobDict]]]" = OrderedDict()
+        self._bytes = 0
+        self._recording_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._expirations,
+                self._rejected,
+                len(self._entries),
+                self._bytes,
+            )
+
+    def get(self, key: Hashable) -> Optional[Sequence[JobDict]]:
+        """Return the cached result for ``key``, counting a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._drop(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, job_dicts: Sequence[JobDict], size: Optional[int] = None) -> bool:
+        """Store ``job_dicts`` under ``key``; return whether they fit the budget."""
+        if size is None:
+            size = sum(map(estimated_bytes, job_dicts))
+        return self._put(key, job_dicts, size)
+
+    def _put(
+        self, key: Hashable, job_dicts: Sequence[JobDict], size: int, reserved: int = 0
+    ) -> bool:
+        """Store an entry, turning ``reserved`` bytes of a recording into its size."""
+        with self._lock:
+            self._recording_bytes -= reserved
+            if size > self.max_bytes:
+                self._rejected += 1
+                return False
+            if key in self._entries:
+                self._drop(key)
+            expires_at = self._clock() + self.ttl if self.ttl is not None else float("inf")
+            self._entries[key] = (expires_at, size, job_dicts)
+            self._bytes += size
+            # The new entry stays even if in-flight recordings keep the total over budget.
+            while len(self._entries) > self.max_entries or (
+                len(self._entries) > 1 and self._bytes + self._recording_bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+        return True
+
+    def recording(self, key: Hashable, job_dicts: Iterable[JobDict]) -> Iterator[JobDict]:
+        """Pass ``job_dicts`` through and cache them once they are exhausted.
+
+        The jobs collected so far count against the memory budget while the
+        request runs, evicting older entries if need be, so concurrent misses
+        never hold more than ``max_bytes`` together with the cached entries.
+        Collection stops (and nothing is cached) as soon as the result no longer
+        fits, and a caller that stops early caches nothing.
+        """
+        collected: Optional[List[JobDict]] = []
+        reserved = 0
+        try:
+            for job_dict in job_dicts:
+                if collected is not None:
+                    size = estimated_bytes(job_dict)
+                    if self._reserve(size):
+                        reserved += size
+                        collected.append(job_dict)
+                    else:
+                        collected = None
+                        self._release(reserved, rejected=True)
+                        reserved = 0
+                yield job_dict
+        except BaseException:
+            if collected is not None:
+                self._release(reserved, rejected=True)
+            raise
+        if collected is not None:
+            self._put(key, collected, reserved, reserved)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _reserve(self, size: int) -> bool:
+        """Count ``size`` more bytes of an in-flight recording, if they fit the budget."""
+        with self._lock:
+            if self._recording_bytes + size > self.max_bytes:
+                return False
+            self._recording_bytes += size
+            while self._entries and self._bytes + self._recording_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+            return True
+
+    def _release(self, size: int, rejected: bool = False) -> None:
+        with self._lock:
+            self._recording_bytes -= size
+            if rejected:
+                self._rejected += 1
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def estimated_bytes(job_dict: JobDict) -> int:
+    """Approximate memory held by a job dictionary, dominated by its description."""
+    return JOB_DICT_OVERHEAD_BYTES + len(job_dict.get("description") or "")
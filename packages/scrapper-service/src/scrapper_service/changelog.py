@@ -0,0 +1,298 @@
+"""
+Time-evolving view of a corpus with an append-only change log.
+
+A `ChangeLog` replays a deterministic stream of events against a
+`ColumnarCorpus`: new jobs are posted, live jobs are updated (salary revised and
+posting refreshed) and live jobs expire. Events happen at fixed rates on the
+wall clock, so the state at any moment is reproducible from the seed and the
+elapsed time. Events are numbered; that number is the cursor a client hands
+back to receive only what changed since its previous poll, and a delta costs
+the number of events since the cursor rather than the size of the corpus.
+
+The job contract has no deletion marker, so an expired job is reported once
+more with ``valid_through`` set to the moment it expired.
+"""
+
+import random
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from job_scrapper_contracts import JobDict
+
+from .corpus import BLOCK_SIZE, POSTING_LIFETIME, ColumnarCorpus, CorpusColumns
+from .identity import content_job_id
+
+POSTED = 0
+UPDATED = 1
+EXPIRED = 2
+
+UPDATE_SALARY_STEP = 0.03
+"""Relative salary increase applied by every update of a job."""
+
+_MAX_TARGET_PROBES = 64
+_LIVE = 0
+_GONE = 1
+
+
+@dataclass(frozen=True)
+class EvolutionSpec:
+    """Rates at which the simulated job market changes.
+
+    Attributes:
+        posts_per_minute: New jobs posted per minute.
+        updates_per_minute: Live jobs revised per minute.
+        expiries_per_minute: Live jobs closed per minute.
+        seed: Seed of the event stream.
+    """
+
+    posts_per_minute: float = 60.0
+    updates_per_minute: float = 30.0
+    expiries_per_minute: float = 30.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        rates = (self.posts_per_minute, self.updates_per_minute, self.expiries_per_minute)
+        if min(rates) < 0:
+            raise ValueError("Change rates must not be negative")
+        if sum(rates) <= 0:
+            raise ValueError("At least one change rate must be positive")
+
+    @property
+    def events_per_second(self) -> float:
+        return (self.posts_per_minute + self.updates_per_minute + self.expiries_per_minute) / 60
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    """Jobs that changed between two cursors.
+
+    Attributes:
+        since: Cursor the delta starts from (exclusive).
+        cursor: Cursor to pass as ``since`` on the next poll.
+        jobs: Latest state of every job touched by an event in between, in the
+            order of their most recent event.
+    """
+
+    since: int
+    cursor: int
+    jobs: List[JobDict]
+
+
+class ChangeLog:
+    """Deterministic stream of post, update and expiry events over a corpus.
+
+    Events are applied lazily whenever the log is read, up to the number that
+    the rates allow for the time elapsed since the log was created. Memory grows
+    with the number of events (about ten bytes each) plus one byte per row.
+
+    Concurrent requests share the log: events are applied under a lock, and
+    scans of the live jobs work on a snapshot of the state taken under it.
+
+    Posted jobs are reposts of corpus rows, so a log over an empty corpus (such
+    as an empty shard of a small one) has nothing to post, update or expire and
+    never changes.
+    """
+
+    def __init__(
+        self,
+        corpus: ColumnarCorpus,
+        spec: Optional[EvolutionSpec] = None,
+        clock: Callable[[], float] = time.time,
+        stream: int = 0,
+    ) -> None:
+        self.corpus = corpus
+        self.spec = spec or EvolutionSpec()
+        self.clock = clock
+        self.started_at = clock()
+        self._rate = self.spec.events_per_second
+        self._rng = random.Random(f"{self.spec.seed}:{stream}:changes")
+        self._base_size = len(corpus)
+        self._columns: Optional[CorpusColumns] = None
+        self._lock = threading.Lock()
+
+        self._status = bytearray(self._base_size)
+        self._live = self._base_size
+        self._updates: Dict[int, Tuple[int, int]] = {}
+        self._expired_at: Dict[int, int] = {}
+        self._posted_source = array("Q")
+        self._posted_event = array("Q")
+        self._event_rows = array("Q")
+        self._event_kinds = bytearray()
+
+    @property
+    def columns(self) -> CorpusColumns:
+        if self._columns is None:
+            self._columns = self.corpus.all_columns()
+        return self._columns
+
+    def prewarm(self) -> None:
+        """Merge the corpus columns ahead of the first read of the log."""
+        self._columns = self.columns
+
+    @property
+    def cursor(self) -> int:
+        """Number of events that have happened so far."""
+        self._advance()
+        return len(self._event_kinds)
+
+    def event_time(self, event: int) -> datetime:
+        """Naive UTC time at which event number ``event`` happens."""
+        seconds = self.started_at + (event + 1) / self._rate
+        return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+    def resolve_cursor(self, since: Any) -> int:
+        """Turn a ``since`` value into an event cursor.
+
+        Integers (or digit strings) are cursors returned by earlier polls;
+        datetimes and ISO strings select the events that happen after them.
+        """
+        if isinstance(since, int):
+            return max(since, 0)
+        if isinstance(since, str) and since.isdigit():
+            return int(since)
+        moment = since if isinstance(since, datetime) else datetime.fromisoformat(str(since))
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        epoch = datetime.fromtimestamp(self.started_at, timezone.utc).replace(tzinfo=None)
+        elapsed = (moment - epoch).total_seconds()
+        return max(int(elapsed * self._rate), 0)
+
+    def changes(self, since: Any) -> ChangeSet:
+        """Return the latest state of every job changed after ``since``."""
+        cursor = self.cursor
+        start = min(self.resolve_cursor(since), cursor)
+        order: Dict[int, None] = {}
+        event_rows = self._event_rows
+        for event in range(start, cursor):
+            row = event_rows[event]
+            # Re-inserting moves the row to its most recent position.
+            order.pop(row, None)
+            order[row] = None
+        return ChangeSet(since=start, cursor=cursor, jobs=self.job_dicts(list(order)))
+
+    def iter_current(self, base_rows: Optional[Sequence[int]] = None) -> Iterator[JobDict]:
+        """Yield every live job: corpus rows first, then posted jobs.
+
+        ``base_rows`` restricts the corpus rows to a candidate set (for example
+        the result of an index search); rows changed since the log started are
+        always included so callers can re-check them against their filters.
+        """
+        base_size = self._base_size
+        with self._lock:
+            self._apply_due_events()
+            status = bytes(self._status)
+            updated = list(self._updates) if base_rows is not None else []
+        if base_rows is None:
+            base_rows = range(base_size)
+        changed = sorted(row for row in updated if row < base_size and status[row] == _LIVE)
+        for start in range(0, len(base_rows), BLOCK_SIZE):
+            rows = [row for row in base_rows[start : start + BLOCK_SIZE] if status[row] == _LIVE]
+            yield from self.job_dicts(rows)
+        if changed:
+            # Updated rows may have entered the candidate set's predicates.
+            candidates = set(base_rows) if not isinstance(base_rows, range) else base_rows
+            yield from self.job_dicts([row for row in changed if row not in candidates])
+        posted = [row for row in range(base_size, len(status)) if status[row] == _LIVE]
+        for start in range(0, len(posted), BLOCK_SIZE):
+            yield from self.job_dicts(posted[start : start + BLOCK_SIZE])
+
+    def live_count(self) -> int:
+        self._advance()
+        return self._live
+
+    def job_dicts(self, rows: Sequence[int]) -> List[JobDict]:
+        """Render the current state of ``rows``, in the given order."""
+        base_size = self._base_size
+        sources = [row if row < base_size else self._posted_source[row - base_size] for row in rows]
+        job_dicts = self.corpus.dicts(self.columns, sources)
+        for row, job_dict in zip(rows, job_dicts):
+            if row >= base_size:
+                self._apply_post(job_dict, row)
+            update = self._updates.get(row)
+            if update is not None:
+                self._apply_update(job_dict, *update)
+            expired_at = self._expired_at.get(row)
+            if expired_at is not None:
+                job_dict["valid_through"] = self._iso(expired_at)
+        return job_dicts
+
+    def _advance(self) -> None:
+        with self._lock:
+            self._apply_due_events()
+
+    def _apply_due_events(self) -> None:
+        if not self._base_size:
+            return
+        target = int((self.clock() - self.started_at) * self._rate)
+        for event in range(len(self._event_kinds), target):
+            self._apply_event(event)
+
+    def _apply_event(self, event: int) -> None:
+        rng = self._rng
+        spec = self.spec
+        draw = rng.random() * self._rate * 60
+        if draw < spec.posts_per_minute:
+            kind = POSTED
+        elif draw < spec.posts_per_minute + spec.updates_per_minute:
+            kind = UPDATED
+        else:
+            kind = EXPIRED
+        row = -1
+        if kind != POSTED:
+            row = self._pick_live(rng)
+            if row < 0:
+                kind = POSTED
+        if kind == POSTED:
+            row = len(self._status)
+            self._status.append(_LIVE)
+            self._live += 1
+            self._posted_source.append(rng.randrange(self._base_size))
+            self._posted_event.append(event)
+        elif kind == UPDATED:
+            version = self._updates.get(row, (0, 0))[0] + 1
+            self._updates[row] = (version, event)
+        else:
+            self._status[row] = _GONE
+            self._live -= 1
+            self._expired_at[row] = event
+        self._event_rows.append(row)
+        self._event_kinds.append(kind)
+
+    def _pick_live(self, rng: random.Random) -> int:
+        status = self._status
+        if self._live == 0:
+            return -1
+        for _ in range(_MAX_TARGET_PROBES):
+            row = rng.randrange(len(status))
+            if status[row] == _LIVE:
+                return row
+        # Mostly expired: fall back to a scan from a random position.
+        start = rng.randrange(len(status))
+        found = status.find(_LIVE, start)
+        return found if found >= 0 else status.find(_LIVE)
+
+    def _apply_post(self, job_dict: JobDict, row: int) -> None:
+        event = self._posted_event[row - self._base_size]
+        job_dict["date_posted"] = self._iso(event)
+        job_dict["valid_through"] = self._iso(event, POSTING_LIFETIME)
+        # A repost of the same listing at a new time is a new listing.
+        job_id = content_job_id(job_dict)
+        job_dict["job_id"] = job_id
+        job_dict["url"] = f"{job_dict['company']['website']}/careers/{job_id}"
+
+    def _apply_update(self, job_dict: JobDict, version: int, event: int) -> None:
+        factor = 1 + UPDATE_SALARY_STEP * version
+        salary = job_dict["salary"]
+        job_dict["salary"] = {
+            **salary,
+            "min_value": round(salary["min_value"] * factor),
+            "max_value": round(salary["max_value"] * factor),
+        }
+        job_dict["valid_through"] = self._iso(event, POSTING_LIFETIME)
+
+    def _iso(self, event: int, offset: timedelta = timedelta()) -> str:
+        return (self.event_time(event) + offset).isoformat(timespec="microseconds")
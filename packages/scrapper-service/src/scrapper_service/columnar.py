@@ -0,0 +1,416 @@
+"""
+Compact column-wise storage for scraped jobs with lazy `Job` materialisation.
+
+A list of `Job` objects costs several Python objects per listing (the job, its
+`Company`, `Salary` and `Location`, two `datetime` values and the strings they
+hold). `JobTable` stores the same jobs as parallel `array` columns instead:
+strings are interned once in a `StringPool` and referenced by index, timestamps
+are microseconds since the epoch and flags share a single byte. `JobBatch` is a
+read-only `Sequence[Job]` view over a slice of a table that builds `Job`
+instances only when they are accessed, or skips them entirely when serialised
+through `JobBatch.job_dicts` or `JobBatch.encode`.
+"""
+
+import math
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from job_scrapper_contracts import Company, Job, JobDict, Location, Salary
+
+from .jobs_data import parse_timestamp
+from .payloads import encode_batch
+
+EPOCH = datetime(1970, 1, 1)
+"""Origin of the stored timestamps, which are naive like the mock data."""
+
+_STRING_COLUMNS = (
+    "title",
+    "description",
+    "company",
+    "website",
+    "category",
+    "employment_type",
+    "source",
+    "industry",
+    "currency",
+    "region",
+)
+
+_HAS_SALARY = 1
+_HAS_LOCATION = 2
+_IS_REMOTE = 4
+_CAN_APPLY = 8
+_CAN_APPLY_KNOWN = 16
+_DERIVED_URL = 32
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class StringPool:
+    """Interns strings and hands out stable integer references.
+
+    Index 0 is reserved for ``None`` so optional fields need no separate mask.
+    """
+
+    def __init__(self) -> None:
+        self.strings: List[Optional[str]] = [None]
+        self._indexes: Dict[Optional[str], int] = {None: 0}
+        self._timestamps: Dict[str, int] = {}
+        self._moments: Dict[int, datetime] = {}
+        self._isoformats: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, value: Optional[str]) -> int:
+        index = self._indexes.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self._indexes[value] = index
+        return index
+
+    def timestamp(self, value: str) -> int:
+        """Convert an ISO timestamp to microseconds since `EPOCH`, memoising repeats.
+
+        Timezone-aware values are stored as naive UTC, as `job_from_dict` parses them.
+        """
+        micros = self._timestamps.get(value)
+        if micros is None:
+            micros = (parse_timestamp(value) - EPOCH) // _MICROSECOND
+            self._timestamps[value] = micros
+        return micros
+
+    def moment(self, micros: int) -> datetime:
+        """Inverse of `timestamp` as a `datetime`; equal values share one object."""
+        moment = self._moments.get(micros)
+        if moment is None:
+            moment = EPOCH + timedelta(microseconds=micros)
+            self._moments[micros] = moment
+        return moment
+
+    def isoformat(self, micros: int) -> str:
+        """Inverse of `timestamp` as an ISO string with microseconds."""
+        text = self._isoformats.get(micros)
+        if text is None:
+            text = self.moment(micros).isoformat(timespec="microseconds")
+            self._isoformats[micros] = text
+        return text
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the pool, counting each interned string once."""
+        size = sys.getsizeof(self.strings) + sys.getsizeof(self._indexes)
+        for cache in (self._timestamps, self._moments, self._isoformats):
+            size += sys.getsizeof(cache)
+        return size + sum(sys.getsizeof(value) for value in self.strings if value is not None)
+
+
+class JobTable:
+    """Append-only column store of job listings.
+
+    Attributes:
+        pool: Interned strings referenced by the string columns. Tables built
+            during one scrape share a pool, so repeated titles, companies and
+            descriptions are stored once. Decoded timestamps are memoised in
+            the pool per distinct value, so its size follows the number of
+            distinct strings and timestamps rather than the number of rows.
+    """
+
+    def __init__(self, pool: Optional[StringPool] = None) -> None:
+        self.pool = pool if pool is not None else StringPool()
+        self.job_id = array("q")
+        self.url = array("I")
+        self.date_posted = array("q")
+        self.valid_through = array("q")
+        self.salary_min = array("d")
+        self.salary_max = array("d")
+        self.experience_months = array("d")
+        self.flags = bytearray()
+        self.title = array("I")
+        self.description = array("I")
+        self.company = array("I")
+        self.website = array("I")
+        self.category = array("I")
+        self.employment_type = array("I")
+        self.source = array("I")
+        self.industry = array("I")
+        self.currency = array("I")
+        self.region = array("I")
+        # Column order of the rows built by `_row`.
+        self._columns: Tuple[Union[array, bytearray], ...] = (
+            self.job_id,
+            self.url,
+            self.date_posted,
+            self.valid_through,
+            self.salary_min,
+            self.salary_max,
+            self.experience_months,
+            self.flags,
+            self.title,
+            self.description,
+            self.company,
+            self.website,
+            self.category,
+            self.employment_type,
+            self.source,
+            self.industry,
+            self.currency,
+            self.region,
+        )
+
+    def __len__(self) -> int:
+        return len(self.job_id)
+
+    def append(self, job_dict: JobDict) -> None:
+        """Store one job dictionary; values are copied into the columns.
+
+        Every value is read before any column grows, so a job dict that cannot
+        be stored raises `ValueError` and leaves the table unchanged.
+        """
+        try:
+            row = self._row(job_dict)
+        except Exception as e:
+            raise ValueError(f"Failed to store job dict in a JobTable: {e}")
+        for column, value in zip(self._columns, row):
+            column.append(value)
+
+    def _row(self, job_dict: JobDict) -> Tuple[Any, ...]:
+        """Column values of ``job_dict``, in the order of ``_columns``."""
+        pool = self.pool
+        intern = pool.intern
+        company = job_dict["company"]
+        salary = job_dict.get("salary")
+        location = job_dict.get("location")
+        job_id = job_dict["job_id"]
+        if not isinstance(job_id, int):
+            raise TypeError(f"job_id must be an int, not {type(job_id).__name__}")
+        website = company.get("website")
+        url = job_dict["url"]
+
+        flags = 0
+        if url == f"{website}/careers/{job_id}":
+            # Corpus URLs are derived from the website and id; rebuild them on access.
+            flags |= _DERIVED_URL
+            url = None
+        if salary:
+            flags |= _HAS_SALARY
+        if location:
+            flags |= _HAS_LOCATION
+            if location.get("is_remote", False):
+                flags |= _IS_REMOTE
+            can_apply = location.get("can_apply")
+            if can_apply is not None:
+                flags |= _CAN_APPLY_KNOWN | (_CAN_APPLY if can_apply else 0)
+
+        # Interning before a later lookup fails only leaves an unused pool entry.
+        return (
+            job_id,
+            intern(url),
+            pool.timestamp(job_dict["date_posted"]),
+            pool.timestamp(job_dict["valid_through"]),
+            _number(salary.get("min_value") if salary else None),
+            _number(salary.get("max_value") if salary else None),
+            _number(job_dict.get("experience_months")),
+            flags,
+            intern(job_dict["title"]),
+            intern(job_dict["description"]),
+            intern(company["name"]),
+            intern(website),
+            intern(job_dict.get("category")),
+            intern(job_dict["employment_type"]),
+            intern(job_dict["source"]),
+            intern(job_dict.get("industry")),
+            intern(salary["currency"] if salary else None),
+            intern(location.get("region") if location else None),
+        )
+
+    def extend(self, job_dicts: Iterable[JobDict]) -> None:
+        for job_dict in job_dicts:
+            self.append(job_dict)
+
+    def job_dict(self, row: int) -> JobDict:
+        """Rebuild the job dictionary stored at ``row``."""
+        pool = self.pool
+        strings = pool.strings
+        flags = self.flags[row]
+        job_id = self.job_id[row]
+        website = strings[self.website[row]]
+        url = f"{website}/careers/{job_id}" if flags & _DERIVED_URL else strings[self.url[row]]
+        salary = None
+        if flags & _HAS_SALARY:
+            salary = {
+                "currency": strings[self.currency[row]],
+                "min_value": _amount(self.salary_min[row]),
+                "max_value": _amount(self.salary_max[row]),
+            }
+        location = None
+        if flags & _HAS_LOCATION:
+            location = {
+                "region": strings[self.region[row]],
+                "is_remote": bool(flags & _IS_REMOTE),
+                "can_apply": bool(flags & _CAN_APPLY) if flags & _CAN_APPLY_KNOWN else None,
+            }
+        return {
+            "job_id": job_id,
+            "title": strings[self.title[row]],
+            "url": url,
+            "description": strings[self.description[row]],
+            "company": {"name": strings[self.company[row]], "website": website},
+            "category": strings[self.category[row]],
+            "date_posted": pool.isoformat(self.date_posted[row]),
+            "valid_through": pool.isoformat(self.valid_through[row]),
+            "employment_type": strings[self.employment_type[row]],
+            "salary": salary,
+            "location": location,
+            "experience_months": _optional(self.experience_months[row]),
+            "industry": strings[self.industry[row]],
+            "source": strings[self.source[row]],
+        }
+
+    def job(self, row: int) -> Job:
+        """Build the contract `Job` stored at ``row``, without an intermediate dict."""
+        pool = self.pool
+        strings = pool.strings
+        flags = self.flags[row]
+        job_id = self.job_id[row]
+        website = strings[self.website[row]]
+        salary = None
+        if flags & _HAS_SALARY:
+            salary = Salary(
+                currency=strings[self.currency[row]],
+                min_value=_amount(self.salary_min[row]),
+                max_value=_amount(self.salary_max[row]),
+            )
+        location = None
+        if flags & _HAS_LOCATION:
+            location = Location(
+                region=strings[self.region[row]],
+                is_remote=bool(flags & _IS_REMOTE),
+                can_apply=bool(flags & _CAN_APPLY) if flags & _CAN_APPLY_KNOWN else None,
+            )
+        return Job(
+            job_id=job_id,
+            title=strings[self.title[row]],
+            url=f"{website}/careers/{job_id}" if flags & _DERIVED_URL else strings[self.url[row]],
+            description=strings[self.description[row]],
+            company=Company(name=strings[self.company[row]], website=website),
+            category=strings[self.category[row]],
+            date_posted=pool.moment(self.date_posted[row]),
+            valid_through=pool.moment(self.valid_through[row]),
+            employment_type=strings[self.employment_type[row]],
+            source=strings[self.source[row]],
+            salary=salary,
+            experience_months=_optional(self.experience_months[row]),
+            location=location,
+            industry=strings[self.industry[row]],
+        )
+
+    @property
+    def column_bytes(self) -> int:
+        """Bytes held by the column buffers alone, excluding the string pool."""
+        return sum(len(column) * _itemsize(column) for column in self._columns)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory of the columns plus the (possibly shared) string pool."""
+        return self.column_bytes + self.pool.memory_bytes
+
+
+class JobBatch(Sequence[Job]):
+    """Read-only sequence of `Job` objects backed by rows of a `JobTable`.
+
+    Indexing and iteration build a new `Job` per access; nothing is cached, so
+    a batch costs only its share of the table no matter how often it is read.
+    Slices are views over the same table.
+    """
+
+    def __init__(self, table: JobTable, start: int = 0, stop: Optional[int] = None) -> None:
+        self.table = table
+        self.start = start
+        self.stop = len(table) if stop is None else stop
+
+    @classmethod
+    def from_dicts(
+        cls, job_dicts: Iterable[JobDict], pool: Optional[StringPool] = None
+    ) -> "JobBatch":
+        """Store ``job_dicts`` in a new table and return a batch over all of it."""
+        table = JobTable(pool)
+        table.extend(job_dicts)
+        return cls(table)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @overload
+    def __getitem__(self, index: int) -> Job: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "JobBatch": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Job, "JobBatch"]:
+        if isinstance(index, slice):
+            first, last, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("JobBatch slices must be contiguous")
+            return JobBatch(self.table, self.start + first, self.start + max(last, first))
+        return self.table.job(self._row(index))
+
+    def __iter__(self) -> Iterator[Job]:
+        job = self.table.job
+        for row in range(self.start, self.stop):
+            yield job(row)
+
+    def __add__(self, other: Sequence[Job]) -> Sequence[Job]:
+        # Adjacent views of one table (e.g. batches flushed together) merge without copying.
+        if isinstance(other, JobBatch) and other.table is self.table and other.start == self.stop:
+            return JobBatch(self.table, self.start, other.stop)
+        return [*self, *other]
+
+    def __radd__(self, other: Sequence[Job]) -> Sequence[Job]:
+        if not other:
+            return self
+        return [*other, *self]
+
+    def __repr__(self) -> str:
+        return f"JobBatch({len(self)} jobs)"
+
+    def job_dict(self, index: int) -> JobDict:
+        return self.table.job_dict(self._row(index))
+
+    def job_dicts(self) -> List[JobDict]:
+        """Serialise the batch to job dictionaries without building `Job` objects."""
+        job_dict = self.table.job_dict
+        return [job_dict(row) for row in range(self.start, self.stop)]
+
+    def encode(self) -> bytes:
+        """Encode the batch as a JSON array, like `payloads.encode_batch`."""
+        return encode_batch(self.job_dicts())
+
+    def _row(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("JobBatch index out of range")
+        return self.start + index
+
+
+def _number(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _optional(stored: float) -> Optional[float]:
+    return None if math.isnan(stored) else stored
+
+
+def _amount(stored: float) -> Optional[float]:
+    # Salaries are whole amounts in the mock data; give them back as ints.
+    if math.isnan(stored):
+        return None
+    return int(stored) if stored.is_integer() else stored
+
+
+def _itemsize(column: Union[array, bytearray]) -> int:
+    return column.itemsize if isinstance(column, array) else 1
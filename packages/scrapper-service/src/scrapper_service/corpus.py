@@ -0,0 +1,718 @@
+"""
+Seeded synthetic job corpus for load-testing the platform at realistic volumes.
+
+The canonical listings in `jobs_data` only cover ten hand-written jobs. This
+module turns them into templates and combines them with precomputed value pools
+(companies, regions, seniority levels, filler sentences) to fabricate corpora of
+any size. Generation happens column-wise in fixed-size blocks, each seeded from
+the corpus seed and its block index, so any slice of the corpus can be rebuilt
+independently and the same seed always yields the same jobs.
+"""
+
+import random
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from job_scrapper_contracts import Job, JobDict
+
+from .descriptions import DescriptionGenerator, LengthDistribution
+from .identity import combine_identity, text_hash
+from .jobs_data import get_mock_jobs_as_dicts, job_from_dict
+
+BLOCK_SIZE = 4096
+"""Number of rows generated together from a single block-level RNG."""
+
+REGIONS: Tuple[str, ...] = (
+    "Poland",
+    "Ukraine",
+    "Portugal",
+    "USA",
+    "Romania",
+    "United Kingdom",
+    "Germany",
+    "Spain",
+    "Netherlands",
+    "Canada",
+)
+
+SENIORITY_LEVELS: Tuple[Tuple[str, str, float, float], ...] = (
+    # (name, title prefix, salary multiplier, experience multiplier)
+    ("junior", "Junior ", 0.6, 0.4),
+    ("mid", "", 1.0, 1.0),
+    ("senior", "Senior ", 1.4, 1.5),
+    ("lead", "Lead ", 1.8, 2.0),
+)
+
+FILLER_SENTENCES: Tuple[str, ...] = (
+    "You will own features end to end, from design discussions to production rollout.",
+    "We value clear written communication and thoughtful code review.",
+    "The team works in two-week iterations with a strong focus on automated testing.",
+    "Flexible working hours and a yearly learning budget are part of the package.",
+    "You will mentor teammates and help shape our engineering practices.",
+    "Our customers rely on the platform every day, so reliability matters to us.",
+    "We offer paid time off, private medical insurance and modern equipment.",
+    "Experience with cloud infrastructure and observability tooling is a plus.",
+    "You will collaborate with product, design and data teams across time zones.",
+    "We run a blameless post-incident culture and invest in developer tooling.",
+    "The hiring process consists of an intro call, a technical interview and a team chat.",
+    "We are a distributed company with hubs in several European cities.",
+)
+
+COMPANY_POOL_SIZE = 512
+POSTING_LIFETIME = timedelta(days=30)
+SALARY_JITTER_STEPS = 16
+DRAW_RANGE = 1 << 16
+CAN_APPLY_THRESHOLD = int(0.9 * DRAW_RANGE)
+
+COLUMN_TYPECODES: Dict[str, str] = {
+    "template": "H",
+    "seniority": "B",
+    "region": "H",
+    "is_remote": "B",
+    "can_apply": "B",
+    "company": "H",
+    "salary_min": "I",
+    "salary_max": "I",
+    "posted": "I",
+    "description_length": "I",
+}
+"""`array` typecode of every corpus column, in storage order."""
+
+COLUMN_NAMES: Tuple[str, ...] = tuple(COLUMN_TYPECODES)
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Parameters describing a synthetic corpus.
+
+    Attributes:
+        size: Number of jobs in the corpus.
+        seed: Seed controlling every random choice; equal specs yield equal corpora.
+        category_weights: Relative weight per category (e.g. ``{"AI": 3, "Backend": 1}``).
+            Categories that are not listed are excluded; ``None`` weights them equally.
+        region_weights: Relative weight per region, defaulting to `REGIONS` equally.
+        seniority_weights: Relative weight per seniority level (``junior``, ``mid``,
+            ``senior``, ``lead``), which drives title prefixes and the salary mix.
+        remote_ratio: Share of jobs flagged as remote.
+        description_length: Inclusive ``(min, max)`` description length in characters.
+        description_lengths: Distribution of description lengths. When set, every
+            job gets its own multi-paragraph description from a
+            `DescriptionGenerator` and ``description_length`` is ignored;
+            otherwise descriptions are template text padded with filler sentences.
+        posted_window_days: Jobs are posted within this many days before `reference_date`.
+        reference_date: Upper bound for ``date_posted``.
+    """
+
+    size: int = 10_000
+    seed: int = 0
+    category_weights: Optional[Mapping[str, float]] = None
+    region_weights: Optional[Mapping[str, float]] = None
+    seniority_weights: Optional[Mapping[str, float]] = None
+    remote_ratio: float = 0.7
+    description_length: Tuple[int, int] = (200, 1200)
+    description_lengths: Optional[LengthDistribution] = None
+    posted_window_days: int = 30
+    reference_date: datetime = field(default_factory=lambda: datetime(2025, 11, 1))
+
+    def __post_init__(self) -> None:
+        if self.size < 0:
+            raise ValueError("Corpus size must be non-negative")
+        low, high = self.description_length
+        if low < 0 or high < low:
+            raise ValueError("description_length must be a non-negative (min, max) range")
+        if not 0.0 <= self.remote_ratio <= 1.0:
+            raise ValueError("remote_ratio must be between 0 and 1")
+        if self.posted_window_days < 1:
+            raise ValueError("posted_window_days must be at least 1")
+
+
+@dataclass(frozen=True)
+class JobTemplate:
+    """Static fields shared by every job generated from one canonical listing."""
+
+    title: str
+    description: str
+    category: str
+    industry: str
+    employment_type: str
+    experience_months: float
+    currency: str
+    salary_min: int
+    salary_max: int
+
+
+@dataclass
+class CorpusColumns:
+    """Column-wise encoding of one block of the corpus.
+
+    Every column holds one entry per row and refers to the value pools of the
+    owning corpus; strings are only produced when rows are materialised. Columns
+    are `array` instances for generated blocks and read-only `memoryview`
+    slices for memory-mapped snapshots.
+    """
+
+    start: int
+    template: Sequence[int]
+    seniority: Sequence[int]
+    region: Sequence[int]
+    is_remote: Sequence[int]
+    can_apply: Sequence[int]
+    company: Sequence[int]
+    salary_min: Sequence[int]
+    salary_max: Sequence[int]
+    posted: Sequence[int]
+    description_length: Sequence[int]
+
+    def __len__(self) -> int:
+        return len(self.template)
+
+    def truncate(self, count: int) -> None:
+        """Drop every row from ``count`` onwards."""
+        for name in COLUMN_NAMES:
+            del getattr(self, name)[count:]
+
+
+class JobRenderer:
+    """Turns corpus columns back into job dictionaries using the string pools.
+
+    The renderer only needs the pools referenced by the columns, so it can be
+    rebuilt from a snapshot without regenerating anything.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[JobTemplate],
+        regions: Sequence[str],
+        companies: Sequence[str],
+        websites: Sequence[str],
+        long_descriptions: Sequence[str],
+        window_start: datetime,
+        window_minutes: int,
+        descriptions: Optional[DescriptionGenerator] = None,
+    ) -> None:
+        self.templates = list(templates)
+        self.descriptions = descriptions
+        self.regions = list(regions)
+        self.companies = list(companies)
+        self.websites = list(websites)
+        self.long_descriptions = list(long_descriptions)
+        self.window_start = window_start
+        self.window_minutes = window_minutes
+        self.profiles = [
+            (
+                prefix + template.title,
+                template.category,
+                template.employment_type,
+                template.industry,
+                template.currency,
+                template.experience_months * experience_factor,
+            )
+            for template in self.templates
+            for _, prefix, _, experience_factor in SENIORITY_LEVELS
+        ]
+        # Per-value hashes combined into each row's content id (see `identity`).
+        self.profile_hashes = [text_hash(profile[0], profile[2]) for profile in self.profiles]
+        self.company_hashes = [
+            text_hash(company, website) for company, website in zip(self.companies, self.websites)
+        ]
+        self.region_hashes = [text_hash(region) for region in self.regions]
+        self._descriptions: Dict[Tuple[int, int], str] = {}
+        self._timestamps: List[Optional[Tuple[str, str, int]]] = [None] * window_minutes
+
+    def timestamps(self, minute: int) -> Tuple[str, str, int]:
+        """Return ``date_posted``, ``valid_through`` and the posting hash for a minute offset."""
+        cached = self._timestamps[minute]
+        if cached is None:
+            posted = self.window_start + timedelta(minutes=minute)
+            date_posted = posted.isoformat(timespec="microseconds")
+            cached = (
+                date_posted,
+                (posted + POSTING_LIFETIME).isoformat(timespec="microseconds"),
+                text_hash(date_posted),
+            )
+            self._timestamps[minute] = cached
+        return cached
+
+    def description(self, template: int, length: int) -> str:
+        """Return the description of ``template`` cut to roughly ``length`` characters."""
+        key = (template, length)
+        cached = self._descriptions.get(key)
+        if cached is None:
+            cached = _truncate(self.long_descriptions[template], length)
+            self._descriptions[key] = cached
+        return cached
+
+    def dicts(self, columns: CorpusColumns, offsets: Iterable[int]) -> List[JobDict]:
+        """Materialise the given row offsets of ``columns`` as job dictionaries."""
+        profiles = self.profiles
+        companies = self.companies
+        websites = self.websites
+        regions = self.regions
+        timestamps = self.timestamps
+        description = self.description
+        levels = len(SENIORITY_LEVELS)
+        template_column = columns.template
+        seniority_column = columns.seniority
+        company_column = columns.company
+        region_column = columns.region
+        remote_column = columns.is_remote
+        can_apply_column = columns.can_apply
+        salary_min_column = columns.salary_min
+        salary_max_column = columns.salary_max
+        posted_column = columns.posted
+        length_column = columns.description_length
+        profile_hashes = self.profile_hashes
+        company_hashes = self.company_hashes
+        region_hashes = self.region_hashes
+
+        generated: Optional[Iterator[str]] = None
+        if self.descriptions is not None:
+            # Generate the whole batch's descriptions at once, keyed by row content
+            # so a row gets the same text however the corpus is sharded.
+            offsets = list(offsets)
+            intros = [template.description for template in self.templates]
+            generated = iter(
+                self.descriptions.generate(
+                    [length_column[offset] for offset in offsets],
+                    [
+                        posted_column[offset] * COMPANY_POOL_SIZE + company_column[offset]
+                        for offset in offsets
+                    ],
+                    [intros[template_column[offset]] for offset in offsets],
+                )
+            )
+
+        job_dicts: List[JobDict] = []
+        append = job_dicts.append
+        for offset in offsets:
+            template = template_column[offset]
+            profile = template * levels + seniority_column[offset]
+            title, category, employment_type, industry, currency, experience = profiles[profile]
+            company = company_column[offset]
+            website = websites[company]
+            region = region_column[offset]
+            is_remote = remote_column[offset] == 1
+            if generated is None:
+                text = description(template, length_column[offset])
+            else:
+                text = next(generated)
+            date_posted, valid_through, posting = timestamps(posted_column[offset])
+            # Equal to `content_job_id` of the rendered row, from cached partial hashes.
+            job_id = combine_identity(
+                profile_hashes[profile],
+                company_hashes[company],
+                region_hashes[region],
+                posting,
+                is_remote,
+                len(text),
+            )
+            append(
+                {
+                    "job_id": job_id,
+                    "title": title,
+                    "url": f"{website}/careers/{job_id}",
+                    "description": text,
+                    "company": {"name": companies[company], "website": website},
+                    "category": category,
+                    "date_posted": date_posted,
+                    "valid_through": valid_through,
+                    "employment_type": employment_type,
+                    "salary": {
+                        "currency": currency,
+                        "min_value": salary_min_column[offset],
+                        "max_value": salary_max_column[offset],
+                    },
+                    "location": {
+                        "region": regions[region],
+                        "is_remote": is_remote,
+                        "can_apply": can_apply_column[offset] == 1,
+                    },
+                    "experience_months": experience,
+                    "industry": industry,
+                    "source": "mock",
+                }
+            )
+        return job_dicts
+
+
+class _ValuePools(JobRenderer):
+    """Precomputed value pools derived from the spec and the canonical listings."""
+
+    def __init__(self, spec: CorpusSpec) -> None:
+        templates = _load_templates()
+        regions, region_weights = _weighted_pool(
+            REGIONS, spec.region_weights, "region", allow_extra=True
+        )
+        companies, websites = _company_pool(spec.seed)
+        pool_rng = random.Random(f"{spec.seed}:pools")
+        long_descriptions = [
+            _long_description(template.description, spec.description_length[1], pool_rng)
+            for template in templates
+        ]
+        reference = spec.reference_date.replace(second=0, microsecond=0)
+        super().__init__(
+            templates=templates,
+            regions=regions,
+            companies=companies,
+            websites=websites,
+            long_descriptions=long_descriptions,
+            window_start=reference - timedelta(days=spec.posted_window_days),
+            window_minutes=spec.posted_window_days * 24 * 60,
+            descriptions=(
+                DescriptionGenerator(spec.seed, min_length=spec.description_lengths.low)
+                if spec.description_lengths
+                else None
+            ),
+        )
+
+        self.template_table = _lookup_table(_template_weights(templates, spec.category_weights))
+        self.region_table = _lookup_table(region_weights)
+        seniority_names = tuple(level[0] for level in SENIORITY_LEVELS)
+        _, seniority_weights = _weighted_pool(seniority_names, spec.seniority_weights, "seniority")
+        self.seniority_table = _lookup_table(seniority_weights)
+        self.remote_threshold = int(spec.remote_ratio * DRAW_RANGE)
+
+        # Salary bands are indexed by (template, seniority, jitter step) so rows only
+        # need a table lookup instead of floating point arithmetic.
+        self.salary_min: List[int] = []
+        self.salary_max: List[int] = []
+        for template in templates:
+            for _, _, salary_factor, _ in SENIORITY_LEVELS:
+                for step in range(SALARY_JITTER_STEPS):
+                    factor = salary_factor * (0.9 + 0.2 * step / (SALARY_JITTER_STEPS - 1))
+                    self.salary_min.append(int(template.salary_min * factor) // 100 * 100)
+                    self.salary_max.append(int(template.salary_max * factor) // 100 * 100)
+
+
+class ColumnarCorpus:
+    """Block-addressable corpus whose rows are stored as `CorpusColumns`.
+
+    Subclasses provide the row count, the `JobRenderer` and the columns of each
+    block; iteration and materialisation are shared.
+    """
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def renderer(self) -> JobRenderer:
+        raise NotImplementedError
+
+    def columns(self, block_index: int) -> CorpusColumns:
+        raise NotImplementedError
+
+    @property
+    def block_count(self) -> int:
+        return -(-len(self) // BLOCK_SIZE)
+
+    def iter_columns(self, start: int = 0, stop: Optional[int] = None) -> Iterator[CorpusColumns]:
+        """Yield the blocks overlapping rows ``[start, stop)`` in order."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        for block_index in range(start // BLOCK_SIZE, -(-stop // BLOCK_SIZE)):
+            yield self.columns(block_index)
+
+    def all_columns(self) -> CorpusColumns:
+        """Return the whole corpus as a single set of columns starting at row 0."""
+        merged = self.empty_columns()
+        for columns in self.iter_columns():
+            for name in COLUMN_NAMES:
+                getattr(merged, name).extend(getattr(columns, name))
+        return merged
+
+    @staticmethod
+    def empty_columns() -> CorpusColumns:
+        """Return a column set without rows."""
+        return CorpusColumns(0, *(array(COLUMN_TYPECODES[name]) for name in COLUMN_NAMES))
+
+    def row_dict(self, columns: CorpusColumns, offset: int) -> JobDict:
+        """Materialise row ``offset`` of ``columns`` as a job dictionary."""
+        return self.dicts(columns, (offset,))[0]
+
+    def block_dicts(self, columns: CorpusColumns, first: int, last: int) -> List[JobDict]:
+        """Materialise rows ``[first, last)`` of ``columns`` as job dictionaries."""
+        return self.dicts(columns, range(first, last))
+
+    def dicts(self, columns: CorpusColumns, offsets: Iterable[int]) -> List[JobDict]:
+        """Materialise the given row offsets of ``columns`` as job dictionaries."""
+        return self.renderer.dicts(columns, offsets)
+
+    def iter_job_dicts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[JobDict]:
+        """Lazily yield job dictionaries for rows ``[start, stop)``."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for columns in self.iter_columns(start, stop):
+            first = max(start - columns.start, 0)
+            last = min(stop - columns.start, len(columns))
+            yield from self.block_dicts(columns, first, last)
+
+    def job_dict(self, row: int) -> JobDict:
+        """Return the job dictionary stored at ``row``."""
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row {row} is out of range")
+        columns = self.columns(row // BLOCK_SIZE)
+        return self.row_dict(columns, row - columns.start)
+
+
+class SyntheticCorpus(ColumnarCorpus):
+    """Deterministic, randomly accessible corpus of fabricated job listings.
+
+    Rows are generated block by block, so a corpus of any size costs nothing
+    until rows are requested, and a larger corpus with the same spec always
+    starts with the rows of a smaller one.
+    """
+
+    def __init__(self, spec: Optional[CorpusSpec] = None) -> None:
+        self.spec = spec or CorpusSpec()
+        self._pools: Optional[_ValuePools] = None
+
+    def __len__(self) -> int:
+        return self.spec.size
+
+    @property
+    def pools(self) -> _ValuePools:
+        if self._pools is None:
+            self._pools = _ValuePools(self.spec)
+        return self._pools
+
+    @property
+    def renderer(self) -> JobRenderer:
+        return self.pools
+
+    def columns(self, block_index: int) -> CorpusColumns:
+        """Generate the columns of one block; the result only depends on the spec."""
+        if not 0 <= block_index < self.block_count:
+            raise IndexError(f"Block {block_index} is out of range")
+
+        pools = self.pools
+        start = block_index * BLOCK_SIZE
+        count = min(BLOCK_SIZE, self.spec.size - start)
+        rng = random.Random(f"{self.spec.seed}:{block_index}")
+
+        # Every column is drawn for a full block and then trimmed, so the values of
+        # a row never depend on the corpus size.
+        template_table = pools.template_table
+        template = array("H", [template_table[draw] for draw in _draws(rng)])
+        seniority_table = pools.seniority_table
+        seniority = array("B", [seniority_table[draw] for draw in _draws(rng)])
+        region_table = pools.region_table
+        region = array("H", [region_table[draw] for draw in _draws(rng)])
+        threshold = pools.remote_threshold
+        is_remote = array("B", [draw < threshold for draw in _draws(rng)])
+        can_apply = array("B", [draw < CAN_APPLY_THRESHOLD for draw in _draws(rng)])
+        company = array("H", [draw % COMPANY_POOL_SIZE for draw in _draws(rng)])
+        minutes = pools.window_minutes
+        posted = array("I", [draw % minutes for draw in _draws(rng, wide=True)])
+        lengths = self.spec.description_lengths
+        if lengths is None:
+            low, high = self.spec.description_length
+            span = high - low + 1
+            description_length = array("I", [low + draw % span for draw in _draws(rng, wide=True)])
+        else:
+            length_table = lengths.table()
+            description_length = array(
+                "I", [length_table[draw >> 16] for draw in _draws(rng, wide=True)]
+            )
+
+        levels = len(SENIORITY_LEVELS)
+        bands = [
+            (
+                (template[i] * levels + seniority[i]) * SALARY_JITTER_STEPS
+                + draw % SALARY_JITTER_STEPS
+            )
+            for i, draw in enumerate(_draws(rng))
+        ]
+        salary_min_table = pools.salary_min
+        salary_max_table = pools.salary_max
+        salary_min = array("I", [salary_min_table[band] for band in bands])
+        salary_max = array("I", [salary_max_table[band] for band in bands])
+
+        columns = CorpusColumns(
+            start=start,
+            template=template,
+            seniority=seniority,
+            region=region,
+            is_remote=is_remote,
+            can_apply=can_apply,
+            company=company,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            posted=posted,
+            description_length=description_length,
+        )
+        if count < BLOCK_SIZE:
+            columns.truncate(count)
+        return columns
+
+
+class ShardedCorpus(ColumnarCorpus):
+    """Deterministic shard of another corpus made of every ``shard_count``-th block.
+
+    Shard ``i`` owns global blocks ``i``, ``i + shard_count``, ... of the base
+    corpus. Shards are disjoint, their union is the base corpus, and job ids are
+    derived from content, so replicas that share a seed serve non-overlapping but
+    reproducible job sets.
+    """
+
+    def __init__(self, base: ColumnarCorpus, shard_index: int, shard_count: int) -> None:
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        self.base = base
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        base_blocks = base.block_count
+        self._block_count = max(0, -(-(base_blocks - shard_index) // shard_count))
+        size = self._block_count * BLOCK_SIZE
+        if self._block_count and self._global_block(self._block_count - 1) == base_blocks - 1:
+            # The final, possibly partial, base block belongs to this shard.
+            size -= base_blocks * BLOCK_SIZE - len(base)
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def renderer(self) -> JobRenderer:
+        return self.base.renderer
+
+    def columns(self, block_index: int) -> CorpusColumns:
+        if not 0 <= block_index < self._block_count:
+            raise IndexError(f"Block {block_index} is out of range")
+        columns = self.base.columns(self._global_block(block_index))
+        return replace(columns, start=block_index * BLOCK_SIZE)
+
+    def _global_block(self, block_index: int) -> int:
+        return block_index * self.shard_count + self.shard_index
+
+
+def generate_jobs_as_dicts(spec: Optional[CorpusSpec] = None) -> List[JobDict]:
+    """Build a full synthetic corpus in dictionary form."""
+    return list(SyntheticCorpus(spec).iter_job_dicts())
+
+
+def generate_jobs(spec: Optional[CorpusSpec] = None) -> List[Job]:
+    """Build a full synthetic corpus as `Job` objects."""
+    return [job_from_dict(job_dict) for job_dict in SyntheticCorpus(spec).iter_job_dicts()]
+
+
+def _load_templates() -> List[JobTemplate]:
+    templates = []
+    for job_dict in get_mock_jobs_as_dicts():
+        salary = job_dict["salary"]
+        templates.append(
+            JobTemplate(
+                title=job_dict["title"],
+                description=job_dict["description"],
+                category=job_dict["category"],
+                industry=job_dict["industry"],
+                employment_type=job_dict["employment_type"],
+                experience_months=job_dict["experience_months"],
+                currency=salary["currency"],
+                salary_min=salary["min_value"],
+                salary_max=salary["max_value"],
+            )
+        )
+    return templates
+
+
+def _template_weights(
+    templates: Sequence[JobTemplate], category_weights: Optional[Mapping[str, float]]
+) -> List[float]:
+    if category_weights is None:
+        return [1.0] * len(templates)
+
+    known = {template.category for template in templates}
+    unknown = set(category_weights) - known
+    if unknown:
+        raise ValueError(f"Unknown categories in category_weights: {sorted(unknown)}")
+
+    per_category: Dict[str, int] = {}
+    for template in templates:
+        per_category[template.category] = per_category.get(template.category, 0) + 1
+    weights = [
+        category_weights.get(template.category, 0.0) / per_category[template.category]
+        for template in templates
+    ]
+    if not any(weight > 0 for weight in weights):
+        raise ValueError("category_weights must give at least one category a positive weight")
+    return weights
+
+
+def _weighted_pool(
+    names: Sequence[str],
+    weights: Optional[Mapping[str, float]],
+    label: str,
+    allow_extra: bool = False,
+) -> Tuple[Tuple[str, ...], List[float]]:
+    if weights is None:
+        return tuple(names), [1.0] * len(names)
+    unknown = set(weights) - set(names)
+    if unknown and not allow_extra:
+        raise ValueError(f"Unknown {label} values: {sorted(unknown)}")
+    pool = tuple(names) + tuple(sorted(unknown))
+    resolved = [float(weights.get(name, 0.0)) for name in pool]
+    if not any(weight > 0 for weight in resolved):
+        raise ValueError(f"{label} weights must contain at least one positive weight")
+    return pool, resolved
+
+
+def _lookup_table(weights: Sequence[float]) -> List[int]:
+    """Map every 16-bit draw onto a pool index with probability proportional to weights."""
+    if any(weight < 0 for weight in weights):
+        raise ValueError("Weights must be non-negative")
+    total = float(sum(weights))
+    cumulative = []
+    running = 0.0
+    for weight in weights:
+        running += weight
+        cumulative.append(running / total)
+    last = len(weights) - 1
+    return [
+        min(bisect_right(cumulative, (draw + 0.5) / DRAW_RANGE), last) for draw in range(DRAW_RANGE)
+    ]
+
+
+def _draws(rng: random.Random, wide: bool = False) -> array:
+    """Draw one random 16-bit (or 32-bit when ``wide``) value per row of a block."""
+    typecode = "I" if wide else "H"
+    draws = array(typecode)
+    draws.frombytes(rng.randbytes(BLOCK_SIZE * draws.itemsize))
+    return draws
+
+
+def _company_pool(seed: int) -> Tuple[List[str], List[str]]:
+    # Imported here so that only building value pools pays for `faker`.
+    from faker import Faker
+
+    pool_faker = Faker()
+    pool_faker.seed_instance(seed)
+    companies = [pool_faker.company() for _ in range(COMPANY_POOL_SIZE)]
+    websites = [
+        f"https://{pool_faker.domain_word()}-{index}.{pool_faker.tld()}"
+        for index in range(COMPANY_POOL_SIZE)
+    ]
+    return companies, websites
+
+
+def _long_description(base: str, target: int, rng: random.Random) -> str:
+    sentences = list(FILLER_SENTENCES)
+    rng.shuffle(sentences)
+    parts = [base]
+    length = len(base)
+    index = 0
+    while length < target:
+        sentence = sentences[index % len(sentences)]
+        parts.append(sentence)
+        length += len(sentence) + 1
+        index += 1
+    return " ".join(parts)
+
+
+def _truncate(text: str, length: int) -> str:
+    if length >= len(text):
+        return text
+    cut = text.rfind(" ", 0, length)
+    return text[: cut if cut > 0 else length]
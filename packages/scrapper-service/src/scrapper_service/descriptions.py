@@ -0,0 +1,448 @@
+"""
+Bulk generator of realistic-length, multi-paragraph job descriptions.
+
+Real postings run from about 2 to 20 KB, and their size drives downstream token
+budgets and message sizes. `DescriptionGenerator` renders a pool of paragraphs
+and bullet lists for every section of a posting once, by filling sentence
+templates from vocabulary tables. A description is then assembled from those
+blocks under section headings, section by section, until it reaches its target
+length, and cut back to the last full sentence. No text is built character by
+character: a batch draws its block picks from a precomputed index table and
+joins precomputed strings.
+
+Target lengths come from a `LengthDistribution`, sampled a whole batch at a
+time through a 65536-entry inverse-CDF lookup table, the same way the corpus
+draws its other columns.
+"""
+
+import math
+import random
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LENGTH_TABLE_SIZE = 1 << 16
+PICK_TABLE_SIZE = 1 << 16
+DEFAULT_BLOCKS_PER_SECTION = 96
+_PICK_STRIDE = 0x9E3779B1
+_SEPARATOR = "\n\n"
+
+TECHNOLOGIES: Tuple[str, ...] = (
+    "Python",
+    "Go",
+    "TypeScript",
+    "React",
+    "Kotlin",
+    "Rust",
+    "Java",
+    "PostgreSQL",
+    "Kafka",
+    "Redis",
+    "Kubernetes",
+    "Terraform",
+    "AWS",
+    "GCP",
+    "Docker",
+    "GraphQL",
+    "gRPC",
+    "Airflow",
+    "Spark",
+    "dbt",
+    "Snowflake",
+    "FastAPI",
+    "Django",
+    "Node.js",
+    "Elasticsearch",
+    "ClickHouse",
+    "PyTorch",
+    "OpenTelemetry",
+    "Prometheus",
+    "RabbitMQ",
+)
+PLATFORMS: Tuple[str, ...] = (
+    "AWS",
+    "GCP",
+    "Azure",
+    "Kubernetes",
+    "our own data centres",
+    "Cloudflare Workers",
+    "Heroku",
+    "Nomad",
+)
+DOMAINS: Tuple[str, ...] = (
+    "payments",
+    "logistics",
+    "healthcare",
+    "e-commerce",
+    "online learning",
+    "fintech",
+    "travel",
+    "media streaming",
+    "recruiting",
+    "energy",
+    "insurance",
+    "developer tooling",
+    "cybersecurity",
+    "marketplace",
+    "mobility",
+)
+TEAMS: Tuple[str, ...] = (
+    "platform",
+    "data",
+    "growth",
+    "core product",
+    "infrastructure",
+    "search",
+    "machine learning",
+    "mobile",
+    "payments",
+    "identity",
+    "analytics",
+    "customer experience",
+)
+ARTIFACTS: Tuple[str, ...] = (
+    "public APIs",
+    "internal services",
+    "data pipelines",
+    "deployment tooling",
+    "customer-facing features",
+    "event-driven workflows",
+    "reporting dashboards",
+    "recommendation models",
+    "design system components",
+    "integration layers",
+    "billing flows",
+    "observability stack",
+)
+VERBS: Tuple[str, ...] = (
+    "design",
+    "build",
+    "scale",
+    "maintain",
+    "modernise",
+    "own",
+    "improve",
+    "ship",
+    "operate",
+    "simplify",
+)
+QUALITIES: Tuple[str, ...] = (
+    "reliability",
+    "latency",
+    "developer experience",
+    "cost efficiency",
+    "security",
+    "accessibility",
+    "data quality",
+    "test coverage",
+    "release speed",
+    "observability",
+)
+BENEFITS: Tuple[str, ...] = (
+    "a yearly learning budget",
+    "private medical insurance",
+    "flexible working hours",
+    "26 days of paid time off",
+    "a home office allowance",
+    "stock options",
+    "parental leave beyond the statutory minimum",
+    "a wellbeing stipend",
+    "conference travel",
+    "a new laptop of your choice",
+    "quarterly team offsites",
+    "a four-day week in summer",
+)
+COUNTS: Tuple[str, ...] = ("two", "three", "four", "five", "six", "eight", "ten", "twelve")
+
+SECTIONS: Tuple[Tuple[str, float, Tuple[str, ...]], ...] = (
+    # (heading, share of the description, sentence templates)
+    (
+        "About the role",
+        0.15,
+        (
+            (
+                "You will join our {team} team, which builds the {artifact} "
+                "behind our {domain} product."
+            ),
+            "The team is {count} engineers strong and works closely with product and design.",
+            "This role has a direct impact on {quality} for thousands of customers every day.",
+            "We are growing quickly in {domain} and need help to {verb} what comes next.",
+            "You will report to the engineering manager of the {team} group.",
+            "Most of our work happens in {tech} and {tech2}, deployed on {platform}.",
+        ),
+    ),
+    (
+        "What you will do",
+        0.25,
+        (
+            "{Verb} and {verb2} {artifact} in {tech}.",
+            (
+                "Work with product managers to turn customer problems "
+                "into small, shippable increments."
+            ),
+            "Improve {quality} across the {team} stack and measure the results.",
+            "Review code, write design documents and share what you learn with the team.",
+            "Take part in a fair on-call rotation for the services you own.",
+            "{Verb} {artifact} that other teams depend on, with clear contracts and documentation.",
+            "Partner with the {team2} team on migrations to {tech2}.",
+            "Mentor engineers and help shape how we hire and onboard.",
+        ),
+    ),
+    (
+        "What we are looking for",
+        0.25,
+        (
+            "{count_cap} or more years of professional experience with {tech}.",
+            "Hands-on experience running {tech2} in production.",
+            "A track record of improving {quality} in systems that matter to users.",
+            "Comfort working with ambiguity and breaking large problems into small steps.",
+            "Clear written communication; much of our collaboration is asynchronous.",
+            "Experience with {tech3} or a willingness to learn it quickly.",
+            "Experience operating services on {platform}.",
+            "Familiarity with {domain} is a plus but not a requirement.",
+            "Care for testing, code review and maintainable design.",
+        ),
+    ),
+    (
+        "Nice to have",
+        0.1,
+        (
+            "Experience with {tech} at scale.",
+            "Contributions to open source projects around {tech2}.",
+            "Background in {domain} or another regulated industry.",
+            "Interest in {quality} and the tooling that supports it.",
+            "Experience working in a distributed team across time zones.",
+        ),
+    ),
+    (
+        "What we offer",
+        0.15,
+        (
+            "Competitive salary and {benefit}.",
+            "{Benefit_cap} and {benefit2}.",
+            "Remote-friendly work with hubs in {count} cities.",
+            "A culture of blameless post-mortems and sustainable pace.",
+            "Time set aside every sprint to improve {quality}.",
+            "Budget for the tools and equipment you need, including {benefit}.",
+        ),
+    ),
+    (
+        "Our hiring process",
+        0.1,
+        (
+            "An intro call with a recruiter to talk about your goals.",
+            "A technical conversation about a system you built with {tech}.",
+            "A paired exercise with {count} engineers from the {team} team.",
+            "A final chat with the hiring manager about how we work.",
+            "We aim to give you a decision within {count} working days.",
+        ),
+    ),
+)
+"""Sections of a posting in order, with their share of the length and sentence templates."""
+
+
+@dataclass(frozen=True)
+class LengthDistribution:
+    """Distribution of description lengths in characters.
+
+    Lengths are log-normal around ``median`` with shape ``sigma``, or uniform
+    when ``median`` is ``None``, and always clamped to ``[low, high]``.
+
+    Attributes:
+        low: Shortest length.
+        high: Longest length.
+        median: Median of the log-normal distribution.
+        sigma: Shape of the log-normal distribution.
+    """
+
+    low: int = 2048
+    high: int = 20480
+    median: Optional[int] = None
+    sigma: float = 0.6
+
+    def __post_init__(self) -> None:
+        if self.low < 0 or self.high < self.low:
+            raise ValueError("A length distribution needs a non-negative (low, high) range")
+        if self.median is not None and (self.median <= 0 or self.sigma < 0):
+            raise ValueError("A log-normal length distribution needs a positive median and sigma")
+
+    def table(self) -> "array[int]":
+        """Return the length at each of `LENGTH_TABLE_SIZE` evenly spaced quantiles."""
+        return _length_table(self)
+
+    def sample(self, count: int, rng: random.Random) -> "array[int]":
+        """Draw ``count`` lengths at once."""
+        draws = array("H")
+        draws.frombytes(rng.randbytes(count * draws.itemsize))
+        return array("I", map(self.table().__getitem__, draws))
+
+
+LENGTH_DISTRIBUTIONS: Dict[str, LengthDistribution] = {
+    "realistic": LengthDistribution(2048, 20480, median=5000, sigma=0.6),
+    "uniform": LengthDistribution(2048, 20480),
+    "long": LengthDistribution(10240, 20480, median=15000, sigma=0.2),
+}
+"""Named length distributions: ``realistic`` clusters around 5 KB with a long tail to 20 KB."""
+
+
+class DescriptionGenerator:
+    """Assembles descriptions of a target length from precomputed section blocks.
+
+    The same ``seed`` always yields the same blocks, and the same key, length
+    and intro always yield the same description. Descriptions are never cut
+    shorter than ``min_length`` characters, typically the ``low`` bound of the
+    `LengthDistribution` the target lengths come from.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        blocks_per_section: int = DEFAULT_BLOCKS_PER_SECTION,
+        min_length: int = 0,
+    ) -> None:
+        if blocks_per_section < 1:
+            raise ValueError("blocks_per_section must be at least 1")
+        if min_length < 0:
+            raise ValueError("min_length must not be negative")
+        rng = random.Random(f"{seed}:descriptions")
+        self.seed = seed
+        self.min_length = min_length
+        shares = [share for _, share, _ in SECTIONS]
+        total = sum(shares)
+        running = 0.0
+        self.sections: List[Tuple[str, float, List[str]]] = []
+        for heading, share, templates in SECTIONS:
+            running += share
+            blocks = [_render_block(templates, rng) for _ in range(blocks_per_section)]
+            self.sections.append((heading, running / total, blocks))
+        self.openings = [
+            _render_block(SECTIONS[0][2], rng, bullets=False) for _ in range(blocks_per_section)
+        ]
+        # Back-to-back shuffles of every block, so a run of picks rarely repeats a block.
+        self.picks = array("H")
+        order = list(range(blocks_per_section))
+        while len(self.picks) < PICK_TABLE_SIZE:
+            rng.shuffle(order)
+            self.picks.extend(order)
+        del self.picks[PICK_TABLE_SIZE:]
+
+    def generate(
+        self,
+        lengths: Sequence[int],
+        keys: Optional[Sequence[int]] = None,
+        intros: Optional[Sequence[str]] = None,
+        min_length: Optional[int] = None,
+    ) -> List[str]:
+        """Return one description per target length.
+
+        ``keys`` select the block picks of each description (by default its
+        position in the batch), and ``intros`` replace the generated opening
+        paragraph. Descriptions end on the last full sentence within ``length``
+        characters that keeps them at least ``min_length`` (by default the
+        generator's) long, or else on the last word that does.
+        """
+        if keys is None:
+            keys = range(len(lengths))
+        minimum = self.min_length if min_length is None else min_length
+        picks = self.picks
+        mask = PICK_TABLE_SIZE - 1
+        sections = self.sections
+        openings = self.openings
+        separator = _SEPARATOR
+        gap = len(separator)
+        descriptions: List[str] = []
+        append = descriptions.append
+        for index, (length, key) in enumerate(zip(lengths, keys)):
+            position = (key * _PICK_STRIDE) & mask
+            opening = intros[index] if intros is not None else openings[picks[position]]
+            parts = [opening]
+            size = len(opening)
+            for heading, bound, blocks in sections:
+                goal = length * bound
+                if size >= goal:
+                    continue
+                parts.append(heading)
+                size += len(heading) + gap
+                while size < goal:
+                    position = (position + 1) & mask
+                    block = blocks[picks[position]]
+                    parts.append(block)
+                    size += len(block) + gap
+            text = separator.join(parts)
+            append(text if len(text) <= length else _cut(text, length, minimum))
+        return descriptions
+
+    def sample(self, count: int, distribution: LengthDistribution, rng: random.Random) -> List[str]:
+        """Generate ``count`` descriptions with lengths drawn from ``distribution``."""
+        lengths = distribution.sample(count, rng)
+        keys = array("H")
+        keys.frombytes(rng.randbytes(count * keys.itemsize))
+        return self.generate(lengths, keys, min_length=max(self.min_length, distribution.low))
+
+
+@lru_cache(maxsize=None)
+def _length_table(distribution: LengthDistribution) -> "array[int]":
+    low, high, median = distribution.low, distribution.high, distribution.median
+    quantiles = ((draw + 0.5) / LENGTH_TABLE_SIZE for draw in range(LENGTH_TABLE_SIZE))
+    if median is None:
+        values = (low + (high - low) * quantile for quantile in quantiles)
+    else:
+        from statistics import NormalDist
+
+        normal = NormalDist()
+        values = (
+            median * math.exp(distribution.sigma * normal.inv_cdf(quantile))
+            for quantile in quantiles
+        )
+    return array("I", [min(max(int(value), low), high) for value in values])
+
+
+def _render_block(templates: Sequence[str], rng: random.Random, bullets: bool = True) -> str:
+    """Fill 3-6 sentence templates into a paragraph or a bullet list."""
+    chosen = rng.sample(templates, min(len(templates), rng.randint(3, 6)))
+    sentences = [_fill(template, rng) for template in chosen]
+    if not bullets or rng.random() < 0.4:
+        return " ".join(sentences)
+    return "\n".join("- " + sentence for sentence in sentences)
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    techs = rng.sample(TECHNOLOGIES, 3)
+    teams = rng.sample(TEAMS, 2)
+    verbs = rng.sample(VERBS, 2)
+    benefits = rng.sample(BENEFITS, 2)
+    count = rng.choice(COUNTS)
+    return template.format(
+        tech=techs[0],
+        tech2=techs[1],
+        tech3=techs[2],
+        platform=rng.choice(PLATFORMS),
+        team=teams[0],
+        team2=teams[1],
+        verb=verbs[0],
+        verb2=verbs[1],
+        Verb=verbs[0].capitalize(),
+        domain=rng.choice(DOMAINS),
+        artifact=rng.choice(ARTIFACTS),
+        quality=rng.choice(QUALITIES),
+        benefit=benefits[0],
+        benefit2=benefits[1],
+        Benefit_cap=benefits[0][0].upper() + benefits[0][1:],
+        count=count,
+        count_cap=count.capitalize(),
+    )
+
+
+def _cut(text: str, length: int, minimum: int = 0) -> str:
+    """Cut ``text`` to at most ``length`` and at least ``minimum`` characters.
+
+    The cut follows the last full sentence that ends in that range, or else the
+    last word; without either, ``text`` is cut at exactly ``length``.
+    """
+    start = max(minimum - 1, 0)
+    end = max(text.rfind(". ", start, length), text.rfind(".\n", start, length))
+    if end <= 0:
+        cut = text.rfind(" ", minimum, length)
+        return text[: cut if cut > 0 else length]
+    return text[: end + 1]
@@ -0,0 +1,230 @@
+"""
+Stable job identities and per-consumer duplicate detection.
+
+`content_job_id` derives a job's id from BLAKE2b hashes of the fields that
+identify a listing: title, company, region, posting time and so on. The same
+listing therefore keeps its id across scrapes, processes and snapshots, while
+revisions that do not change what the listing *is* (salary, expiry) keep it too.
+
+`DedupFilter` remembers which ids were already delivered to a consumer using a
+pair of rotating Bloom filters: memory is fixed up front, there are no false
+negatives for recently delivered ids, and the false-positive rate stays near the
+configured error rate no matter how many ids pass through.
+"""
+
+import math
+import struct
+import threading
+from hashlib import blake2b
+from typing import Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+from job_scrapper_contracts import JobDict
+
+ID_BITS = 63
+"""Ids are non-negative and fit a signed 64-bit integer column."""
+
+IDENTITY_SEPARATOR = "\x1f"
+_PERSON = b"scm-job-id"
+_ID_SHIFT = 64 - ID_BITS
+_ROW_KEY = struct.Struct("<QQQQIB")
+
+DEFAULT_DEDUP_CAPACITY = 1_000_000
+"""Smallest capacity a manager gives a consumer's filter, whatever the corpus size."""
+DEFAULT_DEDUP_ERROR_RATE = 0.001
+MAX_DEDUP_CONSUMERS = 256
+"""Consumers tracked at once; the least recently active one is forgotten first."""
+DEFAULT_DEDUP_MAX_BYTES = 128 * 1024 * 1024
+"""Memory of all consumers' filters together before the least recently active is forgotten."""
+
+
+def _digest(data: bytes) -> int:
+    digest = blake2b(data, digest_size=8, person=_PERSON).digest()
+    return int.from_bytes(digest, "little") >> _ID_SHIFT
+
+
+def text_hash(*fields: Optional[str]) -> int:
+    """Hash a group of string fields; missing fields hash like empty strings."""
+    key = IDENTITY_SEPARATOR.join(field or "" for field in fields)
+    return _digest(key.encode("utf-8"))
+
+
+def combine_identity(
+    role: int,
+    company: int,
+    region: int,
+    posting: int,
+    is_remote: bool,
+    description_length: int,
+) -> int:
+    """Derive a job id from the `text_hash` of each identifying group of fields.
+
+    The groups are the role (title and employment type), the company (name and
+    website), the region and the posting time. Each group repeats across many
+    jobs, so the corpus renderer caches their hashes and only hashes a short
+    binary key per row.
+    """
+    key = _ROW_KEY.pack(role, company, region, posting, description_length, is_remote)
+    return _digest(key)
+
+
+def content_job_id(job_dict: JobDict) -> int:
+    """Return the stable id of a job dictionary, ignoring its current ``job_id``."""
+    company = job_dict["company"]
+    location = job_dict.get("location") or {}
+    return combine_identity(
+        text_hash(job_dict["title"], job_dict["employment_type"]),
+        text_hash(company["name"], company.get("website")),
+        text_hash(location.get("region")),
+        text_hash(job_dict["date_posted"]),
+        bool(location.get("is_remote")),
+        len(job_dict["description"]),
+    )
+
+
+class _BloomFilter:
+    __slots__ = ("bits", "size", "hashes", "count")
+
+    def __init__(self, size: int, hashes: int) -> None:
+        self.bits = bytearray((size + 7) // 8)
+        self.size = size
+        self.hashes = hashes
+        self.count = 0
+
+    def _positions(self, job_id: int) -> range:
+        # Double hashing: ids are already uniform hashes, so the high bits serve as
+        # an independent step. ``size`` is prime, so any step in [1, size) is coprime
+        # with it and the probes never cycle early. The caller reduces positions
+        # modulo ``size``.
+        size = self.size
+        step = (job_id >> 32) % (size - 1) + 1
+        first = job_id % size
+        return range(first, first + step * self.hashes, step)
+
+    def __contains__(self, job_id: int) -> bool:
+        bits = self.bits
+        size = self.size
+        for position in self._positions(job_id):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def test_and_add(self, job_id: int) -> bool:
+        """Set the bits of ``job_id`` and return whether they were all set already."""
+        bits = self.bits
+        size = self.size
+        seen = True
+        for position in self._positions(job_id):
+            position %= size
+            index = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[index] & mask:
+                seen = False
+                bits[index] |= mask
+        if not seen:
+            self.count += 1
+        return seen
+
+
+class DedupFilter:
+    """Approximate set of job ids already delivered to one consumer.
+
+    Two Bloom filters sized for ``capacity`` ids each hold the current and the
+    previous generation. When the current one is full it becomes the previous
+    one and a fresh filter takes its place, so at least the last ``capacity``
+    ids are always remembered, memory never grows, and the false-positive rate
+    stays at most about twice ``error_rate``. Ids older than two generations
+    may be reported as new again, so ``capacity`` should cover every id a
+    consumer is expected to receive; each generation takes about 1.8 bytes per
+    id at the default error rate.
+
+    Concurrent scrapes for the same consumer share its filter, so updates are
+    made under a lock.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_DEDUP_CAPACITY,
+        error_rate: float = DEFAULT_DEDUP_ERROR_RATE,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._size = _next_prime(bits)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._current = _BloomFilter(self._size, self._hashes)
+        self._previous: Optional[_BloomFilter] = None
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Upper bound of the memory held by both generations."""
+        return 2 * len(self._current.bits)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._current or (self._previous is not None and job_id in self._previous)
+
+    def add(self, job_id: int) -> bool:
+        """Record ``job_id`` and return whether it had (probably) been seen before."""
+        with self._lock:
+            if self._current.count >= self.capacity:
+                self._previous = self._current
+                self._current = _BloomFilter(self._size, self._hashes)
+            if self._current.test_and_add(job_id):
+                return True
+            return self._previous is not None and job_id in self._previous
+
+    def clear(self) -> None:
+        with self._lock:
+            self._current = _BloomFilter(self._size, self._hashes)
+            self._previous = None
+
+
+def _next_prime(number: int) -> int:
+    """Return the smallest prime at least ``number``."""
+    candidate = max(number, 2)
+    while any(candidate % divisor == 0 for divisor in range(2, math.isqrt(candidate) + 1)):
+        candidate += 1
+    return candidate
+
+
+class DedupSession:
+    """Applies a consumer's `DedupFilter` to one scrape.
+
+    In ``drop`` mode jobs already delivered to the consumer are skipped; in
+    ``mark`` mode every job is delivered and duplicates are only counted.
+    """
+
+    MODES = ("drop", "mark")
+
+    def __init__(self, dedup: DedupFilter, mode: str = "drop") -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedup mode {mode!r}; expected one of {self.MODES}")
+        self.dedup = dedup
+        self.mode = mode
+        self.duplicates = 0
+
+    def apply(self, job_dicts: Iterable[JobDict]) -> Iterator[JobDict]:
+        add = self.dedup.add
+        drop = self.mode == "drop"
+        for job_dict in job_dicts:
+            if add(job_dict["job_id"]):
+                self.duplicates += 1
+                if drop:
+                    continue
+            yield job_dict
+
+
+def dedup_request(filters: Any) -> Optional[Tuple[str, str]]:
+    """Return the ``(consumer_id, mode)`` of a request that asks for dedup.
+
+    A request opts in by naming its ``consumer_id``; ``dedup`` selects ``drop``
+    (the default) or ``mark``.
+    """
+    if not isinstance(filters, Mapping) or filters.get("consumer_id") is None:
+        return None
+    return str(filters["consumer_id"]), str(filters.get("dedup") or "drop")
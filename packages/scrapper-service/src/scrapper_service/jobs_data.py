@@ -2,32 +2,58 @@
 Mock job payloads used to emulate external scrapper providers.
 
 The helpers in this module fabricate job listings with `faker` so other packages
-can exercise integrations without calling real services. Every call generates
-fresh identifiers while preserving a predictable schema that mirrors production
-responses.
+can exercise integrations without calling real services. The `faker` values are
+seeded, so every call returns the same listings with the same content-derived
+identifiers, in a predictable schema that mirrors production responses.
 """
 
-from datetime import datetime
-from typing import List
-
-from faker import Faker
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from job_scrapper_contracts import Company, Job, JobDict, Location, Salary
 
-faker = Faker()
+from .identity import content_job_id
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+_faker: Optional["Faker"] = None
+
+CANONICAL_SEED = 0
+"""Seed of the `faker` values in the canonical listings."""
+
+
+def get_faker() -> "Faker":
+    """Return the shared `Faker` instance, importing `faker` on first use.
+
+    Importing `faker` and loading its providers is the most expensive part of
+    starting the service, so it waits until a listing is actually generated.
+    """
+    global _faker
+    if _faker is None:
+        from faker import Faker
+
+        _faker = Faker()
+    return _faker
 
 
 def get_mock_jobs_as_dicts() -> List[JobDict]:
     """Build the canonical mock job payload in dictionary form.
 
     Each dictionary follows the structure expected by downstream services,
-    mixing static descriptive strings with dynamic values generated by `faker`.
-    The function is deterministic in shape but not in values, making it suitable
-    for tests that validate schema rather than exact content.
+    mixing static descriptive strings with values generated by a seeded `faker`.
+    Every call returns the same listings, and ``job_id`` is derived from each
+    listing's content, so a listing keeps its identity across scrapes.
     """
-    return [
+    from faker import Faker
+
+    # A call-local instance: reseeding the shared one would race with other
+    # callers and hand them values from the middle of this sequence.
+    faker = Faker()
+    faker.seed_instance(CANONICAL_SEED)
+    job_dicts: List[JobDict] = [
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Backend Engineer (Python / FastAPI)",
             "url": faker.url(),
             "description": "We are looking for a Backend Engineer to join our data platform team. You'll be responsible for building scalable APIs, integrating ML services, and improving system reliability. Our stack includes FastAPI, PostgreSQL, Redis, and Docker.",
@@ -43,7 +69,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Full-stack Engineer (Node.js / Nest.js / React)",
             "url": faker.url(),
             "description": (
@@ -65,7 +91,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "DevOps Engineer (AWS / Kubernetes)",
             "url": faker.url(),
             "description": "Looking for an experienced DevOps Engineer to maintain CI/CD pipelines, automate deployments, and manage Kubernetes clusters on AWS. Strong knowledge of Terraform and observability tools required.",
@@ -81,7 +107,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Frontend Developer (React / TypeScript)",
             "url": faker.url(),
             "description": "We're hiring a Frontend Developer to build intuitive web interfaces and design systems using React and TypeScript. Collaboration with UX designers and backend engineers is a key part of this role.",
@@ -97,7 +123,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "AI Research Engineer",
             "url": faker.url(),
             "description": "Work with the latest LLM and multimodal architectures. Your mission is to fine-tune and deploy state-of-the-art AI models for text and image understanding tasks.",
@@ -113,7 +139,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Product Manager (EdTech)",
             "url": faker.url(),
             "description": "We're looking for a Product Manager to lead roadmap development and feature delivery for our online learning platform. You'll collaborate closely with design, marketing, and engineering teams.",
@@ -129,7 +155,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "AI Engineer (Python / LangChain / LangGraph)",
             "url": faker.url(),
             "description": (
@@ -151,7 +177,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "UX/UI Designer",
             "url": faker.url(),
             "description": "Join our design team to create clean, accessible, and delightful user experiences across mobile and web. You'll work closely with developers and product managers to shape our design system.",
@@ -167,7 +193,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Customer Success Manager",
             "url": faker.url(),
             "description": "We're expanding our customer success team! You'll ensure clients achieve their business goals using our SaaS platform, drive renewals, and collect product feedback.",
@@ -183,7 +209,7 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
         {
-            "job_id": faker.random_int(),
+            "job_id": 0,
             "title": "Marketing Copywriter",
             "url": faker.url(),
             "description": "We're seeking a creative copywriter to craft engaging marketing materials across social, email, and landing pages. You'll work in a fast-paced team that values clarity and storytelling.",
@@ -199,67 +225,95 @@ def get_mock_jobs_as_dicts() -> List[JobDict]:
             "source": "mock",
         },
     ]
+    for job_dict in job_dicts:
+        job_dict["job_id"] = content_job_id(job_dict)
+    return job_dicts
 
 
-def get_mock_jobs() -> List[Job]:
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp as a naive UTC `datetime`, like the mock data.
+
+    Timezone-aware values (including a ``Z`` suffix) are converted to UTC.
     """
-    Materialise the mock job dictionaries as `Job` objects.
+    if value[-1:] in ("Z", "z"):
+        # `fromisoformat` only accepts a "Z" suffix from Python 3.11 on.
+        value = value[:-1] + "+00:00"
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
 
-    The helper prefers `Job.from_dict` when the class exposes that constructor;
-    otherwise it falls back to unpacking keyword arguments. Any conversion error
-    is re-raised as a `ValueError` so callers can surface broken schemas quickly.
+def job_from_dict(job_dict: JobDict) -> Job:
     """
-    job_dicts = get_mock_jobs_as_dicts()
+    Convert a single mock job dictionary into a `Job` instance.
 
-    jobs = []
-    for job_dict in job_dicts:
-        try:
-            company_data = job_dict["company"]
-            company = Company(
-                name=company_data["name"],
-                website=company_data.get("website"),
+    Nested company, salary and location payloads are mapped onto their contract
+    classes and ISO timestamps are parsed as naive UTC. Any conversion error is re-raised as a
+    `ValueError` so callers can surface broken schemas quickly.
+    """
+    try:
+        company_data = job_dict["company"]
+        company = Company(
+            name=company_data["name"],
+            website=company_data.get("website"),
+        )
+
+        salary = None
+        salary_data = job_dict.get("salary")
+        if salary_data:
+            salary = Salary(
+                currency=salary_data["currency"],
+                min_value=salary_data.get("min_value"),
+                max_value=salary_data.get("max_value"),
+            )
+
+        location = None
+        location_data = job_dict.get("location")
+        if location_data:
+            location = Location(
+                region=location_data.get("region"),
+                is_remote=location_data.get("is_remote", False),
+                can_apply=location_data.get("can_apply"),
             )
 
-            salary = None
-            salary_data = job_dict.get("salary")
-            if salary_data:
-                salary = Salary(
-                    currency=salary_data["currency"],
-                    min_value=salary_data.get("min_value"),
-                    max_value=salary_data.get("max_value"),
-                )
+        return Job(
+            job_id=job_dict["job_id"],
+            title=job_dict["title"],
+            url=job_dict["url"],
+            description=job_dict["description"],
+            company=company,
+            category=job_dict.get("category"),
+            date_posted=parse_timestamp(job_dict["date_posted"]),
+            valid_through=parse_timestamp(job_dict["valid_through"]),
+            employment_type=job_dict["employment_type"],
+            source=job_dict["source"],
+            salary=salary,
+            experience_months=job_dict.get("experience_months"),
+            location=location,
+            industry=job_dict.get("industry"),
+        )
+    except Exception as e:
+        raise ValueError(f"Failed to convert job dict to Job instance: {e}")
 
-            location = None
-            location_data = job_dict.get("location")
-            if location_data:
-                location = Location(
-                    region=location_data.get("region"),
-                    is_remote=location_data.get("is_remote", False),
-                    can_apply=location_data.get("can_apply"),
-                )
 
-            jobs.append(
-                Job(
-                    job_id=job_dict["job_id"],
-                    title=job_dict["title"],
-                    url=job_dict["url"],
-                    description=job_dict["description"],
-                    company=company,
-                    category=job_dict.get("category"),
-                    date_posted=datetime.fromisoformat(job_dict["date_posted"]),
-                    valid_through=datetime.fromisoformat(job_dict["valid_through"]),
-                    employment_type=job_dict["employment_type"],
-                    source=job_dict["source"],
-                    salary=salary,
-                    experience_months=job_dict.get("experience_months"),
-                    location=location,
-                    industry=job_dict.get("industry"),
-                )
-            )
-        except Exception as e:
-            raise ValueError(f"Failed to convert job dict to Job instance: {e}")
+def get_mock_jobs() -> List[Job]:
+    """
+    Materialise the mock job dictionaries as `Job` objects.
 
-    return jobs
+    Conversion goes through `job_from_dict`, so any schema problem surfaces as a
+    `ValueError`.
+    """
+    return [job_from_dict(job_dict) for job_dict in get_mock_jobs_as_dicts()]
 
 
-MOCK_JOBS_DICTS = get_mock_jobs_as_dicts()
+def __getattr__(name: str) -> Any:
+    # `MOCK_JOBS_DICTS` and `faker` used to be built eagerly at import time; they
+    # are now created on first access so importing the module stays cheap.
+    if name == "faker":
+        return get_faker()
+    if name == "MOCK_JOBS_DICTS":
+        value = get_mock_jobs_as_dicts()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,296 @@
+"""
+End-to-end throughput harness over the in-process broker.
+
+`run_load` plays ``concurrency`` clients against the request queue of an
+`InMemoryBroker`. Each client publishes a scrape request, follows its replies
+until the last batch, and sends the next request. The run measures the whole
+request path: decoding the request, scraping, encoding every batch and handing
+it to the broker. `run_local_load` serves the requests with a `LocalConsumer`
+around a manager, so every layer below the broker connection is profiled in one
+process::
+
+    report = run_local_load(manager, LoadSpec(requests=500, concurrency=8))
+    print(report.to_json())
+
+Clients only read the reply headers, so their own cost is small, but they share
+the process (and the GIL) with the service.
+"""
+
+import itertools
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from .broker import REQUEST_QUEUE, InMemoryBroker, LocalConsumer, Message
+from .manager import ScrapperManager
+
+REPLY_QUEUE_PREFIX = "scrapper.loadtest.reply"
+REPLY_GRACE_SECONDS = 5.0
+"""How long past its timeout a client waits for a reply before failing the request."""
+
+
+@dataclass(frozen=True)
+class LoadSpec:
+    """Shape of a load run.
+
+    Attributes:
+        requests: Scrape requests sent in total.
+        concurrency: Clients sending requests at once, one request each.
+        filters: Filters of the requests, used in turn.
+        batch_size: Batch size of every request.
+        timeout: Timeout of every request in seconds.
+        rate: Maximum requests started per second across all clients
+            (default: as fast as the clients can go).
+    """
+
+    requests: int = 100
+    concurrency: int = 8
+    filters: Sequence[Mapping[str, Any]] = ({},)
+    batch_size: int = 50
+    timeout: int = 30
+    rate: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.requests < 1 or self.concurrency < 1:
+            raise ValueError("A load run needs at least one request and one client")
+        if not self.filters:
+            raise ValueError("A load run needs at least one filter")
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """Throughput and latency of a load run.
+
+    Latencies are in milliseconds from publishing a request to receiving its
+    first or last batch, over the requests that completed.
+
+    Attributes:
+        requests: Requests that completed.
+        failed: Requests answered with an error or not answered in time.
+        jobs: Jobs received.
+        bytes: Encoded reply bytes received.
+        elapsed: Wall-clock seconds of the run.
+        requests_per_second: Completed requests per second.
+        jobs_per_second: Jobs received per second.
+        first_batch_p50: Median latency to the first batch.
+        first_batch_p99: 99th percentile latency to the first batch.
+        last_batch_p50: Median latency to the last batch.
+        last_batch_p99: 99th percentile latency to the last batch.
+        peak_rss_mib: Peak resident memory of the process, if known.
+        rss_growth_mib: Growth of the peak resident memory during the run.
+    """
+
+    requests: int
+    failed: int
+    jobs: int
+    bytes: int
+    elapsed: float
+    requests_per_second: float
+    jobs_per_second: float
+    first_batch_p50: float
+    first_batch_p99: float
+    last_batch_p50: float
+    last_batch_p99: float
+    peak_rss_mib: Optional[float]
+    rss_growth_mib: Optional[float]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2, sort_keys=True)
+
+    def summary(self) -> str:
+        throughput = self.bytes / self.elapsed / 2**20 if self.elapsed else 0.0
+        lines = [
+            f"{self.requests} requests ({self.failed} failed), "
+            + f"{self.jobs} jobs in {self.elapsed:.2f}s",
+            f"{self.requests_per_second:.1f} req/s, {self.jobs_per_second:.0f} jobs/s, "
+            + f"{throughput:.1f} MiB/s",
+            f"first batch p50 {self.first_batch_p50:.1f}ms p99 {self.first_batch_p99:.1f}ms, "
+            + f"last batch p50 {self.last_batch_p50:.1f}ms p99 {self.last_batch_p99:.1f}ms",
+        ]
+        if self.peak_rss_mib is not None:
+            lines.append(
+                f"peak RSS {self.peak_rss_mib:.1f} MiB (+{self.rss_growth_mib or 0.0:.1f} MiB)"
+            )
+        return "\n".join(lines)
+
+
+class _Results:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.first_batch: List[float] = []
+        self.last_batch: List[float] = []
+        self.failed = 0
+        self.jobs = 0
+        self.bytes = 0
+
+
+def run_load(
+    broker: InMemoryBroker, spec: LoadSpec, request_queue: str = REQUEST_QUEUE
+) -> LoadReport:
+    """Send ``spec.requests`` requests to ``request_queue`` and measure their replies.
+
+    A consumer must already be serving ``request_queue`` on ``broker``.
+    """
+    peak_before = peak_rss_kib()
+    results = _Results()
+    sequence = itertools.count()
+    sequence_lock = threading.Lock()
+    started_at = time.perf_counter()
+
+    def next_request() -> Optional[int]:
+        with sequence_lock:
+            number = next(sequence)
+        if number >= spec.requests:
+            return None
+        if spec.rate:
+            due = started_at + number / spec.rate
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        return number
+
+    clients = [
+        threading.Thread(
+            target=_client,
+            args=(broker, request_queue, spec, index, next_request, results),
+            name=f"scrapper-loadtest-client-{index}",
+            daemon=True,
+        )
+        for index in range(min(spec.concurrency, spec.requests))
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started_at
+
+    peak_after = peak_rss_kib()
+    completed = len(results.last_batch)
+    first_batch = sorted(results.first_batch)
+    last_batch = sorted(results.last_batch)
+    return LoadReport(
+        requests=completed,
+        failed=results.failed,
+        jobs=results.jobs,
+        bytes=results.bytes,
+        elapsed=elapsed,
+        requests_per_second=completed / elapsed if elapsed else 0.0,
+        jobs_per_second=results.jobs / elapsed if elapsed else 0.0,
+        first_batch_p50=percentile(first_batch, 50),
+        first_batch_p99=percentile(first_batch, 99),
+        last_batch_p50=percentile(last_batch, 50),
+        last_batch_p99=percentile(last_batch, 99),
+        peak_rss_mib=peak_after / 1024 if peak_after is not None else None,
+        rss_growth_mib=(peak_after - peak_before) / 1024
+        if peak_after is not None and peak_before is not None
+        else None,
+    )
+
+
+def run_local_load(
+    manager: ScrapperManager, spec: LoadSpec, prefetch: Optional[int] = None
+) -> LoadReport:
+    """Serve a load run with ``manager`` behind an in-process broker.
+
+    ``prefetch`` requests are served at once (default: one per client).
+    """
+    broker = InMemoryBroker()
+    consumer = LocalConsumer(manager, broker, prefetch=prefetch or spec.concurrency)
+    consumer.start()
+    try:
+        return run_load(broker, spec)
+    finally:
+        consumer.stop()
+
+
+def _client(
+    broker: InMemoryBroker,
+    request_queue: str,
+    spec: LoadSpec,
+    index: int,
+    next_request: Callable[[], Optional[int]],
+    results: _Results,
+) -> None:
+    reply_queue = f"{REPLY_QUEUE_PREFIX}.{index}"
+    broker.declare_queue(reply_queue)
+    reply_timeout = spec.timeout + REPLY_GRACE_SECONDS
+    try:
+        while True:
+            number = next_request()
+            if number is None:
+                return
+            correlation_id = f"{index}-{number}"
+            request: Dict[str, Any] = {
+                "filters": dict(spec.filters[number % len(spec.filters)]),
+                "timeout": spec.timeout,
+                "batch_size": spec.batch_size,
+            }
+            sent_at = time.perf_counter()
+            broker.publish(
+                request_queue,
+                Message(
+                    json.dumps(request).encode("utf-8"),
+                    reply_to=reply_queue,
+                    correlation_id=correlation_id,
+                ),
+            )
+            first: Optional[float] = None
+            jobs = 0
+            size = 0
+            ok = False
+            while True:
+                reply = broker.get(reply_queue, timeout=reply_timeout)
+                if reply is None:
+                    break
+                if reply.correlation_id != correlation_id:
+                    # A late reply to a request that already timed out.
+                    continue
+                if first is None:
+                    first = time.perf_counter() - sent_at
+                jobs += reply.headers.get("count", 0)
+                size += len(reply.body)
+                if reply.headers.get("is_last"):
+                    ok = not reply.headers.get("error")
+                    break
+            last = time.perf_counter() - sent_at
+            with results.lock:
+                results.jobs += jobs
+                results.bytes += size
+                if ok and first is not None:
+                    results.first_batch.append(first * 1000)
+                    results.last_batch.append(last * 1000)
+                else:
+                    results.failed += 1
+    finally:
+        broker.delete_queue(reply_queue)
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ascending ``ordered``, or 0 when it is empty."""
+    if not ordered:
+        return 0.0
+    rank = max(int(len(ordered) * pct / 100 + 0.5) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def peak_rss_kib() -> Optional[int]:
+    """Peak resident memory of this process in KiB, or ``None`` where it is unknown."""
+    # ru_maxrss survives exec on Linux and would report the parent's peak, so
+    # prefer the per-address-space high-water mark when it is available.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
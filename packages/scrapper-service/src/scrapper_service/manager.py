@@ -1,34 +1,840 @@
-from typing import Callable, List, Optional
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import partial
+from operator import itemgetter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
-from job_scrapper_contracts import Job, ScrapeJobsFilter, ScrapperServiceInterface
+from job_scrapper_contracts import Job, JobDict, ScrapeJobsFilter, ScrapperServiceInterface
 
-from .jobs_data import get_mock_jobs
+from .batching import (
+    DEFAULT_MAX_PENDING_BATCHES,
+    BatchPolicy,
+    Deadline,
+    ScrapeReport,
+    deliver_batches,
+    deliver_batches_async,
+    iter_batches,
+    iter_policy_batches,
+)
+from .cache import ResultCache
+from .changelog import ChangeLog
+from .columnar import JobBatch, JobTable, StringPool
+from .corpus import ColumnarCorpus, JobRenderer
+from .identity import (
+    DEFAULT_DEDUP_CAPACITY,
+    DEFAULT_DEDUP_ERROR_RATE,
+    DEFAULT_DEDUP_MAX_BYTES,
+    MAX_DEDUP_CONSUMERS,
+    DedupFilter,
+    DedupSession,
+    dedup_request,
+)
+from .jobs_data import get_mock_jobs_as_dicts, job_from_dict
+from .metrics import ScrapeMetrics
+from .payloads import PayloadCache, RequestPatch, encode_batch, encoded_size
+from .providers import FanOut, FanOutReport, JobSource
+from .query import CorpusIndex, JobQuery
+from .replay import ReplayCapture
+from .shaping import PROFILE_FILTER, DeliveryShaper, ShapingProfile
+
+logger = logging.getLogger(__name__)
+
+QUERY_CHUNK_SIZE = 4096
+
+
+class _Matches(NamedTuple):
+    total: Optional[int]
+    job_dicts: Iterator[JobDict]
+    cursor: Optional[int] = None
+    dedup: Optional[DedupSession] = None
+    fanout: Optional[FanOutReport] = None
+    index_seconds: float = 0.0
 
 
 class ScrapperManager(ScrapperServiceInterface):
+    """Contract-compatible scrapper backed by mock data.
+
+    Without a corpus the manager serves the ten canonical listings. With a
+    `ColumnarCorpus` (a generated `SyntheticCorpus` or a memory-mapped snapshot)
+    jobs are materialised lazily from it. In ``streaming`` mode
+    `scrape_jobs` hands batches to ``on_jobs_batch`` as they are produced and
+    returns an empty list instead of accumulating the result set, so peak memory
+    is bounded by the batch size rather than the corpus size.
+
+    Filters are honoured through `JobQuery`. Filtered scrapes over a corpus use a
+    `CorpusIndex` that `prewarm` builds ahead of time, or else the first filtered
+    request builds, which its report records as ``index_seconds``.
+
+    `scrape_payloads` serves the same batches as pre-encoded JSON arrays, from a
+    `PayloadCache` over a static corpus, for publishers that can send bytes
+    directly.
+
+    Scrapes honour ``timeout``: once it passes, generation stops and the jobs
+    produced so far go out as the final batch. The outcome of the latest scrape
+    is kept in ``last_report``.
+
+    Batches are closed by a `BatchPolicy`: the request's ``batch_size`` caps the
+    job count, while ``batch_policy`` supplies default byte and linger limits
+    that a request can override.
+
+    With a `ChangeLog` the corpus evolves over time. A ``since`` (or ``cursor``)
+    filter then returns only the jobs changed after that cursor or timestamp,
+    and ``last_report.cursor`` holds the cursor for the next poll.
+
+    Job ids are derived from content. A request that names its ``consumer_id``
+    is checked against that consumer's `DedupFilter`, and jobs already delivered
+    to it are dropped (or only counted, with ``dedup: "mark"``). Each filter
+    holds ``dedup_capacity`` ids before it starts forgetting the oldest; by
+    default that is the number of jobs served (at least
+    `DEFAULT_DEDUP_CAPACITY`), so a consumer is never sent a corpus row twice.
+    The least recently active consumers are forgotten once more than
+    `MAX_DEDUP_CONSUMERS` filters, or more than ``dedup_max_bytes`` of them, are
+    held.
+
+    `scrape_jobs` hands out lists of `Job` objects as the service contract
+    requires. `scrape_job_batches` is the opt-in columnar variant: its batches
+    (and the jobs returned by a non-streaming scrape) are read-only `JobBatch`
+    sequences over a compact `JobTable`, which build each `Job` only when it is
+    accessed.
+
+    With `ScrapeMetrics` every request and batch gets a span, and generation
+    time, callback latency, batch sizes and jobs served are recorded.
+
+    With a `ReplayCapture` the manager serves recorded scraper responses instead
+    of mock data, reading them from the capture as they are delivered. Filters
+    are applied to the recorded jobs, and with ``replay_speed`` the recorded
+    gaps between batches are replayed at that multiple of real time.
+
+    With a `ResultCache` the jobs matched by each normalised query are kept and
+    repeated requests are answered from them, with the same job ids, until the
+    entry expires or is evicted. Change-log deltas and paced replays are never
+    cached, and a request can bypass the cache with ``cache: False``.
+
+    With a `FanOut` the corpus (or the canonical listings) is split into one
+    slice per simulated provider. Providers fetch their slices concurrently with
+    their own latency and failure rate, and the jobs reach ``on_jobs_batch`` as
+    one merged stream; providers that failed are listed in ``last_report``.
+
+    With a `DeliveryShaper` batches reach ``on_jobs_batch`` at the pace of a
+    `ShapingProfile`: per-batch latency, a jobs/sec cap, page pauses and tail
+    spikes. A request picks a profile with the ``profile`` filter (even without
+    a shaper, which is then created with the built-in profiles); others get the
+    shaper's default. Shaped batches are handed to ``on_jobs_batch`` by a
+    scheduler thread of the request as they fall due, while the requesting
+    thread keeps generating; the delays count against the timeout.
+    """
+
+    def __init__(
+        self,
+        corpus: Optional[ColumnarCorpus] = None,
+        streaming: bool = False,
+        batch_policy: Optional[BatchPolicy] = None,
+        changelog: Optional[ChangeLog] = None,
+        dedup_capacity: Optional[int] = None,
+        dedup_error_rate: float = DEFAULT_DEDUP_ERROR_RATE,
+        dedup_max_bytes: int = DEFAULT_DEDUP_MAX_BYTES,
+        metrics: Optional[ScrapeMetrics] = None,
+        replay: Optional[ReplayCapture] = None,
+        replay_speed: Optional[float] = None,
+        result_cache: Optional[ResultCache] = None,
+        fanout: Optional[FanOut] = None,
+        shaping: Optional[DeliveryShaper] = None,
+    ) -> None:
+        if changelog is not None:
+            if corpus is not None and corpus is not changelog.corpus:
+                raise ValueError("The change log must be built over the manager's corpus")
+            corpus = changelog.corpus
+        if replay is not None and corpus is not None:
+            raise ValueError("A manager serves either a corpus or a replayed capture")
+        if fanout is not None and (replay is not None or changelog is not None):
+            raise ValueError("Provider fan-out needs a static corpus or the canonical listings")
+        self.corpus = corpus
+        self.changelog = changelog
+        self.streaming = streaming
+        self.metrics = metrics
+        self.replay = replay
+        self.replay_speed = replay_speed
+        self.result_cache = result_cache
+        self.fanout = fanout
+        self.shaping = shaping
+        if metrics is not None and result_cache is not None:
+            metrics.track_cache(result_cache)
+        self.batch_policy = batch_policy
+        self._index: Optional[CorpusIndex] = None
+        self._payloads: Optional[PayloadCache] = None
+        self._build_lock = threading.Lock()
+        self.last_report: Optional[ScrapeReport] = None
+        self.dedup_capacity = dedup_capacity
+        self.dedup_error_rate = dedup_error_rate
+        self.dedup_max_bytes = dedup_max_bytes
+        self._dedup: "OrderedDict[str, DedupFilter]" = OrderedDict()
+        self._dedup_bytes = 0
+        self._dedup_lock = threading.Lock()
+
+    @property
+    def index(self) -> CorpusIndex:
+        return self._ensure_index()
+
+    def _ensure_index(self) -> CorpusIndex:
+        """Return the filter index, building it on first use."""
+        if self.corpus is None:
+            raise RuntimeError("Indexes are only available for a columnar corpus")
+        if self._index is None:
+            with self._build_lock:
+                if self._index is None:
+                    self._index = CorpusIndex(self.corpus)
+        return self._index
+
+    def _built_index(self) -> Tuple[CorpusIndex, float]:
+        """Return the index and the seconds this call spent building or waiting for it."""
+        if self._index is not None:
+            return self._index, 0.0
+        started = time.perf_counter()
+        index = self._ensure_index()
+        return index, time.perf_counter() - started
+
+    @property
+    def payloads(self) -> PayloadCache:
+        if self.corpus is None:
+            raise RuntimeError("Payload caching is only available for a columnar corpus")
+        if self._payloads is None:
+            with self._build_lock:
+                if self._payloads is None:
+                    self._payloads = PayloadCache(self.corpus)
+        return self._payloads
+
+    def prewarm(self) -> None:
+        """Build ahead of time what the first requests would otherwise build.
+
+        Renders one job, which loads `faker` and the corpus value pools, and over
+        a corpus builds the filter index (and the change log's merged columns).
+        """
+        if self.replay is not None:
+            return
+        if self.corpus is None or len(self.corpus) == 0:
+            get_mock_jobs_as_dicts()
+            return
+        self.corpus.job_dict(0)
+        if self.changelog is not None:
+            self.changelog.prewarm()
+        self._ensure_index()
+
+    def dedup_filter(self, consumer_id: str) -> DedupFilter:
+        """Return the filter of ids delivered to ``consumer_id``, creating it if needed."""
+        with self._dedup_lock:
+            dedup = self._dedup.get(consumer_id)
+            if dedup is not None:
+                self._dedup.move_to_end(consumer_id)
+                return dedup
+            dedup = DedupFilter(self._dedup_capacity(), self.dedup_error_rate)
+            self._dedup[consumer_id] = dedup
+            self._dedup_bytes += dedup.memory_bytes
+            while len(self._dedup) > 1 and (
+                len(self._dedup) > MAX_DEDUP_CONSUMERS or self._dedup_bytes > self.dedup_max_bytes
+            ):
+                _, forgotten = self._dedup.popitem(last=False)
+                self._dedup_bytes -= forgotten.memory_bytes
+            return dedup
+
+    def _dedup_capacity(self) -> int:
+        if self.dedup_capacity is not None:
+            return self.dedup_capacity
+        served = 0
+        if self.replay is not None:
+            served = len(self.replay)
+        elif self.corpus is not None:
+            served = len(self.corpus)
+        return max(served, DEFAULT_DEDUP_CAPACITY)
+
+    def iter_jobs(self, filters: Optional[ScrapeJobsFilter] = None) -> Iterator[Job]:
+        """Lazily yield every job matching ``filters``."""
+        jobs = map(_convert, self._matching(filters).job_dicts)
+        return (job for job in jobs if job is not None)
+
+    def _matching(
+        self, filters: Optional[ScrapeJobsFilter], deadline: Optional[Deadline] = None
+    ) -> _Matches:
+        """Return the number of jobs matching ``filters`` (when known) and a lazy iterator."""
+        query = JobQuery.from_filters(filters)
+        cache = self.result_cache
+        if cache is None or not self._cacheable(filters):
+            return self._generated(query, filters, deadline)
+        cached = cache.get(query)
+        if cached is not None:
+            return _Matches(len(cached), iter(cached))
+        matches = self._generated(query, filters, deadline)
+        return matches._replace(job_dicts=cache.recording(query, matches.job_dicts))
+
+    def _cacheable(self, filters: Optional[ScrapeJobsFilter]) -> bool:
+        if self.fanout is not None or self.changelog is not None:
+            return False
+        if self.replay is not None and self.replay_speed:
+            return False
+        return not (isinstance(filters, Mapping) and filters.get("cache") is False)
+
+    def _generated(
+        self, query: JobQuery, filters: Optional[ScrapeJobsFilter], deadline: Optional[Deadline]
+    ) -> _Matches:
+        if self.fanout is not None:
+            return self._fanned_out(self.fanout, query, deadline)
+
+        if self.replay is not None:
+            replayed = self.replay.iter_job_dicts(self.replay_speed, deadline)
+            if query.is_empty:
+                return _Matches(len(self.replay), replayed)
+            return _Matches(None, filter(query.matches, replayed))
+
+        if self.changelog is not None:
+            return self._matching_changes(self.changelog, query, _since(filters))
+
+        if self.corpus is None:
+            job_dicts = [
+                job_dict for job_dict in get_mock_jobs_as_dicts() if query.matches(job_dict)
+            ]
+            return _Matches(len(job_dicts), iter(job_dicts))
+
+        if query.is_empty:
+            return _Matches(len(self.corpus), self.corpus.iter_job_dicts())
+
+        index, index_seconds = self._built_index()
+        rows = index.search(query)
+        return _Matches(len(rows), self._iter_rows(index, rows), index_seconds=index_seconds)
+
+    def _delivering(
+        self, filters: Optional[ScrapeJobsFilter], deadline: Optional[Deadline] = None
+    ) -> _Matches:
+        """Like `_matching`, with the consumer's dedup applied for a scrape."""
+        matches = self._matching(filters, deadline)
+        request = dedup_request(filters)
+        if request is None:
+            return matches
+        consumer_id, mode = request
+        session = DedupSession(self.dedup_filter(consumer_id), mode)
+        return matches._replace(job_dicts=session.apply(matches.job_dicts), dedup=session)
+
+    def _matching_changes(self, changelog: ChangeLog, query: JobQuery, since: Any) -> _Matches:
+        if since is not None:
+            change_set = changelog.changes(since)
+            job_dicts = [job_dict for job_dict in change_set.jobs if query.matches(job_dict)]
+            return _Matches(len(job_dicts), iter(job_dicts), change_set.cursor)
+
+        cursor = changelog.cursor
+        if query.is_empty:
+            return _Matches(changelog.live_count(), changelog.iter_current(), cursor)
+        # Updates move salaries, so index candidates are re-checked on their current state.
+        index, index_seconds = self._built_index()
+        current = changelog.iter_current(index.search(query))
+        return _Matches(None, filter(query.matches, current), cursor, index_seconds=index_seconds)
+
+    @staticmethod
+    def _iter_rows(index: CorpusIndex, rows: Sequence[int]) -> Iterator[JobDict]:
+        for start in range(0, len(rows), QUERY_CHUNK_SIZE):
+            yield from index.job_dicts(rows[start : start + QUERY_CHUNK_SIZE])
+
+    def _fanned_out(
+        self, fanout: FanOut, query: JobQuery, deadline: Optional[Deadline]
+    ) -> _Matches:
+        """Split the matching jobs into provider slices and merge what the providers return."""
+        sources: List[JobSource] = []
+        total = 0
+        index_seconds = 0.0
+        if self.corpus is None:
+            job_dicts = [
+                job_dict for job_dict in get_mock_jobs_as_dicts() if query.matches(job_dict)
+            ]
+            for start, stop in fanout.slices(len(job_dicts)):
+                listed = job_dicts[start:stop]
+                if fanout.sorted_by_date:
+                    listed.sort(key=itemgetter("date_posted"), reverse=True)
+                sources.append(partial(iter, listed))
+                total += len(listed)
+        else:
+            corpus = self.corpus
+            # Build the value pools here rather than racing to build them in every provider.
+            _ensure_renderer(corpus)
+            rows = None
+            if not query.is_empty or fanout.sorted_by_date:
+                index, index_seconds = self._built_index()
+                rows = index.search(query)
+            for start, stop in fanout.slices(len(corpus)):
+                if rows is None:
+                    sources.append(partial(corpus.iter_job_dicts, start, stop))
+                    total += stop - start
+                    continue
+                part = rows[bisect_left(rows, start) : bisect_left(rows, stop)]
+                if fanout.sorted_by_date:
+                    sources.append(partial(self._iter_newest_first, self.index, part))
+                else:
+                    sources.append(partial(self._iter_rows, self.index, part))
+                total += len(part)
+
+        job_dicts_merged, report = fanout.run(sources, deadline)
+        return _Matches(total, job_dicts_merged, fanout=report, index_seconds=index_seconds)
+
+    @classmethod
+    def _iter_newest_first(cls, index: CorpusIndex, rows: Iterable[int]) -> Iterator[JobDict]:
+        # Runs in the provider's thread, which sorts its own slice like a job board would.
+        posted = index.columns.posted
+        return cls._iter_rows(index, sorted(rows, key=posted.__getitem__, reverse=True))
+
+    def _policy(
+        self,
+        filters: Optional[ScrapeJobsFilter],
+        batch_size: Optional[int],
+        batch_policy: Optional[BatchPolicy],
+    ) -> BatchPolicy:
+        if batch_policy is not None:
+            return batch_policy
+        return BatchPolicy.resolve(batch_size, filters, self.batch_policy)
+
+    def _shaping_profile(self, filters: Optional[ScrapeJobsFilter]) -> Optional[ShapingProfile]:
+        if self.shaping is None:
+            if not (isinstance(filters, Mapping) and filters.get(PROFILE_FILTER) is not None):
+                return None
+            with self._build_lock:
+                if self.shaping is None:
+                    self.shaping = DeliveryShaper()
+        return self.shaping.profile_for(filters)
+
+    def _deliver(
+        self,
+        batches: Iterable[Sequence[Job]],
+        on_jobs_batch: Callable[[Sequence[Job], bool], None],
+        profile: Optional[ShapingProfile],
+        deadline: Deadline,
+    ) -> int:
+        if profile is None or self.shaping is None:
+            return deliver_batches(batches, on_jobs_batch)
+        return self.shaping.deliver(batches, on_jobs_batch, profile, deadline)
+
+    def _job_batches(
+        self,
+        job_dicts: Iterator[JobDict],
+        policy: BatchPolicy,
+        columnar: bool = False,
+        table: Optional[JobTable] = None,
+    ) -> Iterator[Sequence[Job]]:
+        """Convert batches of job dicts to lists of jobs, or to `JobBatch` views.
+
+        A ``columnar`` batch is a view over ``table`` when one is given (so a
+        whole scrape shares one table), otherwise over a table of its own that
+        shares the scrape's string pool.
+        """
+        batches = iter_policy_batches(job_dicts, policy, encoded_size)
+        convert: Callable[[List[JobDict]], Sequence[Job]]
+        if columnar:
+            pool = table.pool if table is not None else StringPool()
+
+            def convert(batch: List[JobDict]) -> Sequence[Job]:
+                target = table if table is not None else JobTable(pool)
+                start = len(target)
+                _store(target, batch)
+                return JobBatch(target, start, len(target))
+
+        else:
+
+            def convert(batch: List[JobDict]) -> Sequence[Job]:
+                return [job for job in map(_convert, batch) if job is not None]
+
+        metrics = self.metrics
+        if metrics is None:
+            yield from map(convert, batches)
+            return
+        # Time spent by the consumer between batches is not generation time.
+        started = time.perf_counter()
+        for batch in batches:
+            jobs = convert(batch)
+            if batch:
+                metrics.record_generation(time.perf_counter() - started, batch)
+            yield jobs
+            started = time.perf_counter()
+
+    def scrape_jobs_iter(
+        self,
+        filters: Optional[ScrapeJobsFilter] = None,
+        batch_size: int = 50,
+        batch_policy: Optional[BatchPolicy] = None,
+    ) -> Iterator[List[Job]]:
+        """Yield batches of jobs under the request's batch policy, generating each on demand."""
+        policy = self._policy(filters, batch_size, batch_policy)
+        batches = cast(
+            Iterator[List[Job]], self._job_batches(self._delivering(filters).job_dicts, policy)
+        )
+        # Linger flush markers only matter to deliveries that hold a batch back.
+        return (batch for batch in batches if batch)
+
     def scrape_jobs(
         self,
         filters: ScrapeJobsFilter,
         timeout: int = 30,
         batch_size: int = 50,
         on_jobs_batch: Optional[Callable[[List[Job], bool], None]] = None,
+        batch_policy: Optional[BatchPolicy] = None,
     ) -> List[Job]:
-        jobs = get_mock_jobs()
-        if not on_jobs_batch:
-            return jobs
+        jobs = self._scrape(
+            "scrape_jobs", filters, timeout, batch_size, on_jobs_batch, batch_policy, False
+        )
+        return cast(List[Job], jobs)
+
+    def scrape_job_batches(
+        self,
+        filters: ScrapeJobsFilter,
+        timeout: int = 30,
+        batch_size: int = 50,
+        on_jobs_batch: Optional[Callable[[JobBatch, bool], None]] = None,
+        batch_policy: Optional[BatchPolicy] = None,
+    ) -> JobBatch:
+        """Columnar variant of `scrape_jobs` that hands out `JobBatch` views.
+
+        Not part of the service contract, whose callers expect lists of jobs.
+        """
+        jobs = self._scrape(
+            "scrape_job_batches", filters, timeout, batch_size, on_jobs_batch, batch_policy, True
+        )
+        return cast(JobBatch, jobs)
+
+    def _scrape(
+        self,
+        name: str,
+        filters: ScrapeJobsFilter,
+        timeout: int,
+        batch_size: int,
+        on_jobs_batch: Optional[Callable[[Any, bool], None]],
+        batch_policy: Optional[BatchPolicy],
+        columnar: bool,
+    ) -> Sequence[Job]:
+        with self._span(name, filters, batch_size, columnar):
+            profile = self._shaping_profile(filters) if on_jobs_batch else None
+            deadline = Deadline(timeout)
+            matches = self._delivering(filters, deadline)
+            job_dicts = deadline.limit(matches.job_dicts)
+
+            if not on_jobs_batch:
+                jobs = self._collect(job_dicts, columnar)
+                self._record(deadline, len(jobs), matches, batched=False)
+                return jobs
+
+            if self.metrics is not None:
+                on_jobs_batch = self.metrics.observe_batches(on_jobs_batch)
+            policy = self._policy(filters, batch_size, batch_policy)
+            table = JobTable() if columnar and not self.streaming else None
+            batches = self._job_batches(job_dicts, policy, columnar, table)
+            collected: List[Sequence[Job]] = []
+            if not self.streaming:
+                # Batches go out as they are built and are kept for the returned list.
+                batches = _collecting(batches, collected)
+            delivered = self._deliver(batches, on_jobs_batch, profile, deadline)
+            self._record(deadline, delivered, matches)
+            return self._joined(collected, table, delivered, columnar)
+
+    async def scrape_jobs_async(
+        self,
+        filters: ScrapeJobsFilter,
+        timeout: int = 30,
+        batch_size: int = 50,
+        on_jobs_batch: Optional[Callable[[List[Job], bool], Awaitable[None]]] = None,
+        max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES,
+        batch_policy: Optional[BatchPolicy] = None,
+    ) -> List[Job]:
+        """Asyncio variant of `scrape_jobs` with an awaitable batch sink.
+
+        Jobs are generated in an executor thread and passed to ``on_jobs_batch``
+        through a queue of at most ``max_pending_batches`` batches; generation
+        pauses while the queue is full, so a slow sink bounds memory instead of
+        letting batches pile up, and many requests can share one event loop.
+        """
+        jobs = await self._scrape_async(
+            "scrape_jobs_async",
+            filters,
+            timeout,
+            batch_size,
+            on_jobs_batch,
+            max_pending_batches,
+            batch_policy,
+            False,
+        )
+        return cast(List[Job], jobs)
+
+    async def scrape_job_batches_async(
+        self,
+        filters: ScrapeJobsFilter,
+        timeout: int = 30,
+        batch_size: int = 50,
+        on_jobs_batch: Optional[Callable[[JobBatch, bool], Awaitable[None]]] = None,
+        max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES,
+        batch_policy: Optional[BatchPolicy] = None,
+    ) -> JobBatch:
+        """Asyncio variant of `scrape_job_batches`, delivering like `scrape_jobs_async`."""
+        jobs = await self._scrape_async(
+            "scrape_job_batches_async",
+            filters,
+            timeout,
+            batch_size,
+            on_jobs_batch,
+            max_pending_batches,
+            batch_policy,
+            True,
+        )
+        return cast(JobBatch, jobs)
+
+    async def _scrape_async(
+        self,
+        name: str,
+        filters: ScrapeJobsFilter,
+        timeout: int,
+        batch_size: int,
+        on_jobs_batch: Optional[Callable[[Any, bool], Awaitable[None]]],
+        max_pending_batches: int,
+        batch_policy: Optional[BatchPolicy],
+        columnar: bool,
+    ) -> Sequence[Job]:
+        with self._span(name, filters, batch_size, columnar):
+            profile = self._shaping_profile(filters) if on_jobs_batch else None
+            deadline = Deadline(timeout)
+            matches = self._delivering(filters, deadline)
+            job_dicts = deadline.limit(matches.job_dicts)
 
-        effective_batch_size = batch_size if batch_size and batch_size > 0 else max(len(jobs), 1)
-        buffer: List[Job] = []
+            if not on_jobs_batch:
+                import asyncio
 
-        for job in jobs:
-            buffer.append(job)
-            if len(buffer) == effective_batch_size:
-                on_jobs_batch(list(buffer), False)
-                buffer.clear()
+                loop = asyncio.get_running_loop()
+                jobs = await loop.run_in_executor(None, self._collect, job_dicts, columnar)
+                self._record(deadline, len(jobs), matches, batched=False)
+                return jobs
 
-        if buffer:
-            on_jobs_batch(list(buffer), True)
+            if self.metrics is not None:
+                on_jobs_batch = self.metrics.observe_async_batches(on_jobs_batch)
+            if profile is not None and self.shaping is not None:
+                on_jobs_batch = self.shaping.paced(on_jobs_batch, profile, deadline)
+            deliver = on_jobs_batch
+            collected: List[Sequence[Job]] = []
+
+            async def sink(batch: Sequence[Job], is_last: bool) -> None:
+                if not self.streaming:
+                    collected.append(batch)
+                await deliver(batch, is_last)
+
+            table = JobTable() if columnar and not self.streaming else None
+            policy = self._policy(filters, batch_size, batch_policy)
+            delivered = await deliver_batches_async(
+                self._job_batches(job_dicts, policy, columnar, table),
+                sink,
+                max_pending_batches,
+                deadline=deadline,
+            )
+            self._record(deadline, delivered, matches)
+            return self._joined(collected, table, delivered, columnar)
+
+    @staticmethod
+    def _collect(job_dicts: Iterator[JobDict], columnar: bool) -> Sequence[Job]:
+        if columnar:
+            table = JobTable()
+            _store(table, job_dicts)
+            return JobBatch(table)
+        return [job for job in map(_convert, job_dicts) if job is not None]
+
+    @staticmethod
+    def _joined(
+        batches: List[Sequence[Job]], table: Optional[JobTable], delivered: int, columnar: bool
+    ) -> Sequence[Job]:
+        """Join the batches of a scrape, up to the ``delivered`` jobs that went out.
+
+        A batch built while the deadline passed may never have been delivered.
+        """
+        if table is not None:
+            # Every batch is a view of ``table``; the whole scrape is one view of it.
+            return JobBatch(table, 0, delivered)
+        if columnar:
+            # A streaming scrape keeps no jobs.
+            return JobBatch(JobTable())
+        jobs = [job for batch in batches for job in batch]
+        return jobs[:delivered] if len(jobs) > delivered else jobs
+
+    def _span(
+        self,
+        name: str,
+        filters: Optional[ScrapeJobsFilter],
+        batch_size: Optional[int],
+        columnar: bool = False,
+    ) -> ContextManager[Any]:
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.span(
+            name,
+            **{
+                "scrape.filters": sorted(filters) if isinstance(filters, Mapping) else [],
+                "scrape.batch_size": batch_size or 0,
+                "scrape.streaming": self.streaming,
+                "scrape.columnar": columnar,
+            },
+        )
+
+    def _record(
+        self, deadline: Deadline, delivered: int, matches: _Matches, batched: bool = True
+    ) -> None:
+        dedup = matches.dedup
+        duplicates = dedup.duplicates if dedup is not None else 0
+        fanout = matches.fanout
+        report = ScrapeReport(
+            delivered,
+            matches.total,
+            deadline.expired,
+            deadline.elapsed,
+            deadline.timeout,
+            matches.cursor,
+            duplicates=duplicates,
+            dropped=duplicates if dedup is not None and dedup.mode == "drop" else 0,
+            failed_providers=tuple(fanout.failed) if fanout is not None else (),
+            index_seconds=matches.index_seconds,
+        )
+        self.last_report = report
+        if self.metrics is not None:
+            self.metrics.record_request(report, batched)
+        if report.index_seconds:
+            logger.debug(
+                "Scrape built the corpus index in %.2fs before producing jobs; "
+                + "prewarm the manager to build it ahead of requests",
+                report.index_seconds,
+            )
+        if report.timed_out:
+            logger.warning(
+                "Scrape timed out after %.2fs: delivered %d of %s jobs (%s cut off, %.0f jobs/s)",
+                report.elapsed,
+                report.delivered,
+                report.total,
+                report.cut_off,
+                report.jobs_per_second,
+            )
+        else:
+            logger.debug(
+                "Scrape delivered %d jobs in %.2fs (%.0f jobs/s)",
+                report.delivered,
+                report.elapsed,
+                report.jobs_per_second,
+            )
+
+    def scrape_payloads(
+        self,
+        filters: Optional[ScrapeJobsFilter] = None,
+        batch_size: int = 50,
+        patch: Optional[RequestPatch] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[bytes]:
+        """Yield each batch as an encoded JSON array of job dictionaries.
+
+        Over a static corpus the rows come from the payload cache and only
+        ``patch`` (if any) is applied per request. Everything else is encoded on
+        the fly from the regular scrape path, so change-log deltas, dedup and
+        provider fan-out apply as they do to `scrape_jobs`: the canonical
+        listings because their identifiers change on every call, and replayed
+        captures because they are read from disk as they are served. ``patch``
+        only applies to cached rows.
+
+        Once ``timeout`` passes no further batch is produced, and the outcome is
+        kept in ``last_report`` when the iterator is exhausted.
+        """
+        metrics = self.metrics
+        deadline = Deadline(timeout)
+        batches: Iterator[Tuple[int, bytes]]
+        corpus = self.corpus
+        if corpus is not None and self._payloads_cacheable(filters):
+            query = JobQuery.from_filters(filters)
+            rows: Sequence[int] = range(len(corpus))
+            index_seconds = 0.0
+            if not query.is_empty:
+                index, index_seconds = self._built_index()
+                rows = index.search(query)
+            matches = _Matches(len(rows), iter(()), index_seconds=index_seconds)
+            step = batch_size if batch_size and batch_size > 0 else max(len(rows), 1)
+            payloads = self.payloads
+            batches = (
+                (min(step, len(rows) - start), payloads.batch(rows[start : start + step], patch))
+                for start in range(0, len(rows), step)
+            )
         else:
-            on_jobs_batch([], True)
+            matches = self._delivering(filters, deadline)
+            batches = (
+                (len(batch), encode_batch(batch))
+                for batch in iter_batches(matches.job_dicts, batch_size)
+            )
+
+        delivered = 0
+        started = time.perf_counter()
+        for jobs, payload in deadline.limit(batches):
+            if metrics is not None:
+                metrics.record_payload(time.perf_counter() - started, jobs, len(payload))
+            delivered += jobs
+            yield payload
+            started = time.perf_counter()
+        self._record(deadline, delivered, matches)
+
+    def _payloads_cacheable(self, filters: Optional[ScrapeJobsFilter]) -> bool:
+        """Whether a corpus scrape for ``filters`` can be served from static cached rows."""
+        if self.fanout is not None or self.changelog is not None:
+            return False
+        return dedup_request(filters) is None
+
+
+def _ensure_renderer(corpus: ColumnarCorpus) -> JobRenderer:
+    return corpus.renderer
+
+
+def _convert(job_dict: JobDict) -> Optional[Job]:
+    """Convert ``job_dict`` to a `Job`, or log and skip it when it cannot be.
+
+    Recorded and fanned-out listings come from outside the corpus, so one
+    malformed record (say a missing ``date_posted``) must not fail the scrape.
+    """
+    try:
+        return job_from_dict(job_dict)
+    except ValueError as e:
+        _skipped(job_dict, e)
+        return None
+
+
+def _store(table: JobTable, job_dicts: Iterable[JobDict]) -> None:
+    """Append ``job_dicts`` to ``table``, logging and skipping those it cannot store."""
+    for job_dict in job_dicts:
+        try:
+            table.append(job_dict)
+        except ValueError as e:
+            _skipped(job_dict, e)
+
+
+def _skipped(job_dict: JobDict, error: ValueError) -> None:
+    job_id = job_dict.get("job_id") if isinstance(job_dict, dict) else None
+    logger.warning("Skipping job %s that cannot be converted: %s", job_id, error)
+
+
+def _collecting(
+    batches: Iterable[Sequence[Job]], collected: List[Sequence[Job]]
+) -> Iterator[Sequence[Job]]:
+    for batch in batches:
+        collected.append(batch)
+        yield batch
+
 
-        return jobs
+def _since(filters: Optional[ScrapeJobsFilter]) -> Any:
+    if isinstance(filters, Mapping):
+        for key in ("since", "cursor"):
+            if filters.get(key) is not None:
+                return filters[key]
+    return None
@@ -0,0 +1,458 @@
+"""
+Spans, histograms and counters for the scrape hot path.
+
+`ScrapeMetrics` records how long batches take to generate, how long
+``on_jobs_batch`` blocks, how large batches are and how many jobs each request
+serves. Values are kept in a small in-process registry that `serve_metrics`
+exposes in the Prometheus text format and `log_stats_periodically` summarises
+in the log, so they are available without an OTLP collector. When OpenTelemetry
+is importable the same measurements are mirrored to its meter, and requests and
+batches get spans from its tracer, so they reach the collector configured by
+``init_telemetry``. The counters of a tracked `ResultCache` are reported with
+them.
+
+A manager without metrics only checks ``metrics is None`` once per batch.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from dataclasses import asdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from job_scrapper_contracts import Job, JobDict
+
+from .batching import ScrapeReport
+from .cache import ResultCache
+from .payloads import encode_batch
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+BATCH_JOBS_BUCKETS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+PAYLOAD_BYTES_BUCKETS: Tuple[float, ...] = tuple(float(1024 * 4**power) for power in range(10))
+
+DEFAULT_PAYLOAD_SAMPLE_EVERY = 16
+"""Encode one batch in this many to measure payload bytes; 1 measures every batch."""
+
+METRICS_PREFIX = "scrapper"
+INSTRUMENTATION_NAME = "scrapper_service"
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus-style cumulative export."""
+
+    def __init__(self, name: str, description: str, unit: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.description = description
+        self.unit = unit
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q`` quantile by interpolating within its bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self, prefix: str) -> List[str]:
+        name = f"{prefix}_{self.name}"
+        lines = [f"# HELP {name} {self.description}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def add(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def render(self, prefix: str) -> List[str]:
+        name = f"{prefix}_{self.name}_total"
+        return [
+            f"# HELP {name} {self.description}",
+            f"# TYPE {name} counter",
+            f"{name} {self.value}",
+        ]
+
+
+class ScrapeMetrics:
+    """Measurements of a manager's scrapes, shared by every request it serves.
+
+    Attributes:
+        payload_sample_every: Payload bytes are measured by encoding one batch
+            in this many, since encoding every batch would double the cost of a
+            scrape. `ScrapperManager.scrape_payloads` always reports exact sizes.
+    """
+
+    def __init__(
+        self,
+        payload_sample_every: int = DEFAULT_PAYLOAD_SAMPLE_EVERY,
+        opentelemetry: bool = True,
+    ) -> None:
+        if payload_sample_every < 1:
+            raise ValueError("payload_sample_every must be at least 1")
+        self.payload_sample_every = payload_sample_every
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._batches_seen = 0
+
+        self.requests = Counter("requests", "Scrape requests served.")
+        self.timeouts = Counter("timeouts", "Scrape requests cut short by their timeout.")
+        self.batches = Counter("batches", "Batches delivered to callers.")
+        self.jobs = Counter("jobs_served", "Jobs delivered to callers.")
+        self.provider_failures = Counter(
+            "provider_failures", "Simulated providers that failed during a scrape."
+        )
+        self.request_duration = Histogram(
+            "request_duration_seconds", "Wall time of a scrape request.", "s", LATENCY_BUCKETS
+        )
+        self.generation = Histogram(
+            "batch_generation_seconds",
+            "Time spent producing one batch, excluding the callback.",
+            "s",
+            LATENCY_BUCKETS,
+        )
+        self.callback = Histogram(
+            "batch_callback_seconds",
+            "Time on_jobs_batch blocked delivery of one batch.",
+            "s",
+            LATENCY_BUCKETS,
+        )
+        self.batch_jobs = Histogram(
+            "batch_jobs", "Jobs per delivered batch.", "{job}", BATCH_JOBS_BUCKETS
+        )
+        self.payload_bytes = Histogram(
+            "batch_payload_bytes",
+            "Encoded JSON size of a batch (sampled for Job batches).",
+            "By",
+            PAYLOAD_BYTES_BUCKETS,
+        )
+        self.counters = (
+            self.requests,
+            self.timeouts,
+            self.batches,
+            self.jobs,
+            self.provider_failures,
+        )
+        self.histograms = (
+            self.request_duration,
+            self.generation,
+            self.callback,
+            self.batch_jobs,
+            self.payload_bytes,
+        )
+
+        self.result_cache: Optional[ResultCache] = None
+
+        self._tracer: Any = None
+        self._trace: Any = None
+        self._otel: Dict[str, Any] = {}
+        if opentelemetry:
+            self._bind_opentelemetry()
+
+    def _bind_opentelemetry(self) -> None:
+        try:
+            from opentelemetry import metrics as otel_metrics
+            from opentelemetry import trace
+        except ImportError:
+            return
+        self._trace = trace
+        self._tracer = trace.get_tracer(INSTRUMENTATION_NAME)
+        meter = otel_metrics.get_meter(INSTRUMENTATION_NAME)
+        for counter in self.counters:
+            self._otel[counter.name] = meter.create_counter(
+                f"{METRICS_PREFIX}.{counter.name}", description=counter.description
+            )
+        for histogram in self.histograms:
+            self._otel[histogram.name] = meter.create_histogram(
+                f"{METRICS_PREFIX}.{histogram.name}",
+                unit=histogram.unit,
+                description=histogram.description,
+            )
+
+    def track_cache(self, cache: ResultCache) -> None:
+        """Report the counters of ``cache`` alongside the scrape metrics."""
+        self.result_cache = cache
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Any]:
+        """Start a span under the current one, or do nothing without a tracer."""
+        if self._tracer is None:
+            return nullcontext()
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+    def record_generation(self, seconds: float, job_dicts: Sequence[JobDict]) -> None:
+        """Record the time taken to produce one batch, sampling its encoded size."""
+        with self._lock:
+            self._batches_seen += 1
+            sample = self._batches_seen % self.payload_sample_every == 0
+        size = len(encode_batch(job_dicts)) if sample else None
+        self._observe(self.generation, seconds)
+        if size is not None:
+            self._observe(self.payload_bytes, size)
+
+    def record_delivery(self, seconds: float, jobs: int) -> None:
+        """Record one ``on_jobs_batch`` call."""
+        self._observe(self.callback, seconds)
+        self._observe(self.batch_jobs, jobs)
+        self._add(self.batches, 1)
+        self._add(self.jobs, jobs)
+
+    def record_payload(self, seconds: float, jobs: int, size: int) -> None:
+        """Record one pre-encoded batch, whose size is known exactly."""
+        self._observe(self.generation, seconds)
+        self._observe(self.batch_jobs, jobs)
+        self._observe(self.payload_bytes, size)
+        self._add(self.batches, 1)
+        self._add(self.jobs, jobs)
+
+    def record_request(self, report: ScrapeReport, delivered_in_batches: bool) -> None:
+        """Record a finished scrape; ``delivered_in_batches`` avoids counting jobs twice."""
+        self._observe(self.request_duration, report.elapsed)
+        self._add(self.requests, 1)
+        if report.timed_out:
+            self._add(self.timeouts, 1)
+        if report.failed_providers:
+            self._add(self.provider_failures, len(report.failed_providers))
+        if not delivered_in_batches:
+            self._add(self.jobs, report.delivered)
+        if self._trace is not None:
+            span = self._trace.get_current_span()
+            span.set_attribute("scrape.delivered", report.delivered)
+            span.set_attribute("scrape.timed_out", report.timed_out)
+            if report.total is not None:
+                span.set_attribute("scrape.total", report.total)
+
+    def observe_batches(
+        self, on_jobs_batch: Callable[[Sequence[Job], bool], None]
+    ) -> Callable[[Sequence[Job], bool], None]:
+        """Wrap a batch callback with a span and latency, size and job metrics."""
+
+        def observed(jobs: Sequence[Job], is_last: bool) -> None:
+            with self.span("scrape.batch", jobs=len(jobs), is_last=is_last):
+                started = time.perf_counter()
+                on_jobs_batch(jobs, is_last)
+                self.record_delivery(time.perf_counter() - started, len(jobs))
+
+        return observed
+
+    def observe_async_batches(
+        self, on_jobs_batch: Callable[[Sequence[Job], bool], Awaitable[None]]
+    ) -> Callable[[Sequence[Job], bool], Awaitable[None]]:
+        """Asyncio counterpart of `observe_batches`."""
+
+        async def observed(jobs: Sequence[Job], is_last: bool) -> None:
+            with self.span("scrape.batch", jobs=len(jobs), is_last=is_last):
+                started = time.perf_counter()
+                await on_jobs_batch(jobs, is_last)
+                self.record_delivery(time.perf_counter() - started, len(jobs))
+
+        return observed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every counter and a summary of every histogram."""
+        with self._lock:
+            values: Dict[str, Any] = {counter.name: counter.value for counter in self.counters}
+            for histogram in self.histograms:
+                values[histogram.name] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                }
+        if self.result_cache is not None:
+            values["result_cache"] = asdict(self.result_cache.stats)
+        values["uptime_seconds"] = time.time() - self.started_at
+        return values
+
+    def render_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        with self._lock:
+            lines: List[str] = []
+            for counter in self.counters:
+                lines += counter.render(METRICS_PREFIX)
+            for histogram in self.histograms:
+                lines += histogram.render(METRICS_PREFIX)
+        if self.result_cache is not None:
+            lines += _render_cache(self.result_cache)
+        return "\n".join(lines) + "\n"
+
+    def _observe(self, histogram: Histogram, value: float) -> None:
+        with self._lock:
+            histogram.observe(value)
+        instrument = self._otel.get(histogram.name)
+        if instrument is not None:
+            instrument.record(value)
+
+    def _add(self, counter: Counter, amount: int) -> None:
+        with self._lock:
+            counter.add(amount)
+        instrument = self._otel.get(counter.name)
+        if instrument is not None:
+            instrument.add(amount)
+
+
+def serve_metrics(
+    metrics: ScrapeMetrics, port: int, host: str = "0.0.0.0"
+) -> "ThreadingHTTPServer":
+    """Serve ``GET /metrics`` in Prometheus text format from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("metrics endpoint: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="scrapper-metrics", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+def log_stats_periodically(
+    metrics: ScrapeMetrics, interval: float, stop: Optional[threading.Event] = None
+) -> threading.Thread:
+    """Log a one-line summary of ``metrics`` every ``interval`` seconds."""
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+    stop = stop or threading.Event()
+
+    def run() -> None:
+        previous_jobs = metrics.jobs.value
+        while not stop.wait(interval):
+            stats = metrics.snapshot()
+            jobs = stats["jobs_served"]
+            logger.info(
+                "Served %d requests (%d timed out), %d jobs (%.0f jobs/s); "
+                "generation p99 %s, callback p99 %s, batch p50 %s jobs",
+                stats["requests"],
+                stats["timeouts"],
+                jobs,
+                (jobs - previous_jobs) / interval,
+                _format_seconds(stats["batch_generation_seconds"]["p99"]),
+                _format_seconds(stats["batch_callback_seconds"]["p99"]),
+                _format_number(stats["batch_jobs"]["p50"]),
+            )
+            cache = metrics.result_cache
+            if cache is not None:
+                cache_stats = cache.stats
+                logger.info(
+                    "Result cache: %d entries (%.1f MiB), %.0f%% hits, %d evictions, "
+                    "%d expirations",
+                    cache_stats.entries,
+                    cache_stats.bytes / 2**20,
+                    cache_stats.hit_rate * 100,
+                    cache_stats.evictions,
+                    cache_stats.expirations,
+                )
+            previous_jobs = jobs
+
+    thread = threading.Thread(target=run, name="scrapper-stats", daemon=True)
+    thread.start()
+    return thread
+
+
+def _render_cache(cache: ResultCache) -> List[str]:
+    stats = cache.stats
+    lines: List[str] = []
+    for field, description in (
+        ("hits", "Scrape requests answered from the result cache."),
+        ("misses", "Scrape requests that missed the result cache."),
+        ("evictions", "Result cache entries evicted to stay within its limits."),
+        ("expirations", "Result cache entries dropped after their TTL."),
+        ("rejected", "Results not cached because they were cut short or too large."),
+    ):
+        counter = Counter(f"result_cache_{field}", description)
+        counter.value = getattr(stats, field)
+        lines += counter.render(METRICS_PREFIX)
+    for field, description in (
+        ("entries", "Entries in the result cache."),
+        ("bytes", "Estimated memory of the result cache entries."),
+    ):
+        name = f"{METRICS_PREFIX}_result_cache_{field}"
+        lines += [
+            f"# HELP {name} {description}",
+            f"# TYPE {name} gauge",
+            f"{name} {getattr(stats, field)}",
+        ]
+    return lines
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}ms"
+
+
+def _format_number(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
@@ -0,0 +1,216 @@
+"""
+Pre-serialised JSON payloads for corpus rows and batches.
+
+Encoding the same mock jobs for every scrape is wasted work on the hottest
+path. `PayloadCache` encodes a corpus block once, keeps the bytes of every row
+in a size-bounded LRU, and assembles batch payloads by joining those buffers.
+Fields that vary per request (``job_id`` and ``url``) sit at the front of every
+row encoding, so a request-specific patch only re-encodes that short head and
+reuses the rest of the row through a zero-copy `memoryview`.
+"""
+
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from job_scrapper_contracts import JobDict
+
+from .corpus import BLOCK_SIZE, ColumnarCorpus
+
+Buffer = Union[bytes, memoryview]
+
+RequestPatch = Callable[[int, int, str], Tuple[int, str]]
+"""Maps ``(row, job_id, url)`` to the ``(job_id, url)`` sent for one request."""
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_BATCHES = 1024
+BATCH_BYTES_SHARE = 8
+"""Whole batches larger than ``max_bytes // BATCH_BYTES_SHARE`` are never cached."""
+
+
+def encode_job(job_dict: JobDict) -> Tuple[bytes, int]:
+    """Encode a job dictionary with ``job_id`` and ``url`` first.
+
+    Returns the encoded bytes and the length of the head holding those two fields
+    (up to, but excluding, the comma that separates it from the rest).
+    """
+    head = _encode_head(job_dict["job_id"], job_dict["url"])
+    rest = {key: value for key, value in job_dict.items() if key not in ("job_id", "url")}
+    body = json.dumps(rest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return head + b"," + body[1:], len(head)
+
+
+def encoded_size(job_dict: JobDict) -> int:
+    """Size in bytes of ``job_dict`` as encoded by `encode_job`."""
+    return len(json.dumps(job_dict, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def encode_batch(job_dicts: Iterable[JobDict]) -> bytes:
+    """Encode job dictionaries as a JSON array without any caching."""
+    return join_payloads([encode_job(job_dict)[0] for job_dict in job_dicts])
+
+
+def join_payloads(parts: Sequence[Buffer]) -> bytes:
+    """Join encoded rows into a JSON array in a single copy."""
+    return b"".join((b"[", b",".join(parts), b"]"))
+
+
+class _EncodedBlock:
+    __slots__ = ("payloads", "head_lengths", "job_ids", "urls", "size")
+
+    def __init__(self, job_dicts: List[JobDict]) -> None:
+        self.payloads: List[bytes] = []
+        self.head_lengths = array("I")
+        self.job_ids: List[int] = []
+        self.urls: List[str] = []
+        size = 0
+        for job_dict in job_dicts:
+            payload, head_length = encode_job(job_dict)
+            self.payloads.append(payload)
+            self.head_lengths.append(head_length)
+            self.job_ids.append(job_dict["job_id"])
+            self.urls.append(job_dict["url"])
+            size += len(payload)
+        self.size = size
+
+
+class PayloadCache:
+    """Size-bounded cache of encoded rows and common batches for a corpus.
+
+    Rows are encoded a block at a time, and unpatched batches over consecutive
+    rows are additionally cached whole, keyed by their first row and length.
+    Both count against ``max_bytes``: once it is exceeded, the least recently
+    used batches are evicted first, as they are cheap to join again from the
+    rows, and then the least recently used blocks. A batch larger than an
+    eighth of the budget (a request with an unbounded ``batch_size``, say) is
+    served without being cached.
+
+    The cache is shared by concurrent requests. Its LRUs are updated under a
+    lock, while blocks and batches are encoded outside it, so two requests
+    missing the same block at once may both encode it.
+    """
+
+    def __init__(
+        self,
+        corpus: ColumnarCorpus,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_batches: int = DEFAULT_MAX_BATCHES,
+    ) -> None:
+        self.corpus = corpus
+        self.max_bytes = max_bytes
+        self.max_batches = max_batches
+        self._blocks: "OrderedDict[int, _EncodedBlock]" = OrderedDict()
+        self._batches: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes held by cached rows and batches."""
+        return self._cached_bytes
+
+    def batch(self, rows: Sequence[int], patch: Optional[RequestPatch] = None) -> bytes:
+        """Return the JSON array payload for ``rows``, optionally patched per request."""
+        key = _contiguous_key(rows) if patch is None else None
+        if key is not None:
+            with self._lock:
+                cached = self._batches.get(key)
+                if cached is not None:
+                    self._batches.move_to_end(key)
+                    return cached
+
+        payload = b"".join(self.pieces(rows, patch))
+
+        if (
+            key is not None
+            and self.max_batches > 0
+            and len(payload) <= self.max_bytes // BATCH_BYTES_SHARE
+        ):
+            with self._lock:
+                if key not in self._batches:
+                    self._batches[key] = payload
+                    self._cached_bytes += len(payload)
+                    while len(self._batches) > self.max_batches:
+                        self._evict_batch()
+                    self._evict()
+        return payload
+
+    def pieces(self, rows: Iterable[int], patch: Optional[RequestPatch] = None) -> List[Buffer]:
+        """Return the buffers that make up the payload for ``rows``, brackets included.
+
+        Joining the result with ``b"".join`` yields the batch; that join is the only
+        copy of cached row bytes.
+        """
+        pieces: List[Buffer] = [b"["]
+        append = pieces.append
+        block_index = -1
+        block: Optional[_EncodedBlock] = None
+        for row in rows:
+            index, offset = divmod(row, BLOCK_SIZE)
+            if index != block_index or block is None:
+                block = self._block(index)
+                block_index = index
+            payload = block.payloads[offset]
+            if patch is None:
+                append(payload)
+            else:
+                job_id, url = patch(row, block.job_ids[offset], block.urls[offset])
+                append(_encode_head(job_id, url))
+                # The stored payload continues with ",<rest>" after its head.
+                append(memoryview(payload)[block.head_lengths[offset] :])
+            append(b",")
+        if len(pieces) > 1:
+            pieces[-1] = b"]"
+        else:
+            append(b"]")
+        return pieces
+
+    def _block(self, index: int) -> _EncodedBlock:
+        with self._lock:
+            block = self._blocks.get(index)
+            if block is not None:
+                self.hits += 1
+                self._blocks.move_to_end(index)
+                return block
+            self.misses += 1
+
+        columns = self.corpus.columns(index)
+        block = _EncodedBlock(self.corpus.block_dicts(columns, 0, len(columns)))
+        with self._lock:
+            raced = self._blocks.get(index)
+            if raced is not None:
+                # Another request encoded the same block meanwhile; keep the cached one.
+                return raced
+            self._blocks[index] = block
+            self._cached_bytes += block.size
+            self._evict()
+        return block
+
+    def _evict(self) -> None:
+        """Evict batches, then blocks, until the cache fits ``max_bytes``; needs the lock."""
+        while self._cached_bytes > self.max_bytes and self._batches:
+            self._evict_batch()
+        while self._cached_bytes > self.max_bytes and len(self._blocks) > 1:
+            _, evicted = self._blocks.popitem(last=False)
+            self._cached_bytes -= evicted.size
+
+    def _evict_batch(self) -> None:
+        _, evicted = self._batches.popitem(last=False)
+        self._cached_bytes -= len(evicted)
+
+
+def _encode_head(job_id: int, url: str) -> bytes:
+    return b'{"job_id":%d,"url":%s' % (
+        job_id,
+        json.dumps(url, ensure_ascii=False).encode("utf-8"),
+    )
+
+
+def _contiguous_key(rows: Sequence[int]) -> Optional[Tuple[int, int]]:
+    if isinstance(rows, range) and rows.step == 1 and len(rows) > 0:
+        return rows.start, len(rows)
+    return None
@@ -0,0 +1,304 @@
+"""
+Simulated fan-out over several job boards with one merged result stream.
+
+Production scrapes several boards at once and merges what they return. Given a
+list of `ProviderSpec`, `ScrapperManager` splits its corpus into one slice per
+provider and `FanOut` fetches every slice concurrently from a thread pool, page
+by page, with the provider's latency and failure rate. Each job's ``source``
+is set to the provider's name, and the pages are merged into the single stream
+behind ``on_jobs_batch``:
+
+- ``interleave``: jobs in arrival order, so faster providers come first.
+- ``date_posted``: newest first across all providers. Every provider lists its
+  slice newest first, like a job board, and the streams are merged by date, so
+  the merged stream moves at the pace of the slowest provider.
+
+Pages are rendered in the pool's threads. Their simulated latencies overlap, but
+rendering still shares the GIL.
+"""
+
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from job_scrapper_contracts import JobDict
+
+from .batching import Deadline, iter_batches
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MERGE_MODES = ("interleave", "date_posted")
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_PENDING_PAGES = 4
+"""Pages a provider may fetch ahead of the merge before it waits."""
+
+_PUT_POLL_SECONDS = 0.1
+_DONE = None
+
+JobSource = Callable[[], Iterable[JobDict]]
+"""Produces fresh job dicts of one provider's slice, in the order the provider lists them.
+
+Their ``source`` is overwritten in place, so they must not be shared.
+"""
+
+
+class ProviderError(RuntimeError):
+    """Simulated failure of a provider; its remaining jobs are not delivered."""
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """One simulated job board.
+
+    Attributes:
+        name: Provider name, written to the ``source`` of its jobs.
+        share: Size of the provider's corpus slice relative to the others.
+        latency: Mean seconds the provider takes to return a page.
+        jitter: Relative spread of the latency; each page takes
+            ``latency * (1 ± jitter)`` seconds, uniformly distributed.
+        failure_rate: Probability that a page request fails. A failure ends the
+            provider's part of the scrape; jobs from other providers still arrive.
+        page_size: Jobs per page.
+    """
+
+    name: str
+    share: float = 1.0
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    def __post_init__(self) -> None:
+        if self.share <= 0:
+            raise ValueError(f"Provider {self.name} needs a positive share")
+        if self.latency < 0 or not 0 <= self.jitter <= 1:
+            raise ValueError(f"Provider {self.name} needs a non-negative latency and 0-1 jitter")
+        if not 0 <= self.failure_rate <= 1:
+            raise ValueError(f"Provider {self.name} needs a failure rate between 0 and 1")
+        if self.page_size < 1:
+            raise ValueError(f"Provider {self.name} needs a positive page size")
+
+    def page_delay(self, rng: random.Random) -> float:
+        if not self.latency:
+            return 0.0
+        return self.latency * (1 + rng.uniform(-self.jitter, self.jitter))
+
+
+def uniform_providers(
+    count: int,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> List[ProviderSpec]:
+    """Return ``count`` equally sized providers named ``mock-0``, ``mock-1``, ..."""
+    if count < 1:
+        raise ValueError("At least one provider is required")
+    return [
+        ProviderSpec(f"mock-{index}", 1.0, latency, jitter, failure_rate, page_size)
+        for index in range(count)
+    ]
+
+
+@dataclass
+class FanOutReport:
+    """What each provider contributed to one scrape, filled in as it runs.
+
+    Attributes:
+        jobs: Jobs received from each provider.
+        failed: Providers that failed before delivering their whole slice.
+        wait_seconds: Time the merge spent waiting for provider pages.
+    """
+
+    jobs: Dict[str, int] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+    wait_seconds: float = 0.0
+
+
+class FanOut:
+    """Fetches provider slices concurrently and merges them into one stream.
+
+    The thread pool is shared by every scrape of the manager; ``max_workers``
+    defaults to room for four concurrent scrapes.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[ProviderSpec],
+        merge: str = "interleave",
+        max_pending_pages: int = DEFAULT_PENDING_PAGES,
+        seed: int = 0,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one provider is required")
+        if len({provider.name for provider in providers}) != len(providers):
+            raise ValueError("Provider names must be unique")
+        if merge not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode {merge!r}; expected one of {MERGE_MODES}")
+        self.providers = list(providers)
+        self.merge = merge
+        self.max_pending_pages = max(max_pending_pages, 1)
+        self.seed = seed
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor: "ThreadPoolExecutor" = ThreadPoolExecutor(
+            max_workers=max_workers or 4 * len(self.providers),
+            thread_name_prefix="scrapper-provider",
+        )
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def sorted_by_date(self) -> bool:
+        return self.merge == "date_posted"
+
+    def slices(self, total: int) -> List[Tuple[int, int]]:
+        """Split ``[0, total)`` into consecutive ranges sized by provider share."""
+        shares = [provider.share for provider in self.providers]
+        scale = total / sum(shares)
+        bounds = [0]
+        running = 0.0
+        for share in shares:
+            running += share
+            bounds.append(min(round(running * scale), total))
+        bounds[-1] = total
+        return list(zip(bounds, bounds[1:]))
+
+    def run(
+        self, sources: Sequence[JobSource], deadline: Optional[Deadline] = None
+    ) -> Tuple[Iterator[JobDict], FanOutReport]:
+        """Start fetching every provider and return the merged jobs and their report.
+
+        Fetching stops when the merged iterator is exhausted, closed or
+        garbage-collected, or when ``deadline`` passes while it waits.
+        """
+        if len(sources) != len(self.providers):
+            raise ValueError("Expected one job source per provider")
+        with self._lock:
+            self._requests += 1
+            request = self._requests
+        report = FanOutReport({provider.name: 0 for provider in self.providers})
+        cancel = threading.Event()
+        queues: List["queue.Queue[Any]"] = []
+        shared: "queue.Queue[Any]" = queue.Queue(self.max_pending_pages * len(sources))
+        for index, source in enumerate(sources):
+            pages: "queue.Queue[Any]" = (
+                queue.Queue(self.max_pending_pages) if self.sorted_by_date else shared
+            )
+            queues.append(pages)
+            rng = random.Random(f"{self.seed}:{request}:{index}")
+            self._executor.submit(self._fetch, index, source, pages, cancel, rng)
+
+        if self.sorted_by_date:
+            streams = [self._drain(pages, 1, report, cancel, deadline) for pages in queues]
+            jobs: Iterator[JobDict] = heapq.merge(
+                *streams, key=itemgetter("date_posted"), reverse=True
+            )
+        else:
+            jobs = self._drain(shared, len(sources), report, cancel, deadline)
+        merged = _cancelling(jobs, cancel)
+        # A scrape that times out before its first job never starts the generator.
+        weakref.finalize(merged, cancel.set)
+        return merged, report
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _fetch(
+        self,
+        index: int,
+        source: JobSource,
+        pages: "queue.Queue[Any]",
+        cancel: threading.Event,
+        rng: random.Random,
+    ) -> None:
+        provider = self.providers[index]
+        name = provider.name
+        try:
+            for page in iter_batches(source(), provider.page_size):
+                delay = provider.page_delay(rng)
+                if delay and cancel.wait(delay):
+                    return
+                if provider.failure_rate and rng.random() < provider.failure_rate:
+                    raise ProviderError(f"Provider {name} failed to return a page")
+                for job_dict in page:
+                    job_dict["source"] = name
+                if not _put(pages, (index, page), cancel):
+                    return
+        except Exception as e:
+            _put(pages, (index, e), cancel)
+            return
+        _put(pages, (index, _DONE), cancel)
+
+    def _drain(
+        self,
+        pages: "queue.Queue[Any]",
+        feeders: int,
+        report: FanOutReport,
+        cancel: threading.Event,
+        deadline: Optional[Deadline],
+    ) -> Iterator[JobDict]:
+        """Yield jobs from ``pages`` until all ``feeders`` providers writing to it are done."""
+        live = feeders
+        while live and not cancel.is_set():
+            timeout = deadline.remaining() if deadline is not None else None
+            waited = time.perf_counter()
+            try:
+                index, page = pages.get(timeout=timeout)
+            except queue.Empty:
+                # The deadline passed while every provider was still fetching.
+                if deadline is not None:
+                    deadline.check()
+                return
+            finally:
+                report.wait_seconds += time.perf_counter() - waited
+            name = self.providers[index].name
+            if page is _DONE or isinstance(page, BaseException):
+                live -= 1
+                if page is not _DONE:
+                    report.failed.append(name)
+                    logger.warning("%s; delivering the other providers' jobs", page)
+                continue
+            report.jobs[name] += len(page)
+            yield from page
+
+
+def _cancelling(jobs: Iterator[JobDict], cancel: threading.Event) -> Iterator[JobDict]:
+    """Yield from ``jobs`` and stop the providers once iteration ends for any reason."""
+    try:
+        yield from jobs
+    finally:
+        cancel.set()
+
+
+def _put(pages: "queue.Queue[Any]", item: Any, cancel: threading.Event) -> bool:
+    """Queue ``item`` once there is room; return ``False`` if the scrape was cancelled."""
+    while not cancel.is_set():
+        try:
+            pages.put(item, timeout=_PUT_POLL_SECONDS)
+        except queue.Full:
+            continue
+        return True
+    return False
@@ -0,0 +1,346 @@
+"""
+Filter evaluation over mock jobs, backed by precomputed corpus indexes.
+
+`JobQuery` normalises a `ScrapeJobsFilter` into the predicates the mock can
+honour. `CorpusIndex` answers those predicates over a `SyntheticCorpus` using
+inverted indexes for categorical fields and value-sorted row arrays for salary
+and posting date, so a filtered scrape only touches the rows of its most
+selective predicate instead of scanning the whole corpus.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from itertools import compress
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from job_scrapper_contracts import JobDict, ScrapeJobsFilter
+
+from .corpus import ColumnarCorpus, CorpusColumns
+from .jobs_data import parse_timestamp
+
+_MINUTE = timedelta(minutes=1)
+_ROW_TYPECODE = "I"
+_PACK_SHIFT = 32
+_PACK_MASK = (1 << _PACK_SHIFT) - 1
+
+
+@dataclass(frozen=True)
+class JobQuery:
+    """Normalised set of predicates extracted from a scrape filter.
+
+    String predicates are case-insensitive and match when the job's value is
+    any of the given values. ``min_salary`` keeps jobs whose upper salary bound
+    reaches it and ``max_salary`` keeps jobs whose lower bound does not exceed
+    it, so ranges overlap rather than nest. Posting dates are inclusive and
+    compared as naive UTC; a job whose ``date_posted`` is missing or cannot be
+    parsed never matches a date bound.
+    """
+
+    categories: FrozenSet[str] = frozenset()
+    regions: FrozenSet[str] = frozenset()
+    employment_types: FrozenSet[str] = frozenset()
+    industries: FrozenSet[str] = frozenset()
+    is_remote: Optional[bool] = None
+    min_salary: Optional[int] = None
+    max_salary: Optional[int] = None
+    posted_after: Optional[datetime] = None
+    posted_before: Optional[datetime] = None
+
+    @classmethod
+    def from_filters(cls, filters: Optional[ScrapeJobsFilter]) -> "JobQuery":
+        """Build a query from a filter mapping or object.
+
+        Recognised keys are ``category``/``categories``, ``region``/``regions``,
+        ``employment_type``/``employment_types``, ``industry``/``industries``,
+        ``is_remote``/``remote``, ``min_salary``, ``max_salary``,
+        ``posted_after``/``min_date`` and ``posted_before``/``max_date``.
+        Unknown keys and empty values are ignored.
+        """
+        if not filters:
+            return cls()
+
+        def value(*keys: str) -> Any:
+            for key in keys:
+                if isinstance(filters, Mapping):
+                    found = filters.get(key)
+                else:
+                    found = getattr(filters, key, None)
+                if found is not None:
+                    return found
+            return None
+
+        remote = value("is_remote", "remote")
+        min_salary = value("min_salary")
+        max_salary = value("max_salary")
+        return cls(
+            categories=_string_set(value("category", "categories")),
+            regions=_string_set(value("region", "regions")),
+            employment_types=_string_set(value("employment_type", "employment_types")),
+            industries=_string_set(value("industry", "industries")),
+            is_remote=None if remote is None else bool(remote),
+            min_salary=None if min_salary is None else int(min_salary),
+            max_salary=None if max_salary is None else int(max_salary),
+            posted_after=_as_datetime(value("posted_after", "min_date")),
+            posted_before=_as_datetime(value("posted_before", "max_date")),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return self == JobQuery()
+
+    def matches(self, job_dict: JobDict) -> bool:
+        """Evaluate the query against a single job dictionary."""
+        location = job_dict.get("location") or {}
+        salary = job_dict.get("salary") or {}
+        if not _string_matches(self.categories, job_dict.get("category")):
+            return False
+        if not _string_matches(self.regions, location.get("region")):
+            return False
+        if not _string_matches(self.employment_types, job_dict.get("employment_type")):
+            return False
+        if not _string_matches(self.industries, job_dict.get("industry")):
+            return False
+        if self.is_remote is not None and bool(location.get("is_remote")) != self.is_remote:
+            return False
+        if self.min_salary is not None and (salary.get("max_value") or 0) < self.min_salary:
+            return False
+        if self.max_salary is not None and (salary.get("min_value") or 0) > self.max_salary:
+            return False
+        if self.posted_after is None and self.posted_before is None:
+            return True
+        posted = _posted_at(job_dict)
+        if posted is None:
+            return False
+        if self.posted_after is not None and posted < self.posted_after:
+            return False
+        if self.posted_before is not None and posted > self.posted_before:
+            return False
+        return True
+
+
+class _SortedIndex:
+    """Row ids ordered by a numeric column, alongside the sorted values."""
+
+    def __init__(self, column: Sequence[int]) -> None:
+        packed = sorted((value << _PACK_SHIFT) | row for row, value in enumerate(column))
+        self.values = array("I", [item >> _PACK_SHIFT for item in packed])
+        self.rows = array(_ROW_TYPECODE, [item & _PACK_MASK for item in packed])
+
+    def between(self, low: Optional[int], high: Optional[int]) -> Tuple[int, int]:
+        """Return the ``rows`` slice bounds for values within ``[low, high]``."""
+        start = 0 if low is None else bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect_right(self.values, high)
+        return start, max(start, stop)
+
+
+class CorpusIndex:
+    """Precomputed indexes over every row of a `ColumnarCorpus`.
+
+    Building the index generates the corpus columns once and keeps them in
+    memory; queries then cost roughly the number of candidate rows of their
+    most selective predicate.
+    """
+
+    def __init__(self, corpus: ColumnarCorpus) -> None:
+        self.corpus = corpus
+        self.columns: CorpusColumns = corpus.all_columns()
+        renderer = corpus.renderer
+        templates = renderer.templates
+
+        self._template_category = [template.category.casefold() for template in templates]
+        self._template_employment = [template.employment_type.casefold() for template in templates]
+        self._template_industry = [template.industry.casefold() for template in templates]
+        self._region_names = [region.casefold() for region in renderer.regions]
+
+        template_postings = _postings(self.columns.template, len(templates))
+        self.categories = _group_postings(template_postings, self._template_category)
+        self.employment_types = _group_postings(template_postings, self._template_employment)
+        self.industries = _group_postings(template_postings, self._template_industry)
+        self.regions = _group_postings(
+            _postings(self.columns.region, len(renderer.regions)), self._region_names
+        )
+        remote_postings = _postings(self.columns.is_remote, 2)
+        self.remote = {False: remote_postings[0], True: remote_postings[1]}
+
+        self.salary_min = _SortedIndex(self.columns.salary_min)
+        self.salary_max = _SortedIndex(self.columns.salary_max)
+        self.posted = _SortedIndex(self.columns.posted)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def search(self, query: JobQuery) -> Sequence[int]:
+        """Return the ascending row ids matching ``query``."""
+        total = len(self.columns)
+        if query.is_empty:
+            return range(total)
+
+        candidates: List[Tuple[int, Callable[[], Iterable[int]]]] = []
+
+        for selected, postings in (
+            (query.categories, self.categories),
+            (query.employment_types, self.employment_types),
+            (query.industries, self.industries),
+            (query.regions, self.regions),
+        ):
+            if selected:
+                lists = [postings[name] for name in selected if name in postings]
+                size = sum(len(rows) for rows in lists)
+                if size == 0:
+                    return []
+                candidates.append((size, _merged(lists)))
+
+        if query.is_remote is not None:
+            rows = self.remote[query.is_remote]
+            candidates.append((len(rows), _identity(rows)))
+
+        posted_low, posted_high = self._posted_bounds(query)
+        for index, low, high in (
+            (self.salary_max, query.min_salary, None),
+            (self.salary_min, None, query.max_salary),
+            (self.posted, posted_low, posted_high),
+        ):
+            if low is None and high is None:
+                continue
+            start, stop = index.between(low, high)
+            if start == stop:
+                return []
+            candidates.append((stop - start, _sorted_slice(index.rows, start, stop)))
+
+        if not candidates:
+            return range(total)
+
+        _, source = min(candidates, key=lambda candidate: candidate[0])
+        predicate = self._row_predicate(query, posted_low, posted_high)
+        return array(_ROW_TYPECODE, filter(predicate, source()))
+
+    def job_dicts(self, rows: Iterable[int]) -> List[JobDict]:
+        """Materialise the given rows as job dictionaries."""
+        return self.corpus.dicts(self.columns, rows)
+
+    def _posted_bounds(self, query: JobQuery) -> Tuple[Optional[int], Optional[int]]:
+        window_start = self.corpus.renderer.window_start
+        low = high = None
+        if query.posted_after is not None:
+            delta = query.posted_after - window_start
+            low = max(-(-delta // _MINUTE), 0)
+        if query.posted_before is not None:
+            delta = query.posted_before - window_start
+            high = delta // _MINUTE
+            if high < 0:
+                high = -1
+        return low, high
+
+    def _row_predicate(
+        self, query: JobQuery, posted_low: Optional[int], posted_high: Optional[int]
+    ) -> Callable[[int], bool]:
+        columns = self.columns
+        template_ok = [
+            _string_matches(query.categories, category)
+            and _string_matches(query.employment_types, employment)
+            and _string_matches(query.industries, industry)
+            for category, employment, industry in zip(
+                self._template_category, self._template_employment, self._template_industry
+            )
+        ]
+        region_ok = [_string_matches(query.regions, region) for region in self._region_names]
+        template = columns.template
+        region = columns.region
+        remote = columns.is_remote
+        salary_min = columns.salary_min
+        salary_max = columns.salary_max
+        posted = columns.posted
+        wanted_remote = query.is_remote
+        min_salary = query.min_salary
+        max_salary = query.max_salary
+
+        def predicate(row: int) -> bool:
+            return (
+                template_ok[template[row]]
+                and region_ok[region[row]]
+                and (wanted_remote is None or bool(remote[row]) == wanted_remote)
+                and (min_salary is None or salary_max[row] >= min_salary)
+                and (max_salary is None or salary_min[row] <= max_salary)
+                and (posted_low is None or posted[row] >= posted_low)
+                and (posted_high is None or posted[row] <= posted_high)
+            )
+
+        return predicate
+
+
+def _postings(column: Sequence[int], cardinality: int) -> List[array]:
+    """Build ascending row lists for every value of a low-cardinality column."""
+    rows = range(len(column))
+    return [
+        array(_ROW_TYPECODE, compress(rows, map(value.__eq__, column)))
+        for value in range(cardinality)
+    ]
+
+
+def _group_postings(postings: List[array], keys: Sequence[str]) -> Dict[str, array]:
+    """Merge per-value postings that share the same (normalised) key."""
+    grouped: Dict[str, List[array]] = {}
+    for key, rows in zip(keys, postings):
+        grouped.setdefault(key, []).append(rows)
+    return {
+        key: lists[0] if len(lists) == 1 else array(_ROW_TYPECODE, merge(*lists))
+        for key, lists in grouped.items()
+    }
+
+
+def _merged(lists: List[array]) -> Callable[[], Iterable[int]]:
+    if len(lists) == 1:
+        return _identity(lists[0])
+    return lambda: merge(*lists)
+
+
+def _identity(rows: array) -> Callable[[], Iterable[int]]:
+    return lambda: rows
+
+
+def _sorted_slice(rows: array, start: int, stop: int) -> Callable[[], Iterable[int]]:
+    return lambda: sorted(rows[start:stop])
+
+
+def _string_set(raw: Any) -> FrozenSet[str]:
+    if raw is None or raw == "":
+        return frozenset()
+    if isinstance(raw, str):
+        return frozenset({raw.casefold()})
+    return frozenset(str(item).casefold() for item in raw)
+
+
+def _string_matches(selected: FrozenSet[str], value: Optional[str]) -> bool:
+    return not selected or (value is not None and value.casefold() in selected)
+
+
+def _as_datetime(raw: Any) -> Optional[datetime]:
+    if raw is None or raw == "":
+        return None
+    if not isinstance(raw, datetime):
+        return parse_timestamp(str(raw))
+    if raw.tzinfo is not None:
+        # Mock timestamps are naive UTC values.
+        return raw.astimezone(timezone.utc).replace(tzinfo=None)
+    return raw
+
+
+def _posted_at(job_dict: JobDict) -> Optional[datetime]:
+    try:
+        return _as_datetime(job_dict.get("date_posted"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,346 @@
+"""
+Recorded scraper responses served back from a JSONL capture.
+
+A capture holds one batch per line, in the order a scraper delivered them::
+
+    {"elapsed": 0.42, "count": 50, "jobs": [{...}, ...]}
+
+``elapsed`` is the number of seconds since the capture started and ``count``
+the length of ``jobs``; both are optional. A line holding a bare job
+dictionary is a batch of one job without timing.
+
+`ReplayCapture` scans the file once and keeps only the byte offset, job count
+and elapsed time of every batch (20 bytes each), so a capture of several
+gigabytes is served without being loaded. Jobs are parsed from the file as
+they are delivered, and the recorded gaps between batches can be replayed at
+any speed. The scan is saved next to the capture as ``<capture>.idx`` and
+reused while the capture is unchanged.
+
+`open_capture` yields a `CaptureRecorder` that writes captures, typically from
+the ``on_jobs_batch`` callback of a real scraper (see `record_scrape`).
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import struct
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from job_scrapper_contracts import Job, JobDict, ScrapeJobsFilter, ScrapperServiceInterface
+
+from .batching import Deadline
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"SCMRIDX1"
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+_READ_BUFFER_BYTES = 1024 * 1024
+# Lines written by `CaptureRecorder` start with their timing and count, so the
+# scan can index them without parsing the jobs.
+_RECORDED_HEAD = re.compile(rb'\{"elapsed":\s*(null|[-+0-9.eE]+),\s*"count":\s*(\d+),\s*"jobs":')
+
+ReplayBatch = Tuple[Optional[float], List[JobDict]]
+"""A recorded batch: seconds since the capture started (if known) and its jobs."""
+
+
+class ReplayError(ValueError):
+    """Raised when a capture is missing or holds a line that is not a batch."""
+
+
+class ReplayCapture:
+    """Byte-offset index over a JSONL capture of scraper responses.
+
+    With ``shard_count`` above one only every ``shard_count``-th batch, starting
+    at ``shard_index``, is served, so workers replaying the same capture deliver
+    disjoint parts of it.
+
+    Attributes:
+        path: Location of the capture.
+        offsets: Byte offset of every batch line.
+        counts: Number of jobs in every batch.
+        elapsed: Recorded seconds since the capture started, NaN when unknown.
+        batches: Indexes of the batches served by this shard.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        shard_index: int = 0,
+        shard_count: int = 1,
+        index_file: bool = True,
+    ) -> None:
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        self.path = Path(path)
+        try:
+            stat = self.path.stat()
+        except OSError as e:
+            raise ReplayError(f"Cannot open capture {self.path}: {e}") from e
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+
+        loaded = self._load_index() if index_file else None
+        if loaded is None:
+            self.offsets, self.counts, self.elapsed = self._scan()
+            if index_file:
+                self._save_index()
+        else:
+            self.offsets, self.counts, self.elapsed = loaded
+
+        self.batches = range(shard_index, len(self.offsets), shard_count)
+        self._job_count = sum(self.counts[batch] for batch in self.batches)
+
+    def __len__(self) -> int:
+        return self._job_count
+
+    @property
+    def batch_count(self) -> int:
+        return len(self.batches)
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + INDEX_SUFFIX)
+
+    def batch(self, position: int) -> ReplayBatch:
+        """Read the ``position``-th batch served by this shard."""
+        batch = self.batches[position]
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offsets[batch])
+            return self._elapsed(batch), _parse_jobs(handle.readline(), self.path)
+
+    def iter_batches(self) -> Iterator[ReplayBatch]:
+        """Lazily read every batch of this shard in recorded order."""
+        with open(self.path, "rb", buffering=_READ_BUFFER_BYTES) as handle:
+            position = -1
+            for batch in self.batches:
+                offset = self.offsets[batch]
+                if offset != position:
+                    handle.seek(offset)
+                line = handle.readline()
+                position = offset + len(line)
+                yield self._elapsed(batch), _parse_jobs(line, self.path)
+
+    def iter_job_dicts(
+        self, speed: Optional[float] = None, deadline: Optional[Deadline] = None
+    ) -> Iterator[JobDict]:
+        """Lazily yield every job, pacing batches by their recorded timing.
+
+        ``speed`` scales the recorded gaps between batches: 2.0 replays twice as
+        fast, 0.5 at half speed, and ``None`` (or 0) as fast as possible. A wait
+        that would outlast ``deadline`` ends the replay when the deadline passes.
+        """
+        scale = 1 / speed if speed is not None and speed > 0 else None
+        started_at = time.monotonic()
+        first: Optional[float] = None
+        for elapsed, job_dicts in self.iter_batches():
+            if scale is not None and elapsed is not None:
+                if first is None:
+                    first = elapsed
+                due = started_at + (elapsed - first) * scale
+                if not _wait_until(due, deadline):
+                    return
+            yield from job_dicts
+
+    def _elapsed(self, batch: int) -> Optional[float]:
+        elapsed = self.elapsed[batch]
+        return None if math.isnan(elapsed) else elapsed
+
+    def _scan(self) -> Tuple["array[int]", "array[int]", "array[float]"]:
+        offsets, counts, elapsed = array("Q"), array("I"), array("d")
+        started = time.perf_counter()
+        offset = 0
+        with open(self.path, "rb", buffering=_READ_BUFFER_BYTES) as handle:
+            for line in handle:
+                if line.strip():
+                    recorded = _RECORDED_HEAD.match(line)
+                    if recorded is not None:
+                        timing, count = recorded.group(1), int(recorded.group(2))
+                        seconds = math.nan if timing == b"null" else float(timing)
+                    else:
+                        seconds, count = _scan_line(line, self.path)
+                    offsets.append(offset)
+                    counts.append(count)
+                    elapsed.append(seconds)
+                offset += len(line)
+        logger.info(
+            "Indexed %d batches (%d jobs) of %s in %.2fs",
+            len(offsets),
+            sum(counts),
+            self.path,
+            time.perf_counter() - started,
+        )
+        return offsets, counts, elapsed
+
+    def _load_index(self) -> Optional[Tuple["array[int]", "array[int]", "array[float]"]]:
+        try:
+            with open(self.index_path, "rb") as handle:
+                magic, size, mtime_ns, batches = _INDEX_HEADER.unpack(
+                    handle.read(_INDEX_HEADER.size)
+                )
+                if magic != INDEX_MAGIC or (size, mtime_ns) != self._signature:
+                    return None
+                offsets, counts, elapsed = array("Q"), array("I"), array("d")
+                for column in (offsets, counts, elapsed):
+                    column.fromfile(handle, batches)
+        except (OSError, EOFError, struct.error):
+            return None
+        return offsets, counts, elapsed
+
+    def _save_index(self) -> None:
+        # Workers replaying the same capture may all build the index at once.
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as handle:
+                handle.write(_INDEX_HEADER.pack(INDEX_MAGIC, *self._signature, len(self.offsets)))
+                for column in (self.offsets, self.counts, self.elapsed):
+                    column.tofile(handle)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.debug("Could not save the capture index %s: %s", self.index_path, e)
+
+
+class CaptureRecorder:
+    """Writes scrape batches to a JSONL capture, timed from the first batch.
+
+    Obtain one from `open_capture` and pass `record` (or a callback wrapped with
+    `wrap`) as ``on_jobs_batch``.
+    """
+
+    def __init__(self, handle: IO[bytes]) -> None:
+        self._handle = handle
+        self._started_at: Optional[float] = None
+        self.batches = 0
+        self.jobs = 0
+
+    def record(self, jobs: Sequence[Union[Job, JobDict]], is_last: bool = False) -> None:
+        """Write one batch of jobs (or job dictionaries) as a capture line."""
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+        job_dicts = [job if isinstance(job, Mapping) else job.to_dict() for job in jobs]
+        line = json.dumps(
+            {
+                "elapsed": round(now - self._started_at, 6),
+                "count": len(job_dicts),
+                "jobs": job_dicts,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=_json_default,
+        )
+        self._handle.write(line.encode("utf-8") + b"\n")
+        self.batches += 1
+        self.jobs += len(job_dicts)
+        if is_last:
+            self._handle.flush()
+
+    def wrap(
+        self, on_jobs_batch: Optional[Callable[[Sequence[Job], bool], None]] = None
+    ) -> Callable[[Sequence[Job], bool], None]:
+        """Return a batch callback that records each batch before passing it on."""
+
+        def recording(jobs: Sequence[Job], is_last: bool) -> None:
+            self.record(jobs, is_last)
+            if on_jobs_batch is not None:
+                on_jobs_batch(jobs, is_last)
+
+        return recording
+
+
+@contextmanager
+def open_capture(path: Union[str, Path], append: bool = False) -> Iterator[CaptureRecorder]:
+    """Open ``path`` for recording, truncating it unless ``append`` is set."""
+    with open(path, "ab" if append else "wb") as handle:
+        yield CaptureRecorder(handle)
+
+
+def record_scrape(
+    scrapper: ScrapperServiceInterface,
+    path: Union[str, Path],
+    filters: Optional[ScrapeJobsFilter] = None,
+    timeout: int = 300,
+    batch_size: int = 50,
+    append: bool = False,
+) -> int:
+    """Capture one scrape of ``scrapper`` to ``path`` and return the jobs recorded.
+
+    Batches are recorded as the scraper hands them to ``on_jobs_batch``; a
+    scraper that only returns its jobs is recorded as a single batch.
+    """
+    with open_capture(path, append=append) as recorder:
+        jobs = scrapper.scrape_jobs(
+            filters or {}, timeout=timeout, batch_size=batch_size, on_jobs_batch=recorder.record
+        )
+        if recorder.batches == 0 and jobs:
+            recorder.record(jobs, is_last=True)
+        return recorder.jobs
+
+
+def _wait_until(due: float, deadline: Optional[Deadline]) -> bool:
+    """Sleep until ``due``; return ``False`` if ``deadline`` passes first."""
+    wait = due - time.monotonic()
+    if wait <= 0:
+        return True
+    if deadline is not None:
+        remaining = deadline.remaining()
+        if remaining is not None and remaining < wait:
+            time.sleep(remaining)
+            deadline.check()
+            return False
+    time.sleep(wait)
+    return True
+
+
+def _parse_jobs(line: bytes, path: Path) -> List[JobDict]:
+    return _record_jobs(_load_line(line, path), path)
+
+
+def _scan_line(line: bytes, path: Path) -> Tuple[float, int]:
+    record = _load_line(line, path)
+    if "jobs" not in record:
+        return math.nan, 1
+    elapsed = record.get("elapsed")
+    return math.nan if elapsed is None else float(elapsed), len(_record_jobs(record, path))
+
+
+def _record_jobs(record: Any, path: Path) -> List[JobDict]:
+    if "jobs" not in record:
+        return [record]
+    jobs = record["jobs"]
+    if not isinstance(jobs, list):
+        raise ReplayError(f"{path}: 'jobs' must be a list of job dictionaries")
+    return jobs
+
+
+def _load_line(line: bytes, path: Path) -> Any:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise ReplayError(f"{path}: invalid JSON line: {e}") from e
+    if not isinstance(record, dict):
+        raise ReplayError(f"{path}: every line must be a JSON object")
+    return record
+
+
+def _json_default(value: Any) -> Any:
+    isoformat = getattr(value, "isoformat", None)
+    if isoformat is not None:
+        return isoformat()
+    raise TypeError(f"Cannot record a value of type {type(value).__name__}")
@@ -0,0 +1,392 @@
+"""
+Load-shaping profiles that pace batch delivery like a real scraper.
+
+The mock hands out batches as fast as it can generate them, which hides the
+bottlenecks a platform meets against real providers. A `ShapingProfile` gives
+every batch a due time on the monotonic clock built from:
+
+- a per-batch latency, log-normally distributed around a median,
+- a throughput cap in jobs per second,
+- a pause whenever the stream crosses a page boundary,
+- rare latency spikes that make up the tail.
+
+Due times follow each other from the previous due time rather than from the
+actual delivery, so slow generation or a slow consumer does not push the whole
+schedule back. `DeliveryShaper` selects a profile per request (the
+``profile`` filter, or the service default). The worker thread of a request
+generates a few batches ahead of the schedule, and a scheduler thread per
+stream calls ``on_jobs_batch`` as each batch falls due, so the worker never
+sleeps on the schedule and a slow consumer delays only its own stream.
+"""
+
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .batching import DEFAULT_MAX_PENDING_BATCHES, Deadline
+
+T = TypeVar("T")
+
+PROFILE_FILTER = "profile"
+NO_PROFILE = "none"
+"""Profile name that turns shaping off for a request."""
+
+
+@dataclass(frozen=True)
+class ShapingProfile:
+    """Timing of a simulated scraper's batch delivery.
+
+    Attributes:
+        name: Name the profile is selected by.
+        latency: Median seconds between consecutive batches.
+        latency_sigma: Shape of the log-normal latency distribution; 0 makes
+            every batch take exactly ``latency``.
+        first_batch_latency: Extra seconds before the first batch, like the
+            time a provider takes to run the search.
+        jobs_per_second: Throughput cap of one stream.
+        page_size: Jobs per provider page; each page boundary crossed by the
+            stream adds ``page_pause``.
+        page_pause: Seconds spent fetching the next page.
+        spike_rate: Probability that a batch is hit by a latency spike.
+        spike_latency: Extra seconds added by a spike.
+    """
+
+    name: str
+    latency: float = 0.0
+    latency_sigma: float = 0.0
+    first_batch_latency: float = 0.0
+    jobs_per_second: Optional[float] = None
+    page_size: Optional[int] = None
+    page_pause: float = 0.0
+    spike_rate: float = 0.0
+    spike_latency: float = 0.0
+
+    def __post_init__(self) -> None:
+        delays = (self.latency, self.latency_sigma, self.first_batch_latency, self.page_pause)
+        if min(delays) < 0 or self.spike_latency < 0:
+            raise ValueError(f"Profile {self.name} needs non-negative latencies")
+        if self.jobs_per_second is not None and self.jobs_per_second <= 0:
+            raise ValueError(f"Profile {self.name} needs a positive jobs_per_second cap")
+        if self.page_size is not None and self.page_size < 1:
+            raise ValueError(f"Profile {self.name} needs a positive page size")
+        if not 0 <= self.spike_rate <= 1:
+            raise ValueError(f"Profile {self.name} needs a spike rate between 0 and 1")
+
+    @classmethod
+    def from_dict(cls, name: str, values: Mapping[str, Any]) -> "ShapingProfile":
+        known = {field.name for field in fields(cls)} - {"name"}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Profile {name} has unknown settings: {sorted(unknown)}")
+        return cls(name, **values)
+
+    @property
+    def is_instant(self) -> bool:
+        return (
+            not self.latency
+            and not self.first_batch_latency
+            and self.jobs_per_second is None
+            and not (self.page_size and self.page_pause)
+            and not (self.spike_rate and self.spike_latency)
+        )
+
+    def batch_latency(self, rng: random.Random) -> float:
+        if not self.latency:
+            return 0.0
+        if not self.latency_sigma:
+            return self.latency
+        return rng.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def pacer(self, rng: random.Random, started_at: Optional[float] = None) -> "Pacer":
+        return Pacer(self, rng, time.monotonic() if started_at is None else started_at)
+
+
+PROFILES: Dict[str, ShapingProfile] = {
+    profile.name: profile
+    for profile in (
+        ShapingProfile("instant"),
+        ShapingProfile(
+            "fast-api", latency=0.05, latency_sigma=0.3, spike_rate=0.01, spike_latency=0.5
+        ),
+        ShapingProfile(
+            "job-board",
+            latency=0.4,
+            latency_sigma=0.5,
+            first_batch_latency=1.0,
+            jobs_per_second=500.0,
+            page_size=100,
+            page_pause=1.0,
+            spike_rate=0.02,
+            spike_latency=3.0,
+        ),
+        ShapingProfile("rate-limited", latency=0.1, jobs_per_second=50.0),
+        ShapingProfile(
+            "flaky-tail", latency=0.2, latency_sigma=0.8, spike_rate=0.05, spike_latency=8.0
+        ),
+    )
+}
+"""Built-in profiles, from no shaping to a slow board with heavy tail latency."""
+
+
+def load_profiles(path: Union[str, Path]) -> Dict[str, ShapingProfile]:
+    """Read extra profiles from a JSON object mapping names to profile settings."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object of profiles")
+    return {name: ShapingProfile.from_dict(name, values) for name, values in data.items()}
+
+
+class Pacer:
+    """Computes the due time of every batch of one stream."""
+
+    def __init__(self, profile: ShapingProfile, rng: random.Random, started_at: float) -> None:
+        self.profile = profile
+        self.rng = rng
+        self.started_at = started_at
+        self.jobs = 0
+        self._due = started_at + profile.first_batch_latency
+
+    def next_due(self, count: int) -> float:
+        """Return when a batch of ``count`` jobs following the previous one is due."""
+        profile = self.profile
+        rng = self.rng
+        due = self._due + profile.batch_latency(rng)
+        if profile.spike_rate and rng.random() < profile.spike_rate:
+            due += profile.spike_latency
+        if profile.page_size and profile.page_pause and count:
+            # Pause once for every page this batch starts after the first page.
+            last_page = (self.jobs + count - 1) // profile.page_size
+            due += (last_page - max(self.jobs - 1, 0) // profile.page_size) * profile.page_pause
+        self.jobs += count
+        if profile.jobs_per_second is not None:
+            due = max(due, self.started_at + self.jobs / profile.jobs_per_second)
+        self._due = due
+        return due
+
+
+class _ShapedStream:
+    """Batches of one scrape waiting for their due times.
+
+    The producing thread queues each batch as it is generated and never waits
+    for a due time; a scheduler thread of the stream sleeps until the first
+    waiting batch is due and calls ``on_batch`` with it, so a slow ``on_batch``
+    only holds up its own stream. The producer blocks only while ``max_pending``
+    batches are waiting. As in `deliver_batches`, a batch is held back until the
+    next one arrives, a linger flush marker (an empty batch) releases it or the
+    producer finishes, so the last delivery can be flagged. Once the deadline
+    passes, the first waiting batch goes out as the final delivery and the rest
+    are dropped, as `deliver_batches_async` does.
+    """
+
+    def __init__(
+        self,
+        on_batch: Callable[[Sequence[Any], bool], None],
+        pacer: Pacer,
+        deadline: Optional[Deadline],
+        max_pending: int,
+    ) -> None:
+        self.on_batch = on_batch
+        self.pacer = pacer
+        self.deadline = deadline
+        self.max_pending = max(max_pending, 1)
+        self.pending: Deque[Tuple[float, Sequence[Any]]] = deque()
+        self.released = 0
+        self.delivered = 0
+        self.finished = False
+        self.aborted = False
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+        self._scheduler = threading.Thread(
+            target=self._schedule, name="scrapper-shaping", daemon=True
+        )
+        self._scheduler.start()
+
+    def submit(self, batch: Sequence[Any]) -> bool:
+        """Queue ``batch`` for its due time; ``False`` once the stream is done."""
+        with self._condition:
+            if batch:
+                self.pending.append((self.pacer.next_due(len(batch)), batch))
+            else:
+                self.released = len(self.pending)
+            self._condition.notify_all()
+            # One batch is always held back, so at least two may wait.
+            while len(self.pending) > max(self.max_pending - 1, 1) and not self.done:
+                self._condition.wait()
+            return not self.done
+
+    def finish(self) -> int:
+        """Wait for the remaining batches to go out and return the jobs delivered."""
+        self._stop(finished=True)
+        if self.error is not None:
+            raise self.error
+        return self.delivered
+
+    def abort(self) -> None:
+        """Stop the scheduler without delivering the waiting batches."""
+        self._stop(finished=False)
+
+    def _stop(self, finished: bool) -> None:
+        with self._condition:
+            self.finished = finished
+            self.aborted = not finished
+            self._condition.notify_all()
+        self._scheduler.join()
+
+    def _schedule(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    due = self._next_due()
+                if due is None:
+                    return
+                batch, is_last = due
+                self.on_batch(batch, is_last)
+                with self._condition:
+                    self.delivered += len(batch)
+                    self.done = is_last
+                    self._condition.notify_all()
+                if is_last:
+                    return
+        except BaseException as e:
+            with self._condition:
+                self.error = e
+                self.done = True
+                self._condition.notify_all()
+
+    def _next_due(self) -> Optional[Tuple[Sequence[Any], bool]]:
+        """Wait for the next delivery, or return ``None`` when the stream is aborted."""
+        deadline = self.deadline
+        pending = self.pending
+        while not self.aborted:
+            remaining = deadline.remaining() if deadline is not None else None
+            if pending and deadline is not None and deadline.check():
+                batch = pending.popleft()[1]
+                pending.clear()
+                return batch, True
+            if not pending:
+                if self.finished:
+                    # Nothing is left to flag; the contract still expects a final call.
+                    return [], True
+                self._condition.wait()
+            elif len(pending) == 1 and not self.released and not self.finished:
+                self._condition.wait(remaining)
+            elif pending[0][0] > time.monotonic():
+                wait = pending[0][0] - time.monotonic()
+                self._condition.wait(wait if remaining is None else min(wait, remaining))
+            else:
+                batch = pending.popleft()[1]
+                self.released = max(self.released - 1, 0)
+                self._condition.notify_all()
+                return batch, self.finished and not pending
+        return None
+
+
+class DeliveryShaper:
+    """Named profiles and the pacing of deliveries with them.
+
+    ``default`` names the profile of requests that do not pick one with the
+    ``profile`` filter; ``None`` leaves them unshaped.
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[Mapping[str, ShapingProfile]] = None,
+        default: Optional[str] = None,
+        seed: int = 0,
+    ) -> None:
+        self.profiles = dict(PROFILES if profiles is None else profiles)
+        if default is not None and default != NO_PROFILE and default not in self.profiles:
+            raise ValueError(f"Unknown shaping profile {default!r}")
+        self.default = default
+        self.seed = seed
+        self._streams = itertools.count()
+
+    def profile_for(self, filters: Any) -> Optional[ShapingProfile]:
+        """Return the profile a request asks for, or the default; ``None`` when unshaped."""
+        name = self.default
+        if isinstance(filters, Mapping) and filters.get(PROFILE_FILTER) is not None:
+            name = str(filters[PROFILE_FILTER])
+        if name is None or name == NO_PROFILE:
+            return None
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise ValueError(
+                f"Unknown shaping profile {name!r}; expected one of {sorted(self.profiles)}"
+            )
+        return None if profile.is_instant else profile
+
+    def deliver(
+        self,
+        batches: Iterable[Sequence[T]],
+        on_batch: Callable[[Sequence[T], bool], None],
+        profile: ShapingProfile,
+        deadline: Optional[Deadline] = None,
+        max_pending: int = DEFAULT_MAX_PENDING_BATCHES,
+    ) -> int:
+        """Shaped counterpart of `deliver_batches`.
+
+        The calling thread generates up to ``max_pending`` batches ahead of the
+        schedule without waiting for their due times, and a scheduler thread of
+        the stream calls ``on_batch`` as each one falls due, so concurrent
+        requests are paced independently.
+        """
+        stream = _ShapedStream(on_batch, self._pacer(profile), deadline, max_pending)
+        try:
+            for batch in batches:
+                if not stream.submit(batch):
+                    break
+        except BaseException:
+            stream.abort()
+            raise
+        return stream.finish()
+
+    def paced(
+        self,
+        on_batch: Callable[[Sequence[T], bool], Awaitable[None]],
+        profile: ShapingProfile,
+        deadline: Optional[Deadline] = None,
+    ) -> Callable[[Sequence[T], bool], Awaitable[None]]:
+        """Wrap an asynchronous sink so each batch waits on the event loop until it is due.
+
+        Waits end early when ``deadline`` passes, so `deliver_batches_async` can
+        end the delivery on time.
+        """
+        import asyncio
+
+        pacer = self._pacer(profile)
+
+        async def shaped(batch: Sequence[T], is_last: bool) -> None:
+            wait = pacer.next_due(len(batch)) - time.monotonic()
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None:
+                wait = min(wait, remaining)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await on_batch(batch, is_last)
+
+        return shaped
+
+    def _pacer(self, profile: ShapingProfile) -> Pacer:
+        return profile.pacer(random.Random(f"{self.seed}:{next(self._streams)}"))
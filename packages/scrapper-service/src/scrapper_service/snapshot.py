@@ -0,0 +1,240 @@
+"""
+On-disk columnar snapshots of a synthetic corpus, served through `mmap`.
+
+`write_snapshot` stores every corpus column as a fixed-width array and the
+string pools as UTF-8 blobs indexed by offset arrays. `MappedCorpus` maps such a
+file read-only and exposes zero-copy `memoryview` columns, so opening a
+snapshot costs the same for ten jobs or ten million, and worker processes that
+map the same file share its pages through the OS page cache.
+
+File layout (all sections 8-byte aligned, native byte order)::
+
+    magic (8 bytes) | header length (u64) | JSON header | sections...
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Sequence, Union
+
+from .corpus import (
+    BLOCK_SIZE,
+    COLUMN_NAMES,
+    COLUMN_TYPECODES,
+    ColumnarCorpus,
+    CorpusColumns,
+    JobRenderer,
+    JobTemplate,
+    SyntheticCorpus,
+)
+from .descriptions import DescriptionGenerator
+
+SNAPSHOT_MAGIC = b"SCMSNAP1"
+SNAPSHOT_VERSION = 2
+_PREAMBLE = struct.Struct("<8sQ")
+_ALIGNMENT = 8
+_STRING_TABLES = ("companies", "websites", "long_descriptions")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is missing, corrupt or incompatible."""
+
+
+def write_snapshot(corpus: SyntheticCorpus, path: Union[str, Path]) -> Path:
+    """Write ``corpus`` to ``path`` as a columnar snapshot.
+
+    Blocks are generated one at a time and written straight to their final
+    position in each column, so memory stays bounded by a single block.
+    """
+    path = Path(path)
+    renderer = corpus.renderer
+    size = len(corpus)
+
+    sections: Dict[str, Dict[str, Any]] = {}
+    cursor = 0
+
+    def reserve(name: str, length: int, **extra: Any) -> int:
+        nonlocal cursor
+        offset = cursor
+        sections[name] = {"offset": offset, "length": length, **extra}
+        cursor = _aligned(cursor + length)
+        return offset
+
+    for name in COLUMN_NAMES:
+        typecode = COLUMN_TYPECODES[name]
+        reserve(f"column:{name}", size * array(typecode).itemsize, typecode=typecode)
+
+    blobs: Dict[str, bytes] = {}
+    for table in _STRING_TABLES:
+        encoded = [value.encode("utf-8") for value in getattr(renderer, table)]
+        offsets = array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        blobs[f"offsets:{table}"] = offsets.tobytes()
+        blobs[f"blob:{table}"] = b"".join(encoded)
+        reserve(f"offsets:{table}", len(blobs[f"offsets:{table}"]), count=len(encoded))
+        reserve(f"blob:{table}", len(blobs[f"blob:{table}"]))
+
+    header = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "byteorder": sys.byteorder,
+            "size": size,
+            "spec": repr(corpus.spec),
+            "templates": [asdict(template) for template in renderer.templates],
+            "regions": renderer.regions,
+            "window_start": renderer.window_start.isoformat(),
+            "window_minutes": renderer.window_minutes,
+            "descriptions_seed": (
+                renderer.descriptions.seed if renderer.descriptions is not None else None
+            ),
+            "descriptions_min_length": (
+                renderer.descriptions.min_length if renderer.descriptions is not None else 0
+            ),
+            "sections": sections,
+        }
+    ).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, len(header)))
+        handle.write(header)
+        handle.truncate(data_start + cursor)
+
+        for columns in corpus.iter_columns():
+            for name in COLUMN_NAMES:
+                section = sections[f"column:{name}"]
+                column = getattr(columns, name)
+                handle.seek(data_start + section["offset"] + columns.start * column.itemsize)
+                column.tofile(handle)
+
+        for name, payload in blobs.items():
+            _write_at(handle, data_start + sections[name]["offset"], payload)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+class MappedCorpus(ColumnarCorpus):
+    """Read-only corpus backed by a memory-mapped snapshot file.
+
+    Only the header and the string pools are decoded on open; column data stays
+    in the mapping and is paged in as rows are read.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {self.path}: {e}") from e
+
+        self._view = memoryview(self._mmap)
+        self._header_length = 0
+        header = self._read_header()
+        self.spec_repr: str = header["spec"]
+        self._size: int = header["size"]
+        self._data_start = _aligned(_PREAMBLE.size + self._header_length)
+        self._sections: Dict[str, Dict[str, Any]] = header["sections"]
+
+        self._columns = CorpusColumns(0, *(self._column_view(name) for name in COLUMN_NAMES))
+        descriptions_seed = header.get("descriptions_seed")
+        self._renderer = JobRenderer(
+            templates=[JobTemplate(**template) for template in header["templates"]],
+            regions=header["regions"],
+            companies=self._strings("companies"),
+            websites=self._strings("websites"),
+            long_descriptions=self._strings("long_descriptions"),
+            window_start=datetime.fromisoformat(header["window_start"]),
+            window_minutes=header["window_minutes"],
+            descriptions=DescriptionGenerator(
+                descriptions_seed, min_length=header["descriptions_min_length"]
+            )
+            if descriptions_seed is not None
+            else None,
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def renderer(self) -> JobRenderer:
+        return self._renderer
+
+    def columns(self, block_index: int) -> CorpusColumns:
+        if not 0 <= block_index < self.block_count:
+            raise IndexError(f"Block {block_index} is out of range")
+        start = block_index * BLOCK_SIZE
+        return self.slice(start, min(start + BLOCK_SIZE, self._size))
+
+    def slice(self, start: int, stop: int) -> CorpusColumns:
+        """Return zero-copy column views for rows ``[start, stop)``."""
+        views: List[Sequence[int]] = [
+            getattr(self._columns, name)[start:stop] for name in COLUMN_NAMES
+        ]
+        return CorpusColumns(start, *views)
+
+    def all_columns(self) -> CorpusColumns:
+        return self._columns
+
+    def close(self) -> None:
+        """Release the mapping; columns handed out earlier must not be used afterwards."""
+        for name in COLUMN_NAMES:
+            view = getattr(self._columns, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def _read_header(self) -> Dict[str, Any]:
+        if len(self._view) < _PREAMBLE.size:
+            raise SnapshotError(f"{self.path} is too small to be a snapshot")
+        magic, self._header_length = _PREAMBLE.unpack_from(self._view)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{self.path} is not a corpus snapshot")
+        raw = bytes(self._view[_PREAMBLE.size : _PREAMBLE.size + self._header_length])
+        header: Dict[str, Any] = json.loads(raw)
+        version = header.get("version")
+        if version != SNAPSHOT_VERSION:
+            if isinstance(version, int) and version < SNAPSHOT_VERSION:
+                reason = "was written by an older release; rebuild it"
+            else:
+                reason = "was written by a newer release"
+            raise SnapshotError(
+                f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION}): "
+                f"{self.path} {reason}"
+            )
+        if header.get("byteorder") != sys.byteorder:
+            raise SnapshotError("Snapshot was written on a machine with a different byte order")
+        return header
+
+    def _section(self, name: str) -> memoryview:
+        section = self._sections[name]
+        start = self._data_start + section["offset"]
+        return self._view[start : start + section["length"]]
+
+    def _column_view(self, name: str) -> memoryview:
+        section = self._sections[f"column:{name}"]
+        return self._section(f"column:{name}").cast(section["typecode"])
+
+    def _strings(self, table: str) -> List[str]:
+        offsets = self._section(f"offsets:{table}").cast("Q")
+        blob = self._section(f"blob:{table}")
+        return [str(blob[offsets[i] : offsets[i + 1]], "utf-8") for i in range(len(offsets) - 1)]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_at(handle: BinaryIO, offset: int, payload: bytes) -> None:
+    handle.seek(offset)
+    handle.write(payload)
@@ -0,0 +1,68 @@
+"""
+Startup budgets and deferred warm-up for the service entry point.
+
+Importing the entry point has to stay cheap so containers restart and scale
+out quickly. `faker`, `scrapper_messaging` and `telemetry` are imported on first
+use, and no listings, corpus pools or indexes are built at import time. The
+budgets below are checked by ``quality_tests/test_startup.py``.
+
+Work the first request would otherwise pay for can run in a background thread
+instead: `prewarm_in_background` calls `ScrapperManager.prewarm` shortly after
+the consumer starts connecting.
+"""
+
+import logging
+import threading
+import time
+
+from .manager import ScrapperManager
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BUDGET_SECONDS = 0.5
+"""Upper bound for ``import scrapper_service.__main__`` in a fresh interpreter."""
+
+FIRST_MESSAGE_BUDGET_SECONDS = 1.5
+"""Upper bound from importing the entry point to the first batch of a scrape."""
+
+DEFERRED_MODULES = ("faker", "scrapper_messaging", "telemetry", "http.server")
+"""Modules that importing the entry point must not import."""
+
+PREWARM_DELAY_SECONDS = 0.5
+"""Head start given to the broker connection before pre-warming competes for the GIL."""
+
+
+def start_telemetry(service_name: str = "scrapper-service-mock") -> bool:
+    """Import and initialise telemetry, logging (not raising) any failure."""
+    try:
+        from telemetry import init_telemetry
+
+        init_telemetry(service_name=service_name)
+    except Exception as e:
+        logger.warning("Failed to initialize telemetry: %s", e)
+        return False
+    return True
+
+
+def prewarm_in_background(
+    manager: ScrapperManager, delay: float = PREWARM_DELAY_SECONDS
+) -> threading.Thread:
+    """Run `ScrapperManager.prewarm` in a daemon thread after ``delay`` seconds.
+
+    Requests that arrive first are not blocked: they build whatever they need
+    themselves, and the manager makes sure shared structures are built once.
+    """
+
+    def run() -> None:
+        time.sleep(delay)
+        started = time.perf_counter()
+        try:
+            manager.prewarm()
+        except Exception:
+            logger.warning("Pre-warming failed; state will be built on demand", exc_info=True)
+            return
+        logger.info("Pre-warmed in %.2fs", time.perf_counter() - started)
+
+    thread = threading.Thread(target=run, name="scrapper-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,369 @@
+"""
+Supervised pool of consumer processes with deterministic corpus sharding.
+
+`run_workers` starts one `ScrapperConsumer` per worker process and restarts
+workers that exit unexpectedly. Every worker serves its own `ShardedCorpus`:
+shards are numbered across nodes as ``node_index * workers + worker``, so
+replicas started with the same seed and node layout serve disjoint but
+reproducible job sets.
+"""
+
+import inspect
+import logging
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass, replace
+from multiprocessing.process import BaseProcess
+from typing import Any, Dict, List, Optional
+
+from .batching import BatchPolicy
+from .cache import DEFAULT_TTL_SECONDS, ResultCache
+from .changelog import ChangeLog, EvolutionSpec
+from .corpus import ColumnarCorpus, CorpusSpec, ShardedCorpus, SyntheticCorpus
+from .descriptions import LENGTH_DISTRIBUTIONS
+from .manager import ScrapperManager
+from .metrics import ScrapeMetrics, log_stats_periodically, serve_metrics
+from .providers import FanOut, uniform_providers
+from .replay import ReplayCapture
+from .shaping import PROFILES, DeliveryShaper, load_profiles
+from .snapshot import MappedCorpus
+from .startup import prewarm_in_background, start_telemetry
+
+logger = logging.getLogger(__name__)
+
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+SUPERVISOR_POLL_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    """Everything a consumer process needs to build its manager and connect.
+
+    Attributes:
+        rabbitmq_url: RabbitMQ connection URL, or ``None`` to use ``RABBITMQ_URL``.
+        log_level: Logging level name for the worker process.
+        corpus_size: Size of the synthetic corpus; 0 serves the canonical listings,
+            which cannot be split into shards.
+        seed: Seed of the synthetic corpus.
+        snapshot: Path of a corpus snapshot to map instead of generating.
+        streaming: Whether the manager delivers batches in streaming mode.
+        prefetch: Broker prefetch count per worker, when the consumer supports it.
+        shard_index: Global shard served by this worker.
+        shard_count: Total number of shards across all nodes.
+        max_batch_bytes: Default encoded-size limit per batch.
+        max_linger_ms: Default time a batch may stay open, in milliseconds.
+        evolution: Change rates of an evolving corpus, or ``None`` for a static one.
+            The rates apply to the whole corpus and are split across shards.
+        prewarm: Whether to build the corpus pools and index in the background
+            once the consumer is starting, instead of on the first request.
+        instrument: Whether to record spans and metrics for every scrape.
+        metrics_port: Port of the Prometheus ``/metrics`` endpoint, or ``None``
+            for none. In a worker pool, worker ``i`` listens on ``metrics_port + i``.
+        stats_interval: Seconds between logged metric summaries, or ``None``.
+        replay: Path of a JSONL capture of scraper responses to serve instead of
+            mock data. Workers serve disjoint subsets of its batches.
+        replay_speed: Multiple of the recorded timing at which batches are
+            replayed, or ``None`` to replay as fast as possible.
+        result_cache_entries: Distinct filters whose results are cached; 0
+            disables the result cache.
+        result_cache_mb: Memory budget of the result cache, in MiB.
+        result_cache_ttl: Seconds a cached result is served before it expires.
+        providers: Number of simulated providers the corpus is split across; 0
+            serves it as a single source.
+        provider_latency_ms: Mean latency of a provider page, in milliseconds.
+        provider_jitter: Relative spread of the provider page latency.
+        provider_failure_rate: Probability that a provider page request fails.
+        provider_merge: How provider streams are merged: ``interleave`` or
+            ``date_posted``.
+        shaping_profile: Load-shaping profile applied to requests that do not
+            pick one, or ``None`` to deliver them unshaped.
+        shaping_profiles: Path of a JSON file of extra shaping profiles.
+        descriptions: Name of a `LENGTH_DISTRIBUTIONS` entry; synthetic jobs then
+            get generated multi-paragraph descriptions of that length.
+    """
+
+    rabbitmq_url: Optional[str] = None
+    log_level: str = "INFO"
+    corpus_size: int = 0
+    seed: int = 0
+    snapshot: Optional[str] = None
+    streaming: bool = False
+    prefetch: Optional[int] = None
+    shard_index: int = 0
+    shard_count: int = 1
+    max_batch_bytes: Optional[int] = None
+    max_linger_ms: Optional[float] = None
+    evolution: Optional[EvolutionSpec] = None
+    prewarm: bool = False
+    instrument: bool = False
+    metrics_port: Optional[int] = None
+    stats_interval: Optional[float] = None
+    replay: Optional[str] = None
+    replay_speed: Optional[float] = None
+    result_cache_entries: int = 0
+    result_cache_mb: int = 256
+    result_cache_ttl: float = DEFAULT_TTL_SECONDS
+    providers: int = 0
+    provider_latency_ms: float = 0.0
+    provider_jitter: float = 0.0
+    provider_failure_rate: float = 0.0
+    provider_merge: str = "interleave"
+    shaping_profile: Optional[str] = None
+    shaping_profiles: Optional[str] = None
+    descriptions: Optional[str] = None
+
+    @property
+    def instrumented(self) -> bool:
+        return self.instrument or self.metrics_port is not None or bool(self.stats_interval)
+
+
+def corpus_spec(size: int, seed: int, descriptions: Optional[str] = None) -> CorpusSpec:
+    """Describe a synthetic corpus; ``descriptions`` names its description length distribution."""
+    lengths = LENGTH_DISTRIBUTIONS[descriptions] if descriptions else None
+    return CorpusSpec(size=size, seed=seed, description_lengths=lengths)
+
+
+def build_corpus(config: WorkerConfig) -> Optional[ColumnarCorpus]:
+    """Build the (possibly sharded) corpus described by ``config``."""
+    check_shardable(config, config.shard_count)
+    corpus: Optional[ColumnarCorpus] = None
+    if config.snapshot:
+        corpus = MappedCorpus(config.snapshot)
+    elif config.corpus_size > 0:
+        corpus = SyntheticCorpus(corpus_spec(config.corpus_size, config.seed, config.descriptions))
+    if corpus is not None and config.shard_count > 1:
+        corpus = ShardedCorpus(corpus, config.shard_index, config.shard_count)
+    return corpus
+
+
+def check_shardable(config: WorkerConfig, shard_count: int) -> None:
+    """Reject splitting the canonical listings, which every shard would serve in full."""
+    if shard_count > 1 and not (config.snapshot or config.corpus_size > 0 or config.replay):
+        raise ValueError(
+            "Sharding needs a corpus (corpus_size or snapshot) or a replay capture; "
+            + "every shard would serve the same canonical listings"
+        )
+
+
+def worker_configs(
+    config: WorkerConfig, workers: int, node_index: int = 0, node_count: int = 1
+) -> List[WorkerConfig]:
+    """Return the config of every worker of a node, each with its global shard."""
+    if workers < 1:
+        raise ValueError("At least one worker is required")
+    if node_count < 1 or not 0 <= node_index < node_count:
+        raise ValueError(f"Invalid node {node_index} of {node_count}")
+    shard_count = node_count * workers
+    check_shardable(config, shard_count)
+    return [
+        replace(
+            config,
+            shard_index=node_index * workers + worker,
+            shard_count=shard_count,
+            metrics_port=None if config.metrics_port is None else config.metrics_port + worker,
+        )
+        for worker in range(workers)
+    ]
+
+
+def build_manager(config: WorkerConfig) -> ScrapperManager:
+    """Create the manager served by one consumer."""
+    batch_policy = None
+    if config.max_batch_bytes is not None or config.max_linger_ms is not None:
+        batch_policy = BatchPolicy(
+            max_bytes=config.max_batch_bytes,
+            max_linger=None if config.max_linger_ms is None else config.max_linger_ms / 1000,
+        )
+    result_cache = None
+    if config.result_cache_entries > 0:
+        result_cache = ResultCache(
+            max_entries=config.result_cache_entries,
+            max_bytes=config.result_cache_mb * 1024 * 1024,
+            ttl=config.result_cache_ttl,
+        )
+    if config.replay:
+        return ScrapperManager(
+            streaming=config.streaming,
+            metrics=ScrapeMetrics() if config.instrumented else None,
+            batch_policy=batch_policy,
+            replay=ReplayCapture(config.replay, config.shard_index, config.shard_count),
+            replay_speed=config.replay_speed,
+            result_cache=result_cache,
+            shaping=build_shaper(config),
+        )
+    corpus = build_corpus(config)
+    changelog = None
+    if config.evolution is not None and corpus is not None:
+        shards = config.shard_count
+        spec = replace(
+            config.evolution,
+            posts_per_minute=config.evolution.posts_per_minute / shards,
+            updates_per_minute=config.evolution.updates_per_minute / shards,
+            expiries_per_minute=config.evolution.expiries_per_minute / shards,
+        )
+        changelog = ChangeLog(corpus, spec, stream=config.shard_index)
+    return ScrapperManager(
+        corpus=corpus,
+        streaming=config.streaming,
+        metrics=ScrapeMetrics() if config.instrumented else None,
+        batch_policy=batch_policy,
+        changelog=changelog,
+        result_cache=result_cache,
+        fanout=build_fanout(config),
+        shaping=build_shaper(config),
+    )
+
+
+def build_fanout(config: WorkerConfig) -> Optional[FanOut]:
+    """Create the simulated providers described by ``config``, if any."""
+    if config.providers <= 0:
+        return None
+    providers = uniform_providers(
+        config.providers,
+        latency=config.provider_latency_ms / 1000,
+        jitter=config.provider_jitter,
+        failure_rate=config.provider_failure_rate,
+    )
+    return FanOut(providers, merge=config.provider_merge, seed=config.seed + config.shard_index)
+
+
+def build_shaper(config: WorkerConfig) -> Optional[DeliveryShaper]:
+    """Create the delivery shaper described by ``config``, if any.
+
+    Without one, requests naming a built-in profile are still shaped.
+    """
+    if config.shaping_profile is None and config.shaping_profiles is None:
+        return None
+    profiles = dict(PROFILES)
+    if config.shaping_profiles:
+        profiles.update(load_profiles(config.shaping_profiles))
+    return DeliveryShaper(
+        profiles, default=config.shaping_profile, seed=config.seed + config.shard_index
+    )
+
+
+def start_reporting(manager: ScrapperManager, config: WorkerConfig) -> None:
+    """Start the metrics endpoint and stats log requested by ``config``, if any."""
+    if manager.metrics is None:
+        return
+    if config.metrics_port is not None:
+        serve_metrics(manager.metrics, config.metrics_port)
+    if config.stats_interval:
+        log_stats_periodically(manager.metrics, config.stats_interval)
+
+
+def create_consumer(manager: ScrapperManager, config: WorkerConfig) -> Any:
+    """Create a `ScrapperConsumer`, passing the prefetch count when it is supported."""
+    from scrapper_messaging import ScrapperConsumer
+
+    kwargs: Dict[str, Any] = {}
+    if config.prefetch is not None:
+        parameters = inspect.signature(ScrapperConsumer.from_url).parameters
+        if "prefetch_count" in parameters:
+            kwargs["prefetch_count"] = config.prefetch
+        else:
+            logger.warning("ScrapperConsumer does not accept a prefetch count; ignoring it")
+    return ScrapperConsumer.from_url(manager, config.rabbitmq_url, **kwargs)
+
+
+def worker_main(config: WorkerConfig) -> None:
+    """Entry point of a worker process: build the shard and consume until stopped."""
+    logging.basicConfig(
+        level=getattr(logging, config.log_level.upper()),
+        format="%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    start_telemetry()
+    manager = build_manager(config)
+    if manager.replay is not None:
+        corpus_size = len(manager.replay)
+    else:
+        corpus_size = len(manager.corpus) if manager.corpus is not None else 0
+    logger.info(
+        "Worker serving shard %d/%d with %d jobs",
+        config.shard_index,
+        config.shard_count,
+        corpus_size,
+    )
+    start_reporting(manager, config)
+    if config.prewarm:
+        prewarm_in_background(manager)
+    create_consumer(manager, config).start()
+
+
+def run_workers(
+    config: WorkerConfig, workers: int, node_index: int = 0, node_count: int = 1
+) -> None:
+    """Run ``workers`` consumer processes and keep them alive until interrupted.
+
+    Workers that exit are restarted with exponential backoff. SIGINT or SIGTERM
+    stops the supervisor, which then terminates and joins every worker.
+    """
+    configs = worker_configs(config, workers, node_index, node_count)
+    shard_count = configs[0].shard_count
+    context = multiprocessing.get_context("spawn")
+    processes: List[Optional[BaseProcess]] = [None] * workers
+    backoff = [RESTART_BACKOFF_SECONDS] * workers
+    restart_at = [0.0] * workers
+    started_at = [0.0] * workers
+    stopping = False
+
+    def request_stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    previous_handlers = {
+        signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+
+    try:
+        while not stopping:
+            now = time.monotonic()
+            for worker, process in enumerate(processes):
+                if process is not None and process.is_alive():
+                    continue
+                if process is not None:
+                    if now - started_at[worker] > MAX_RESTART_BACKOFF_SECONDS:
+                        # The worker was healthy for a while; start over with a short delay.
+                        backoff[worker] = RESTART_BACKOFF_SECONDS
+                    logger.warning(
+                        "Worker %d exited with code %s; restarting in %.1fs",
+                        worker,
+                        process.exitcode,
+                        backoff[worker],
+                    )
+                    restart_at[worker] = now + backoff[worker]
+                    backoff[worker] = min(backoff[worker] * 2, MAX_RESTART_BACKOFF_SECONDS)
+                    processes[worker] = None
+                if now < restart_at[worker]:
+                    continue
+                process = context.Process(
+                    target=worker_main,
+                    args=(configs[worker],),
+                    name=f"scrapper-worker-{worker}",
+                    daemon=True,
+                )
+                process.start()
+                processes[worker] = process
+                started_at[worker] = now
+                logger.info(
+                    "Started worker %d (pid %s) for shard %d/%d",
+                    worker,
+                    process.pid,
+                    configs[worker].shard_index,
+                    shard_count,
+                )
+            time.sleep(SUPERVISOR_POLL_SECONDS)
+    finally:
+        logger.info("Stopping %d workers...", workers)
+        for process in processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in processes:
+            if process is not None:
+                process.join()
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
@@ -0,0 +1,25 @@
+"""Pytest configuration and fixtures for scrapper-service unit tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SOURCE_DIR = Path(__file__).parent.parent / "src"
+if str(SOURCE_DIR) not in sys.path:
+    sys.path.insert(0, str(SOURCE_DIR))
+
+try:
+    import scrapper_service  # noqa: F401
+except ModuleNotFoundError:
+    # The shared contract packages are installed from git; without them there is
+    # nothing to test here.
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """A small seeded synthetic corpus spanning a few generation blocks."""
+    from scrapper_service.corpus import CorpusSpec, SyntheticCorpus
+
+    return SyntheticCorpus(CorpusSpec(size=10_000, seed=7))
@@ -0,0 +1,203 @@
+"""Tests for batch policies and delivery."""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from scrapper_service.batching import (
+    BatchPolicy,
+    Deadline,
+    deliver_batches,
+    deliver_batches_async,
+    iter_policy_batches,
+)
+from scrapper_service.corpus import CorpusSpec, SyntheticCorpus
+from scrapper_service.manager import ScrapperManager
+
+
+def _stalling(first, second, pause):
+    yield from first
+    time.sleep(pause)
+    yield from second
+
+
+class TestPolicyBatches:
+    """Batches close on whichever limit of the policy is reached first."""
+
+    def test_byte_limit(self) -> None:
+        policy = BatchPolicy(max_jobs=None, max_bytes=7)
+        # "[" plus three one-byte items, each followed by "," or "]", fills seven bytes.
+        batches = list(iter_policy_batches(range(7), policy, lambda item: 1))
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_job_limit_with_linger(self) -> None:
+        policy = BatchPolicy(max_jobs=3, max_linger=10)
+        assert list(iter_policy_batches(range(7), policy, len)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_linger_flushes_a_stalled_source(self) -> None:
+        policy = BatchPolicy(max_jobs=100, max_linger=0.05)
+        started = time.monotonic()
+        batches = iter_policy_batches(_stalling([1, 2], [3], 0.5), policy, len)
+        assert next(batches) == [1, 2]
+        assert time.monotonic() - started < 0.4
+        # The flush marker tells held-back deliveries to go out at once.
+        assert next(batches) == []
+        assert list(batches) == [[3]]
+
+    def test_source_errors_propagate(self) -> None:
+        def failing():
+            yield 1
+            raise KeyError("broken")
+
+        with pytest.raises(KeyError):
+            list(iter_policy_batches(failing(), BatchPolicy(max_linger=1), len))
+
+
+class TestDeliverBatches:
+    """The final batch is flagged and lingered batches are not held back."""
+
+    def test_last_batch_flagged(self) -> None:
+        calls = []
+        delivered = deliver_batches(iter([[1], [2, 3]]), lambda b, last: calls.append((b, last)))
+        assert delivered == 3
+        assert calls == [([1], False), ([2, 3], True)]
+
+    def test_empty_source(self) -> None:
+        calls = []
+        assert deliver_batches(iter([]), lambda b, last: calls.append((b, last))) == 0
+        assert calls == [([], True)]
+
+    def test_lingered_batch_delivered_before_the_source_resumes(self) -> None:
+        policy = BatchPolicy(max_jobs=100, max_linger=0.05)
+        started = time.monotonic()
+        calls = []
+
+        def on_batch(batch, is_last) -> None:
+            calls.append((batch, is_last, time.monotonic() - started))
+
+        batches = iter_policy_batches(_stalling([1, 2], [3], 0.5), policy, len)
+        assert deliver_batches(batches, on_batch) == 3
+        assert [(batch, is_last) for batch, is_last, _ in calls] == [([1, 2], False), ([3], True)]
+        assert calls[0][2] < 0.4
+
+
+class _Counted:
+    """Endless source of one-item batches that counts how many it produced."""
+
+    def __init__(self, limit=None) -> None:
+        self.produced = 0
+        self.limit = limit
+
+    def __iter__(self):
+        for item in itertools.islice(itertools.count(), self.limit):
+            self.produced += 1
+            yield [item]
+
+
+class TestDeliverBatchesAsync:
+    """A slow sink pauses generation instead of letting batches pile up."""
+
+    def test_slow_sink_pauses_the_producer(self) -> None:
+        source = _Counted(limit=40)
+        leads = []
+
+        async def slow(batch, is_last) -> None:
+            leads.append(source.produced - len(leads))
+            await asyncio.sleep(0.005)
+
+        delivered = asyncio.run(deliver_batches_async(source, slow, max_pending=3))
+        assert delivered == 40
+        # Queued batches, the one held back to flag the last and the one being put.
+        assert max(leads) <= 3 + 2
+        assert len(leads) == 40
+
+    def test_sink_error_stops_the_producer(self) -> None:
+        source = _Counted()
+
+        async def failing(batch, is_last) -> None:
+            if batch[0] == 5:
+                raise RuntimeError("sink failed")
+
+        with pytest.raises(RuntimeError, match="sink failed"):
+            asyncio.run(deliver_batches_async(source, failing, max_pending=2))
+        produced = source.produced
+        time.sleep(0.05)
+        assert source.produced == produced <= 5 + 2 + 2
+
+    def test_deadline_ends_delivery_with_a_final_batch(self) -> None:
+        calls = []
+
+        async def slow(batch, is_last) -> None:
+            calls.append((len(batch), is_last))
+            await asyncio.sleep(0.02)
+
+        started = time.monotonic()
+        deadline = Deadline(0.1)
+        delivered = asyncio.run(
+            deliver_batches_async(deadline.limit(_Counted()), slow, 2, deadline=deadline)
+        )
+        assert time.monotonic() - started < 0.5
+        assert deadline.expired
+        assert calls[-1][1]
+        assert [is_last for _, is_last in calls].count(True) == 1
+        assert delivered == sum(count for count, _ in calls)
+
+    def test_deadline_drops_queued_batches(self) -> None:
+        calls = []
+
+        async def slow(batch, is_last) -> None:
+            calls.append((batch, is_last))
+            await asyncio.sleep(0.1)
+
+        deadline = Deadline(0.05)
+        batches = deadline.limit([item, item] for item in range(100))
+        delivered = asyncio.run(deliver_batches_async(batches, slow, 4, deadline=deadline))
+        assert calls == [([0, 0], False), ([1, 1], True)]
+        assert delivered == 4
+
+    def test_cancellation_stops_the_producer(self) -> None:
+        source = _Counted()
+        started = asyncio.Event()
+
+        async def sink(batch, is_last) -> None:
+            started.set()
+            await asyncio.sleep(1)
+
+        async def run() -> None:
+            task = asyncio.ensure_future(deliver_batches_async(source, sink, max_pending=2))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        produced = source.produced
+        time.sleep(0.05)
+        assert source.produced == produced <= 2 + 2 + 1
+
+    def test_manager_scrape_is_bounded_by_max_pending(self, monkeypatch) -> None:
+        corpus = SyntheticCorpus(CorpusSpec(size=500, seed=5))
+        produced = []
+        iter_job_dicts = corpus.iter_job_dicts
+
+        def counting(*args):
+            for job_dict in iter_job_dicts(*args):
+                produced.append(job_dict["job_id"])
+                yield job_dict
+
+        monkeypatch.setattr(corpus, "iter_job_dicts", counting)
+        leads = []
+
+        async def slow(batch, is_last) -> None:
+            leads.append(len(produced) - 10 * len(leads))
+            await asyncio.sleep(0.002)
+
+        manager = ScrapperManager(corpus, streaming=True)
+        asyncio.run(
+            manager.scrape_jobs_async({}, batch_size=10, on_jobs_batch=slow, max_pending_batches=2)
+        )
+        assert len(leads) == 50
+        # Two queued batches, one held back, one being put and the one being built.
+        assert max(leads) <= 10 * (2 + 3)
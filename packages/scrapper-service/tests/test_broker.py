@@ -0,0 +1,78 @@
+"""Tests for the in-process broker and the local consumer."""
+
+import json
+
+import pytest
+
+from scrapper_service.broker import REQUEST_QUEUE, InMemoryBroker, LocalConsumer, Message
+from scrapper_service.manager import ScrapperManager
+
+
+def _replies(broker: InMemoryBroker, queue: str):
+    """Take the replies waiting in ``queue`` up to the last one."""
+    replies = []
+    while True:
+        reply = broker.get(queue, timeout=5)
+        assert reply is not None, "no last reply"
+        replies.append(reply)
+        if reply.headers["is_last"]:
+            return replies
+
+
+def _request(**body) -> Message:
+    return Message(json.dumps(body).encode("utf-8"), reply_to="replies", correlation_id="c-1")
+
+
+class TestInMemoryBroker:
+    """Queues are FIFO, created on demand and counted."""
+
+    def test_publish_and_get(self) -> None:
+        broker = InMemoryBroker()
+        broker.publish("q", Message(b"one"))
+        broker.publish("q", Message(b"three"))
+        assert broker.depth("q") == 2
+        assert [broker.get("q").body, broker.get("q").body] == [b"one", b"three"]
+        assert broker.get("q", timeout=0.01) is None
+        assert (broker.published, broker.published_bytes) == (2, 8)
+
+    def test_deleted_queue_starts_empty(self) -> None:
+        broker = InMemoryBroker()
+        broker.publish("q", Message(b"stale"))
+        broker.delete_queue("q")
+        assert broker.depth("q") == 0
+
+
+class TestLocalConsumer:
+    """Requests round-trip through the broker as batches of encoded jobs."""
+
+    def test_round_trip(self, corpus) -> None:
+        broker = InMemoryBroker()
+        manager = ScrapperManager(corpus)
+        consumer = LocalConsumer(manager, broker)
+        consumer.start()
+        try:
+            filters = {"category": "Backend"}
+            broker.publish(REQUEST_QUEUE, _request(filters=filters, batch_size=40))
+            replies = _replies(broker, "replies")
+        finally:
+            consumer.stop()
+        expected = [job.job_id for job in manager.scrape_jobs(filters)]
+        decoded = [json.loads(reply.body)["jobs"] for reply in replies]
+        assert [job["job_id"] for jobs in decoded for job in jobs] == expected
+        assert [reply.headers["count"] for reply in replies] == list(map(len, decoded))
+        assert all(len(jobs) <= 40 for jobs in decoded)
+        assert [reply.headers["is_last"] for reply in replies][-2:] == [False, True]
+        assert {reply.correlation_id for reply in replies} == {"c-1"}
+        assert not any(reply.headers["error"] for reply in replies)
+
+    def test_failed_request_replies_with_error(self, corpus) -> None:
+        broker = InMemoryBroker()
+        consumer = LocalConsumer(ScrapperManager(corpus), broker)
+        consumer.handle(Message(b"not json", reply_to="replies", correlation_id="c-2"))
+        (reply,) = _replies(broker, "replies")
+        assert reply.headers == {"count": 0, "is_last": True, "error": True}
+        assert "error" in json.loads(reply.body)
+
+    def test_needs_prefetch(self, corpus) -> None:
+        with pytest.raises(ValueError, match="prefetch"):
+            LocalConsumer(ScrapperManager(corpus), InMemoryBroker(), prefetch=0)
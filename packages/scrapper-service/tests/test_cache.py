@@ -0,0 +1,152 @@
+"""Tests for the per-filter result cache."""
+
+import time
+
+import pytest
+
+from scrapper_service.cache import JOB_DICT_OVERHEAD_BYTES, ResultCache, estimated_bytes
+from scrapper_service.manager import ScrapperManager
+
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def jobs(count: int, description: str = "x"):
+    return [{"job_id": index, "description": description} for index in range(count)]
+
+
+class TestResultCache:
+    """Entries are served until they expire, are evicted or never fit."""
+
+    def test_hit_and_miss(self) -> None:
+        cache = ResultCache()
+        assert cache.get("a") is None
+        result = jobs(3)
+        assert cache.put("a", result)
+        assert cache.get("a") is result
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.bytes == 3 * estimated_bytes(result[0])
+        assert stats.hit_rate == 0.5
+
+    def test_ttl(self) -> None:
+        clock = Clock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put("a", jobs(1))
+        clock.now = 9.9
+        assert cache.get("a") is not None
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert cache.stats.bytes == 0
+
+    def test_evicts_least_recently_used_entry(self) -> None:
+        cache = ResultCache(max_entries=2)
+        cache.put("a", jobs(1))
+        cache.put("b", jobs(1))
+        cache.get("a")
+        cache.put("c", jobs(1))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats.evictions == 1
+
+    def test_evicts_to_fit_memory(self) -> None:
+        size = estimated_bytes(jobs(1)[0])
+        cache = ResultCache(max_bytes=5 * size)
+        cache.put("a", jobs(2))
+        cache.put("b", jobs(2))
+        cache.put("c", jobs(2))
+        assert len(cache) == 2
+        assert cache.get("a") is None
+        assert cache.stats.bytes == 4 * size
+
+    def test_rejects_results_larger_than_the_budget(self) -> None:
+        cache = ResultCache(max_bytes=JOB_DICT_OVERHEAD_BYTES * 10)
+        assert not cache.put("a", jobs(1, "x" * JOB_DICT_OVERHEAD_BYTES * 10))
+        recorded = list(cache.recording("b", jobs(20)))
+        assert len(recorded) == 20
+        assert cache.get("a") is None and cache.get("b") is None
+        assert cache.stats.rejected == 2
+
+    def test_recording_caches_only_exhausted_results(self) -> None:
+        cache = ResultCache()
+        assert list(cache.recording("a", jobs(3))) == jobs(3)
+        assert cache.get("a") == jobs(3)
+        partial = cache.recording("b", jobs(3))
+        next(partial)
+        partial.close()
+        assert cache.get("b") is None
+        assert cache.stats.rejected == 1
+
+    def test_concurrent_recordings_share_the_budget(self) -> None:
+        size = estimated_bytes(jobs(1)[0])
+        cache = ResultCache(max_bytes=10 * size)
+        first = cache.recording("a", jobs(8))
+        second = cache.recording("b", jobs(8))
+        for _ in range(6):
+            next(first)
+        assert len(list(second)) == 8
+        assert cache._recording_bytes == 6 * size
+        assert list(first) == jobs(8)[6:]
+        assert cache.get("a") == jobs(8)
+        assert cache.get("b") is None
+        assert cache.stats.rejected == 1
+        assert (cache._recording_bytes, cache.stats.bytes) == (0, 8 * size)
+
+    def test_recording_evicts_entries_to_stay_in_budget(self) -> None:
+        size = estimated_bytes(jobs(1)[0])
+        cache = ResultCache(max_bytes=10 * size)
+        cache.put("old", jobs(6))
+        recording = cache.recording("new", jobs(6))
+        for _ in range(5):
+            next(recording)
+            assert cache.stats.bytes + cache._recording_bytes <= cache.max_bytes
+        assert cache.get("old") is None
+        list(recording)
+        assert cache.get("new") == jobs(6)
+        assert cache.stats.evictions == 1
+
+    def test_failed_source_releases_its_reservation(self) -> None:
+        cache = ResultCache()
+
+        def failing():
+            yield from jobs(3)
+            raise RuntimeError("provider failed")
+
+        with pytest.raises(RuntimeError):
+            list(cache.recording("a", failing()))
+        assert cache._recording_bytes == 0
+        assert cache.get("a") is None
+
+    def test_needs_room(self) -> None:
+        with pytest.raises(ValueError, match="at least one entry"):
+            ResultCache(max_entries=0)
+
+
+class TestManagerCache:
+    """The manager answers repeated queries from the cache."""
+
+    def test_repeated_query_is_a_hit(self, corpus) -> None:
+        cache = ResultCache()
+        manager = ScrapperManager(corpus, result_cache=cache)
+        first = manager.scrape_jobs({"category": "Backend"})
+        second = manager.scrape_jobs({"categories": ["backend"]})
+        assert [job.job_id for job in first] == [job.job_id for job in second]
+        assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+        manager.scrape_jobs({"category": "Backend", "cache": False})
+        assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+    def test_timed_out_scrape_is_not_cached(self, corpus) -> None:
+        cache = ResultCache()
+        manager = ScrapperManager(corpus, result_cache=cache)
+        manager.scrape_jobs({}, timeout=0.05, on_jobs_batch=lambda batch, is_last: time.sleep(0.01))
+        assert manager.last_report.timed_out
+        assert len(cache) == 0
+        assert cache.stats.rejected == 1
@@ -0,0 +1,145 @@
+"""Tests for the change log of an evolving corpus."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone
+
+import pytest
+
+from scrapper_service.changelog import EXPIRED, POSTED, UPDATED, ChangeLog, EvolutionSpec
+from scrapper_service.corpus import ShardedCorpus
+from scrapper_service.workers import WorkerConfig, build_manager
+
+
+class Clock:
+    """Manually advanced clock for deterministic event counts."""
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def changelog(corpus, clock):
+    spec = EvolutionSpec(posts_per_minute=600, updates_per_minute=600, expiries_per_minute=600)
+    return ChangeLog(corpus, spec, clock=clock)
+
+
+class TestCursor:
+    """Events happen at the configured rate on the log's clock."""
+
+    def test_events_follow_the_clock(self, changelog, clock) -> None:
+        assert changelog.cursor == 0
+        clock.now += 10
+        assert changelog.cursor == 300
+
+    def test_deterministic(self, corpus, clock) -> None:
+        spec = EvolutionSpec(seed=3)
+        first = ChangeLog(corpus, spec, clock=clock)
+        second = ChangeLog(corpus, spec, clock=clock)
+        clock.now += 120
+        assert first.changes(0).jobs == second.changes(0).jobs
+
+    def test_resolve_cursor(self, changelog, clock) -> None:
+        clock.now += 10
+        assert changelog.resolve_cursor(42) == 42
+        assert changelog.resolve_cursor("42") == 42
+        moment = changelog.event_time(99) + timedelta(milliseconds=1)
+        assert changelog.resolve_cursor(moment.isoformat()) == 100
+        assert changelog.resolve_cursor(moment.replace(tzinfo=timezone.utc)) == 100
+
+
+class TestChanges:
+    """Deltas hold the latest state of the jobs changed after a cursor."""
+
+    def test_delta_since_cursor(self, changelog, clock) -> None:
+        clock.now += 10
+        first = changelog.changes(0)
+        assert first.since == 0
+        assert first.cursor == 300
+        assert 0 < len(first.jobs) <= 300
+
+        clock.now += 5
+        second = changelog.changes(first.cursor)
+        assert (second.since, second.cursor) == (300, 450)
+        touched = {changelog._event_rows[event] for event in range(300, 450)}
+        assert len(second.jobs) == len(touched)
+
+    def test_live_count_and_current_jobs(self, changelog, clock, corpus) -> None:
+        clock.now += 60
+        cursor = changelog.cursor
+        kinds = list(changelog._event_kinds)
+        assert len(kinds) == cursor
+        assert changelog.live_count() == len(corpus) + kinds.count(POSTED) - kinds.count(EXPIRED)
+        current = list(changelog.iter_current())
+        assert len(current) == changelog.live_count()
+        assert len({job["job_id"] for job in current}) == len(current)
+
+    def test_updates_and_expiries_are_reported(self, changelog, clock, corpus) -> None:
+        clock.now += 30
+        cursor = changelog.cursor
+        events = list(zip(changelog._event_kinds, changelog._event_rows))
+        expired = {row for kind, row in events if kind == EXPIRED}
+        updated = [row for kind, row in events if kind == UPDATED and row < len(corpus)]
+        assert expired and updated
+        delta = {job["job_id"]: job for job in changelog.changes(0).jobs}
+        assert len(delta) == len({row for _, row in events})
+        current = {job["job_id"] for job in changelog.iter_current()}
+        for job in changelog.job_dicts(sorted(expired)):
+            assert job["job_id"] in delta
+            assert job["job_id"] not in current
+        row = updated[0]
+        base = corpus.job_dict(row)["salary"]["min_value"]
+        assert changelog.job_dicts([row])[0]["salary"]["min_value"] > base
+        assert changelog.changes(cursor).jobs == []
+
+
+class TestEmptyCorpus:
+    """A log over an empty shard has nothing to change."""
+
+    def test_empty_shard_never_changes(self, corpus, clock) -> None:
+        shard = ShardedCorpus(corpus, 3, 4)
+        assert len(shard) == 0
+        changelog = ChangeLog(shard, EvolutionSpec(posts_per_minute=6000), clock=clock)
+        clock.now += 60
+        assert changelog.cursor == 0
+        assert changelog.changes(0).jobs == []
+        assert list(changelog.iter_current()) == []
+
+    def test_worker_on_an_empty_shard_serves_scrapes(self) -> None:
+        config = WorkerConfig(
+            corpus_size=5000,
+            shard_index=3,
+            shard_count=4,
+            evolution=EvolutionSpec(posts_per_minute=6000),
+        )
+        manager = build_manager(config)
+        manager.changelog.started_at -= 60
+        assert manager.scrape_jobs({}) == []
+        assert manager.scrape_jobs({"since": 0}) == []
+        assert manager.last_report.cursor == 0
+
+
+class TestConcurrency:
+    """Concurrent readers see one consistent event stream."""
+
+    def test_parallel_readers_while_advancing(self, changelog, clock, corpus) -> None:
+        candidates = range(0, len(corpus), 3)
+
+        def read(_: int) -> int:
+            clock.now += 5
+            return sum(1 for _ in changelog.iter_current(candidates)) + changelog.cursor
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(read, range(64)))
+        events = list(zip(changelog._event_kinds, changelog._event_rows))
+        assert len(events) == changelog.cursor
+        expired = [row for kind, row in events if kind == EXPIRED]
+        assert len(expired) == len(set(expired))
+        assert changelog.live_count() == sum(1 for _ in changelog.iter_current())
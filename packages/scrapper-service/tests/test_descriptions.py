@@ -0,0 +1,39 @@
+"""Tests for generated job descriptions."""
+
+import random
+
+import pytest
+
+from scrapper_service.corpus import CorpusSpec, SyntheticCorpus
+from scrapper_service.descriptions import (
+    LENGTH_DISTRIBUTIONS,
+    DescriptionGenerator,
+    LengthDistribution,
+)
+
+
+class TestDescriptionGenerator:
+    """Descriptions follow their target lengths within the distribution's bounds."""
+
+    @pytest.mark.parametrize("name", sorted(LENGTH_DISTRIBUTIONS))
+    def test_lengths_within_bounds(self, name: str) -> None:
+        distribution = LENGTH_DISTRIBUTIONS[name]
+        texts = DescriptionGenerator(seed=1).sample(2000, distribution, random.Random(0))
+        lengths = [len(text) for text in texts]
+        assert min(lengths) >= distribution.low
+        assert max(lengths) <= distribution.high
+
+    def test_ends_on_a_sentence_when_possible(self) -> None:
+        texts = DescriptionGenerator().sample(200, LengthDistribution(), random.Random(1))
+        assert sum(text.endswith(".") for text in texts) > 190
+
+    def test_deterministic(self) -> None:
+        first = DescriptionGenerator(seed=5).generate([3000, 5000], [1, 2])
+        assert first == DescriptionGenerator(seed=5).generate([3000, 5000], [1, 2])
+        assert first != DescriptionGenerator(seed=6).generate([3000, 5000], [1, 2])
+
+    def test_corpus_descriptions_respect_the_floor(self) -> None:
+        distribution = LENGTH_DISTRIBUTIONS["realistic"]
+        corpus = SyntheticCorpus(CorpusSpec(size=1000, description_lengths=distribution))
+        lengths = [len(job["description"]) for job in corpus.iter_job_dicts()]
+        assert min(lengths) >= distribution.low
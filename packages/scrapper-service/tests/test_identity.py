@@ -0,0 +1,133 @@
+"""Tests for content-derived job ids and consumer dedup."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapper_service.identity import (
+    ID_BITS,
+    DedupFilter,
+    DedupSession,
+    _BloomFilter,
+    content_job_id,
+)
+from scrapper_service.jobs_data import get_faker, get_mock_jobs_as_dicts
+from scrapper_service.manager import ScrapperManager
+
+
+class TestContentJobId:
+    """Ids follow the identifying content of a listing."""
+
+    def test_canonical_ids_are_stable(self) -> None:
+        job_dicts = get_mock_jobs_as_dicts()
+        assert job_dicts == get_mock_jobs_as_dicts()
+        ids = [job_dict["job_id"] for job_dict in job_dicts]
+        assert len(set(ids)) == len(ids)
+        assert all(0 <= job_id < 2**ID_BITS for job_id in ids)
+        assert ids == [content_job_id(job_dict) for job_dict in job_dicts]
+
+    def test_canonical_ids_under_concurrency(self) -> None:
+        expected = [job_dict["job_id"] for job_dict in get_mock_jobs_as_dicts()]
+
+        def ids(_: int) -> list:
+            get_faker().url()
+            return [job_dict["job_id"] for job_dict in get_mock_jobs_as_dicts()]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(result == expected for result in pool.map(ids, range(64)))
+
+    def test_salary_keeps_id_and_repost_changes_it(self, corpus) -> None:
+        job_dict = corpus.job_dict(0)
+        job_id = content_job_id(job_dict)
+        assert job_dict["job_id"] == job_id
+        raised = {**job_dict, "salary": {**job_dict["salary"], "min_value": 1}}
+        assert content_job_id(raised) == job_id
+        reposted = {**job_dict, "date_posted": "2030-01-01T00:00:00.000000"}
+        assert content_job_id(reposted) != job_id
+
+
+class TestDedup:
+    """Consumers see each listing once, or have repeats counted."""
+
+    def test_drop_and_mark(self, corpus) -> None:
+        job_dicts = corpus.dicts(corpus.all_columns(), range(100))
+        dedup = DedupFilter(capacity=1000)
+        first = DedupSession(dedup)
+        assert len(list(first.apply(job_dicts))) == 100
+        dropped = DedupSession(dedup)
+        assert list(dropped.apply(job_dicts)) == []
+        assert dropped.duplicates == 100
+        marked = DedupSession(dedup, "mark")
+        assert len(list(marked.apply(job_dicts))) == 100
+        assert marked.duplicates == 100
+
+    def test_unknown_mode(self) -> None:
+        with pytest.raises(ValueError, match="Unknown dedup mode"):
+            DedupSession(DedupFilter(capacity=10), "keep")
+
+    def test_rotation_remembers_last_generation(self) -> None:
+        dedup = DedupFilter(capacity=100)
+        memory = dedup.memory_bytes
+        for job_id in range(250):
+            dedup.add(job_id)
+        assert dedup.memory_bytes == memory
+        assert all(job_id in dedup for job_id in range(150, 250))
+        assert sum(job_id in dedup for job_id in range(100)) < 5
+
+    def test_manager_drops_repeats_per_consumer(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        filters = {"category": "Backend", "consumer_id": "agent-1"}
+        first = manager.scrape_jobs(filters)
+        assert first and manager.last_report.dropped == 0
+        assert manager.scrape_jobs(filters) == []
+        assert manager.last_report.dropped == len(first)
+        assert len(manager.scrape_jobs({**filters, "consumer_id": "agent-2"})) == len(first)
+
+    def test_total_filter_memory_is_capped(self) -> None:
+        size = DedupFilter(capacity=1000).memory_bytes
+        manager = ScrapperManager(dedup_capacity=1000, dedup_max_bytes=3 * size)
+        filters = [manager.dedup_filter(f"agent-{index}") for index in range(5)]
+        assert len(manager._dedup) == 3
+        assert manager._dedup_bytes == 3 * size
+        assert manager.dedup_filter("agent-4") is filters[4]
+        assert manager.dedup_filter("agent-0") is not filters[0]
+
+    def test_probes_are_distinct_modulo_size(self) -> None:
+        bloom = _BloomFilter(DedupFilter(capacity=5)._size, 7)
+        size = bloom.size
+        # High bits that are a multiple of the size used to give a zero step.
+        job_ids = [(size * multiple << 32) | low for multiple in (1, 2, 3) for low in (0, 5)]
+        for job_id in job_ids + list(range(0, 2**62, 2**56)):
+            assert len({position % size for position in bloom._positions(job_id)}) == 7
+
+    def test_capacity_defaults_to_the_corpus(self, corpus, monkeypatch) -> None:
+        monkeypatch.setattr("scrapper_service.manager.DEFAULT_DEDUP_CAPACITY", 100)
+        manager = ScrapperManager(corpus)
+        assert manager.dedup_filter("agent").capacity == len(corpus)
+        assert ScrapperManager().dedup_filter("agent").capacity == 100
+
+    def test_ids_past_the_capacity_are_forgotten(self, corpus) -> None:
+        filters = {"category": "Backend", "consumer_id": "agent"}
+        sized = ScrapperManager(corpus)
+        assert len(sized.scrape_jobs(filters)) > 200
+        assert sized.scrape_jobs(filters) == []
+        window = ScrapperManager(corpus, dedup_capacity=100)
+        first = [job.job_id for job in window.scrape_jobs(filters)]
+        dedup = window.dedup_filter("agent")
+        # At least the last 100 ids are remembered; ids two generations back are not.
+        assert all(job_id in dedup for job_id in first[-100:])
+        assert sum(job_id in dedup for job_id in first[:-200]) < 5
+        assert window.scrape_jobs(filters)
+
+    def test_concurrent_sessions_share_one_filter(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        job_dicts = corpus.dicts(corpus.all_columns(), range(2000))
+
+        def deliver(_: int) -> list:
+            session = DedupSession(manager.dedup_filter("shared"))
+            return [job_dict["job_id"] for job_dict in session.apply(job_dicts)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            delivered = [job_id for ids in pool.map(deliver, range(16)) for job_id in ids]
+        assert sorted(delivered) == sorted(job_dict["job_id"] for job_dict in job_dicts)
+        assert len(manager._dedup) == 1
@@ -0,0 +1,58 @@
+"""Tests for the end-to-end load harness."""
+
+import json
+
+import pytest
+
+from scrapper_service.broker import InMemoryBroker
+from scrapper_service.loadtest import LoadReport, LoadSpec, percentile, run_load, run_local_load
+from scrapper_service.manager import ScrapperManager
+
+
+class TestPercentile:
+    """Percentiles use the nearest rank."""
+
+    def test_nearest_rank(self) -> None:
+        ordered = [float(value) for value in range(1, 101)]
+        assert percentile(ordered, 50) == 50.0
+        assert percentile(ordered, 99) == 99.0
+        assert percentile(ordered, 100) == 100.0
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+
+
+class TestLoadSpec:
+    """A run needs something to send."""
+
+    def test_needs_requests_and_filters(self) -> None:
+        with pytest.raises(ValueError, match="at least one request"):
+            LoadSpec(requests=0)
+        with pytest.raises(ValueError, match="at least one filter"):
+            LoadSpec(filters=())
+
+
+class TestRunLoad:
+    """A local run serves every request and reports throughput, latency and memory."""
+
+    def test_smoke(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        filters = ({"category": "Backend"}, {"category": "AI"})
+        spec = LoadSpec(requests=12, concurrency=3, filters=filters, batch_size=100)
+        report = run_local_load(manager, spec)
+        expected = sum(len(manager.scrape_jobs(filters[number % 2])) for number in range(12))
+        assert (report.requests, report.failed, report.jobs) == (12, 0, expected)
+        assert report.bytes > 0
+        assert report.requests_per_second == pytest.approx(12 / report.elapsed)
+        assert report.jobs_per_second == pytest.approx(expected / report.elapsed)
+        assert 0 < report.first_batch_p50 <= report.first_batch_p99
+        assert report.first_batch_p50 <= report.last_batch_p50 <= report.last_batch_p99
+        if report.peak_rss_mib is not None:
+            assert report.peak_rss_mib > 0 and report.rss_growth_mib >= 0
+        assert set(json.loads(report.to_json())) == set(LoadReport.__dataclass_fields__)
+        assert "12 requests (0 failed)" in report.summary()
+
+    def test_unanswered_requests_fail(self, monkeypatch) -> None:
+        monkeypatch.setattr("scrapper_service.loadtest.REPLY_GRACE_SECONDS", 0.05)
+        report = run_load(InMemoryBroker(), LoadSpec(requests=2, concurrency=2, timeout=0))
+        assert (report.requests, report.failed, report.jobs) == (0, 2, 0)
+        assert report.first_batch_p50 == report.last_batch_p99 == 0.0
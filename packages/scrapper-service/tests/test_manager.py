@@ -0,0 +1,160 @@
+"""Tests for `ScrapperManager` delivery and deadlines."""
+
+import asyncio
+import time
+import tracemalloc
+
+from scrapper_service.columnar import JobBatch
+from scrapper_service.corpus import BLOCK_SIZE, CorpusSpec, SyntheticCorpus
+from scrapper_service.manager import ScrapperManager
+
+
+def _peak_scrape_bytes(manager: ScrapperManager) -> int:
+    """Peak traced allocation of one unfiltered scrape, after a warm-up scrape.
+
+    The warm-up fills the renderer's caches of descriptions and timestamps,
+    which are bounded by the value pools rather than by the corpus size.
+    """
+    manager.scrape_jobs({}, batch_size=50, on_jobs_batch=lambda batch, is_last: None)
+    tracemalloc.start()
+    try:
+        manager.scrape_jobs({}, batch_size=50, on_jobs_batch=lambda batch, is_last: None)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestEagerDelivery:
+    """Non-streaming scrapes deliver batches as they are built."""
+
+    def test_returns_delivered_jobs(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        calls = []
+        jobs = manager.scrape_jobs(
+            {"category": "Backend"},
+            batch_size=100,
+            on_jobs_batch=lambda batch, is_last: calls.append((len(batch), is_last)),
+        )
+        assert [is_last for _, is_last in calls] == [False] * (len(calls) - 1) + [True]
+        assert len(jobs) == sum(count for count, _ in calls) == manager.last_report.total
+
+    def test_timeout_keeps_what_was_delivered(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        calls = []
+
+        def slow(batch, is_last) -> None:
+            calls.append((len(batch), is_last))
+            time.sleep(0.02)
+
+        jobs = manager.scrape_jobs({}, timeout=0.1, batch_size=50, on_jobs_batch=slow)
+        report = manager.last_report
+        assert report.timed_out
+        assert 0 < len(jobs) == report.delivered == sum(count for count, _ in calls)
+        assert report.delivered < len(corpus)
+        assert calls[-1][1]
+
+
+class TestStreaming:
+    """Streaming scrapes hand batches out as they are produced and keep none."""
+
+    def test_first_batch_arrives_before_the_corpus_is_read(self, corpus, monkeypatch) -> None:
+        produced = []
+        iter_job_dicts = corpus.iter_job_dicts
+
+        def counting(*args):
+            for job_dict in iter_job_dicts(*args):
+                produced.append(job_dict["job_id"])
+                yield job_dict
+
+        monkeypatch.setattr(corpus, "iter_job_dicts", counting)
+        manager = ScrapperManager(corpus, streaming=True)
+        seen_at_batch = []
+        jobs = manager.scrape_jobs(
+            {},
+            batch_size=50,
+            on_jobs_batch=lambda batch, is_last: seen_at_batch.append(len(produced)),
+        )
+        assert list(jobs) == []
+        assert manager.last_report.delivered == len(corpus)
+        # Only the batch held back to flag the last delivery is read ahead.
+        assert seen_at_batch[0] <= 2 * 50
+        assert seen_at_batch == sorted(seen_at_batch)
+
+    def test_peak_memory_does_not_grow_with_the_corpus(self) -> None:
+        small = SyntheticCorpus(CorpusSpec(size=BLOCK_SIZE, seed=3))
+        large = SyntheticCorpus(CorpusSpec(size=4 * BLOCK_SIZE, seed=3))
+        small_peak = _peak_scrape_bytes(ScrapperManager(small, streaming=True))
+        large_peak = _peak_scrape_bytes(ScrapperManager(large, streaming=True))
+        assert large_peak < 1.5 * small_peak
+
+
+class TestIndexBuild:
+    """Building the filter index is reported apart from producing jobs."""
+
+    def test_first_filtered_request_reports_index_build(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        manager.scrape_jobs({"category": "AI"}, on_jobs_batch=lambda batch, is_last: None)
+        assert manager.last_report.index_seconds > 0
+        manager.scrape_jobs({"category": "AI"}, on_jobs_batch=lambda batch, is_last: None)
+        assert manager.last_report.index_seconds == 0
+
+    def test_prewarm_builds_index(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        manager.prewarm()
+        manager.scrape_jobs({"category": "AI"}, on_jobs_batch=lambda batch, is_last: None)
+        assert manager.last_report.index_seconds == 0
+
+
+class TestColumnar:
+    """Columnar scrapes hand out read-only `JobBatch` sequences."""
+
+    def test_scrape_jobs_keeps_lists(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        batches = []
+        jobs = manager.scrape_jobs(
+            {"category": "Backend"},
+            batch_size=100,
+            on_jobs_batch=lambda batch, is_last: batches.append(batch),
+        )
+        assert type(jobs) is list
+        assert all(type(batch) is list for batch in batches)
+
+    def test_batches_and_result_are_job_batches(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        batches = []
+        jobs = manager.scrape_job_batches(
+            {"category": "Backend"},
+            batch_size=100,
+            on_jobs_batch=lambda batch, is_last: batches.append(batch),
+        )
+        assert isinstance(jobs, JobBatch)
+        assert all(isinstance(batch, JobBatch) for batch in batches)
+        assert [job.job_id for job in jobs] == [job.job_id for batch in batches for job in batch]
+
+    def test_streaming_keeps_no_jobs(self, corpus) -> None:
+        manager = ScrapperManager(corpus, streaming=True)
+        batches = []
+        jobs = manager.scrape_job_batches(
+            {"category": "Backend"}, on_jobs_batch=lambda batch, is_last: batches.append(batch)
+        )
+        assert isinstance(jobs, JobBatch)
+        assert len(jobs) == 0
+        assert batches and all(isinstance(batch, JobBatch) for batch in batches)
+
+    def test_async_deadline_keeps_batches_whole(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        calls = []
+
+        async def slow(batch, is_last) -> None:
+            assert isinstance(batch, JobBatch)
+            assert len(batch) <= 10
+            calls.append((len(batch), is_last))
+            await asyncio.sleep(0.05)
+
+        jobs = asyncio.run(
+            manager.scrape_job_batches_async({}, timeout=0.1, batch_size=10, on_jobs_batch=slow)
+        )
+        assert isinstance(jobs, JobBatch)
+        assert manager.last_report.timed_out
+        assert calls[-1][1]
+        assert len(jobs) == sum(count for count, _ in calls) == manager.last_report.delivered
@@ -0,0 +1,147 @@
+"""Tests for the scrape metrics registry and its Prometheus endpoint."""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from scrapper_service.batching import ScrapeReport
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.metrics import Histogram, ScrapeMetrics, serve_metrics
+
+
+def _histogram(*values: float) -> Histogram:
+    histogram = Histogram("latency_seconds", "Latency.", "s", (1.0, 2.0, 4.0))
+    for value in values:
+        histogram.observe(value)
+    return histogram
+
+
+def _samples(text: str) -> dict:
+    """Parse the sample lines of a Prometheus exposition into a dict."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestHistogram:
+    """Quantiles are interpolated within the bucket that holds their rank."""
+
+    def test_empty_has_no_quantile(self) -> None:
+        assert _histogram().quantile(0.5) is None
+
+    def test_interpolates_within_bucket(self) -> None:
+        histogram = _histogram(1.5, 1.5, 1.5, 1.5)
+        assert histogram.quantile(0.5) == pytest.approx(1.5)
+        assert histogram.quantile(1.0) == pytest.approx(2.0)
+
+    def test_quantile_picks_the_bucket_of_its_rank(self) -> None:
+        histogram = _histogram(0.5, 0.5, 0.5, 3.0)
+        assert histogram.quantile(0.5) == pytest.approx(2 / 3)
+        assert 2.0 < histogram.quantile(0.99) <= 4.0
+
+    def test_overflow_reports_the_last_bound(self) -> None:
+        assert _histogram(10.0).quantile(0.99) == 4.0
+
+    def test_bounds_are_inclusive(self) -> None:
+        histogram = _histogram(1.0, 2.0)
+        assert histogram.counts == [1, 1, 0, 0]
+
+
+class TestRenderPrometheus:
+    """The registry renders cumulative buckets, sums and counters."""
+
+    def test_histogram_lines(self) -> None:
+        lines = _histogram(0.5, 1.5, 10.0).render("scrapper")
+        assert lines[:2] == [
+            "# HELP scrapper_latency_seconds Latency.",
+            "# TYPE scrapper_latency_seconds histogram",
+        ]
+        assert lines[2:] == [
+            'scrapper_latency_seconds_bucket{le="1"} 1',
+            'scrapper_latency_seconds_bucket{le="2"} 2',
+            'scrapper_latency_seconds_bucket{le="4"} 2',
+            'scrapper_latency_seconds_bucket{le="+Inf"} 3',
+            "scrapper_latency_seconds_sum 12.000000",
+            "scrapper_latency_seconds_count 3",
+        ]
+
+    def test_registry_exposition(self) -> None:
+        metrics = ScrapeMetrics(opentelemetry=False)
+        metrics.record_delivery(0.002, 25)
+        text = metrics.render_prometheus()
+        assert text.endswith("\n")
+        assert "# TYPE scrapper_batches_total counter" in text
+        samples = _samples(text)
+        assert samples["scrapper_batches_total"] == 1
+        assert samples["scrapper_jobs_served_total"] == 25
+        assert samples["scrapper_batch_jobs_count"] == 1
+        assert samples['scrapper_batch_jobs_bucket{le="25"}'] == 1
+        assert samples['scrapper_batch_jobs_bucket{le="10"}'] == 0
+        assert samples["scrapper_batch_callback_seconds_sum"] == pytest.approx(0.002)
+
+    def test_tracked_cache_is_rendered(self, corpus) -> None:
+        from scrapper_service.cache import ResultCache
+
+        metrics = ScrapeMetrics(opentelemetry=False)
+        ScrapperManager(corpus, metrics=metrics, result_cache=ResultCache())
+        samples = _samples(metrics.render_prometheus())
+        assert samples["scrapper_result_cache_hits_total"] == 0
+        assert samples["scrapper_result_cache_entries"] == 0
+
+
+class TestRecordRequest:
+    """Jobs are counted once, whether delivered in batches or returned whole."""
+
+    def _report(self, delivered: int, timed_out: bool = False) -> ScrapeReport:
+        return ScrapeReport(
+            delivered=delivered, total=None, timed_out=timed_out, elapsed=0.01, timeout=None
+        )
+
+    def test_batched_jobs_are_not_counted_again(self) -> None:
+        metrics = ScrapeMetrics(opentelemetry=False)
+        metrics.record_delivery(0.001, 30)
+        metrics.record_request(self._report(30), delivered_in_batches=True)
+        assert metrics.jobs.value == 30
+        assert metrics.requests.value == 1
+
+    def test_unbatched_jobs_are_counted(self) -> None:
+        metrics = ScrapeMetrics(opentelemetry=False)
+        metrics.record_request(self._report(30, timed_out=True), delivered_in_batches=False)
+        assert metrics.jobs.value == 30
+        assert metrics.timeouts.value == 1
+        assert metrics.batches.value == 0
+
+    def test_manager_counts_each_job_once(self, corpus) -> None:
+        metrics = ScrapeMetrics(opentelemetry=False)
+        manager = ScrapperManager(corpus, metrics=metrics)
+        filters = {"category": "Backend"}
+        batched = manager.scrape_jobs(filters, on_jobs_batch=lambda batch, is_last: None)
+        whole = manager.scrape_jobs(filters)
+        assert metrics.jobs.value == len(batched) + len(whole)
+        assert metrics.requests.value == 2
+
+
+class TestServeMetrics:
+    """The endpoint serves the registry at ``/metrics`` only."""
+
+    def test_serves_exposition(self) -> None:
+        metrics = ScrapeMetrics(opentelemetry=False)
+        metrics.record_delivery(0.001, 7)
+        server = serve_metrics(metrics, port=0, host="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/metrics?format=text", timeout=5) as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                body = response.read().decode("utf-8")
+            assert _samples(body)["scrapper_jobs_served_total"] == 7
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+            assert error.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
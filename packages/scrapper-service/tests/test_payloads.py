@@ -0,0 +1,99 @@
+"""Tests for pre-encoded payloads and `ScrapperManager.scrape_payloads`."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapper_service.changelog import ChangeLog
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.payloads import PayloadCache, encode_batch
+
+
+class TestPayloadCache:
+    """Cached payloads decode to the corpus rows they were built from."""
+
+    def test_batch_matches_rows(self, corpus) -> None:
+        cache = PayloadCache(corpus)
+        rows = range(4090, 4110)
+        payload = cache.batch(rows)
+        assert payload == encode_batch(corpus.job_dict(row) for row in rows)
+        assert cache.batch(rows) is payload
+
+    def test_patch_replaces_head(self, corpus) -> None:
+        cache = PayloadCache(corpus)
+        payload = cache.batch([3, 1], patch=lambda row, job_id, url: (row, f"/{row}"))
+        decoded = json.loads(payload)
+        assert [(job["job_id"], job["url"]) for job in decoded] == [(3, "/3"), (1, "/1")]
+        assert decoded[0]["title"] == corpus.job_dict(3)["title"]
+
+    def test_batches_count_against_the_budget(self, corpus) -> None:
+        block_bytes = sum(map(len, PayloadCache(corpus)._block(0).payloads))
+        cache = PayloadCache(corpus, max_bytes=block_bytes + 64 * 1024)
+        for start in range(0, 4000, 50):
+            cache.batch(range(start, start + 50))
+        assert cache.cached_bytes <= cache.max_bytes
+        assert len(cache._blocks) == 1
+        assert 0 < len(cache._batches) < 80
+        assert cache.cached_bytes == block_bytes + sum(map(len, cache._batches.values()))
+
+    def test_oversized_batch_is_not_cached(self, corpus) -> None:
+        cache = PayloadCache(corpus, max_bytes=64 * 1024 * 1024)
+        payload = cache.batch(range(len(corpus)))
+        assert len(payload) > cache.max_bytes // 8
+        assert not cache._batches
+        assert cache.cached_bytes == sum(block.size for block in cache._blocks.values())
+
+    def test_concurrent_requests(self, corpus) -> None:
+        cache = PayloadCache(corpus, max_bytes=1, max_batches=4)
+
+        def serve(offset: int) -> int:
+            served = 0
+            for start in range(offset, len(corpus), 2003):
+                rows = range(start, min(start + 50, len(corpus)))
+                served += len(json.loads(cache.batch(rows)))
+            return served
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            served = list(pool.map(serve, range(8)))
+        expected = [
+            sum(min(50, len(corpus) - start) for start in range(offset, len(corpus), 2003))
+            for offset in range(8)
+        ]
+        assert served == expected
+        assert len(cache._blocks) == 1
+
+
+class TestScrapePayloads:
+    """Payload scrapes honour the same request options as `scrape_jobs`."""
+
+    def test_same_jobs_as_scrape(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        filters = {"category": "Backend"}
+        decoded = [
+            job for payload in manager.scrape_payloads(filters) for job in json.loads(payload)
+        ]
+        assert decoded == list(manager._matching(filters).job_dicts)
+        assert manager.last_report is not None
+        assert manager.last_report.delivered == len(decoded)
+
+    def test_dedup_applies(self, corpus) -> None:
+        manager = ScrapperManager(corpus)
+        filters = {"category": "AI", "consumer_id": "worker"}
+        first = [job for payload in manager.scrape_payloads(filters) for job in json.loads(payload)]
+        second = [
+            job for payload in manager.scrape_payloads(filters) for job in json.loads(payload)
+        ]
+        assert first
+        assert second == []
+        assert manager.last_report is not None
+        assert manager.last_report.dropped == len(first)
+
+    def test_changelog_deltas_apply(self, corpus) -> None:
+        now = [0.0]
+        changelog = ChangeLog(corpus, clock=lambda: now[0])
+        manager = ScrapperManager(changelog=changelog)
+        now[0] = 60.0
+        delta = [
+            job for payload in manager.scrape_payloads({"since": 0}) for job in json.loads(payload)
+        ]
+        assert delta == changelog.changes(0).jobs
+        assert len(delta) < len(corpus)
@@ -0,0 +1,95 @@
+"""Tests for simulated provider fan-out."""
+
+import pytest
+
+from scrapper_service.batching import Deadline
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.providers import FanOut, ProviderSpec, uniform_providers
+
+
+def provider_sources(count: int, size: int):
+    return [
+        (lambda start=index * size: ({"job_id": row} for row in range(start, start + size)))
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def fanouts():
+    created = []
+
+    def build(*args, **kwargs) -> FanOut:
+        fanout = FanOut(*args, **kwargs)
+        created.append(fanout)
+        return fanout
+
+    yield build
+    for fanout in created:
+        fanout.shutdown()
+
+
+class TestFanOut:
+    """Provider slices are fetched concurrently and merged into one stream."""
+
+    def test_slices_follow_shares(self, fanouts) -> None:
+        fanout = fanouts([ProviderSpec("a", 1), ProviderSpec("b", 3)])
+        assert fanout.slices(100) == [(0, 25), (25, 100)]
+        assert fanout.slices(0) == [(0, 0), (0, 0)]
+
+    def test_interleave_delivers_faster_providers_first(self, fanouts) -> None:
+        providers = [ProviderSpec("slow", latency=0.05, page_size=5), ProviderSpec("fast")]
+        fanout = fanouts(providers)
+        jobs, report = fanout.run(provider_sources(2, 10))
+        sources = [job["source"] for job in jobs]
+        assert sources[:10] == ["fast"] * 10
+        assert sorted(sources) == ["fast"] * 10 + ["slow"] * 10
+        assert report.jobs == {"slow": 10, "fast": 10}
+        assert not report.failed
+
+    def test_failed_provider_is_reported(self, fanouts) -> None:
+        providers = [ProviderSpec("broken", failure_rate=1.0), ProviderSpec("healthy")]
+        fanout = fanouts(providers)
+        jobs, report = fanout.run(provider_sources(2, 10))
+        assert {job["source"] for job in jobs} == {"healthy"}
+        assert report.failed == ["broken"]
+        assert report.jobs == {"broken": 0, "healthy": 10}
+
+    def test_deadline_stops_waiting(self, fanouts) -> None:
+        fanout = fanouts([ProviderSpec("stuck", latency=1.0)])
+        deadline = Deadline(0.05)
+        jobs, _ = fanout.run(provider_sources(1, 10), deadline)
+        assert list(jobs) == []
+        assert deadline.expired
+
+    def test_invalid_configuration(self) -> None:
+        with pytest.raises(ValueError, match="unique"):
+            FanOut([ProviderSpec("a"), ProviderSpec("a")])
+        with pytest.raises(ValueError, match="merge mode"):
+            FanOut(uniform_providers(2), merge="random")
+
+
+class TestManagerFanOut:
+    """The manager splits its corpus across providers and reports failures."""
+
+    def test_date_posted_merge_is_newest_first(self, corpus, fanouts) -> None:
+        manager = ScrapperManager(corpus, fanout=fanouts(uniform_providers(3), "date_posted"))
+        jobs = manager.scrape_jobs({"category": "Backend"})
+        dates = [job.date_posted for job in jobs]
+        assert dates == sorted(dates, reverse=True)
+        assert {job.source for job in jobs} == {"mock-0", "mock-1", "mock-2"}
+        expected = ScrapperManager(corpus).scrape_jobs({"category": "Backend"})
+        assert sorted(job.job_id for job in jobs) == sorted(job.job_id for job in expected)
+
+    def test_interleave_covers_the_corpus(self, corpus, fanouts) -> None:
+        manager = ScrapperManager(corpus, fanout=fanouts(uniform_providers(4)))
+        jobs = manager.scrape_jobs({})
+        assert len(jobs) == len(corpus)
+        assert len({job.job_id for job in jobs}) == len(corpus)
+
+    def test_failed_providers_in_report(self, corpus, fanouts) -> None:
+        providers = [ProviderSpec("healthy"), ProviderSpec("broken", failure_rate=1.0)]
+        manager = ScrapperManager(corpus, fanout=fanouts(providers))
+        jobs = manager.scrape_jobs({}, on_jobs_batch=lambda batch, is_last: None)
+        assert manager.last_report.failed_providers == ("broken",)
+        assert {job.source for job in jobs} == {"healthy"}
+        assert len(jobs) == manager.last_report.delivered == len(corpus) // 2
@@ -0,0 +1,78 @@
+"""Tests for filter normalisation and the indexed query engine."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from scrapper_service.query import CorpusIndex, JobQuery
+
+
+@pytest.fixture(scope="module")
+def index(corpus):
+    return CorpusIndex(corpus)
+
+
+@pytest.fixture(scope="module")
+def job_dicts(corpus):
+    return list(corpus.iter_job_dicts())
+
+
+class TestJobQuery:
+    """Normalisation of scrape filters into predicates."""
+
+    def test_empty_filters(self) -> None:
+        assert JobQuery.from_filters(None).is_empty
+        assert JobQuery.from_filters({"unknown": 1, "category": ""}).is_empty
+
+    def test_aliases_and_case(self) -> None:
+        query = JobQuery.from_filters({"categories": ["AI", "Backend"], "remote": 1})
+        assert query.categories == frozenset({"ai", "backend"})
+        assert query.is_remote is True
+        assert query == JobQuery.from_filters({"category": ["backend", "ai"], "is_remote": True})
+
+    def test_aware_dates_become_naive_utc(self) -> None:
+        query = JobQuery.from_filters({"posted_after": "2024-01-01T02:00:00+02:00"})
+        assert query.posted_after == datetime(2024, 1, 1)
+
+    def test_salary_ranges_overlap(self) -> None:
+        job = {"salary": {"min_value": 3000, "max_value": 5000}, "date_posted": "2024-01-01"}
+        assert JobQuery(min_salary=4000).matches(job)
+        assert JobQuery(max_salary=3000).matches(job)
+        assert not JobQuery(min_salary=5001).matches(job)
+        assert not JobQuery(max_salary=2999).matches(job)
+
+
+class TestCorpusIndex:
+    """Index answers agree with evaluating the query on every job."""
+
+    def _expected(self, job_dicts, query):
+        return [row for row, job_dict in enumerate(job_dicts) if query.matches(job_dict)]
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {"category": "Backend"},
+            {"region": ["poland", "Ukraine"], "remote": False},
+            {"min_salary": 5000, "max_salary": 7000},
+            {"category": "AI", "employment_type": "full_time"},
+            {"category": "no such category"},
+        ],
+    )
+    def test_search_matches_scan(self, index, job_dicts, filters) -> None:
+        query = JobQuery.from_filters(filters)
+        assert list(index.search(query)) == self._expected(job_dicts, query)
+
+    def test_search_by_posting_date(self, index, job_dicts) -> None:
+        dates = sorted(datetime.fromisoformat(job["date_posted"]) for job in job_dicts)
+        middle = dates[len(dates) // 2]
+        query = JobQuery(posted_after=middle, posted_before=middle + timedelta(days=3))
+        rows = list(index.search(query))
+        assert rows
+        assert rows == self._expected(job_dicts, query)
+
+    def test_empty_query_returns_every_row(self, index, corpus) -> None:
+        assert index.search(JobQuery()) == range(len(corpus))
+
+    def test_job_dicts_are_corpus_rows(self, index, corpus) -> None:
+        rows = list(index.search(JobQuery(categories=frozenset({"backend"}))))[:5]
+        assert index.job_dicts(rows) == [corpus.job_dict(row) for row in rows]
@@ -0,0 +1,140 @@
+"""Tests for serving recorded captures."""
+
+import json
+import logging
+import time
+from datetime import datetime
+
+import pytest
+
+from scrapper_service.batching import Deadline
+from scrapper_service.jobs_data import get_mock_jobs_as_dicts
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.query import JobQuery
+from scrapper_service.replay import ReplayCapture, ReplayError
+
+
+def write_capture(path, batches) -> None:
+    lines = (
+        json.dumps({"elapsed": elapsed, "count": len(jobs), "jobs": jobs}) + "\n"
+        for elapsed, jobs in batches
+    )
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.writelines(lines)
+
+
+@pytest.fixture
+def job_dicts():
+    return get_mock_jobs_as_dicts()
+
+
+@pytest.fixture
+def capture(tmp_path, job_dicts):
+    path = tmp_path / "capture.jsonl"
+    write_capture(path, [(0.0, job_dicts[:3]), (0.1, job_dicts[3:5]), (0.2, job_dicts[5:])])
+    return path
+
+
+class TestReplayCapture:
+    """Captures are indexed by byte offset and read back lazily."""
+
+    def test_offsets_and_random_access(self, capture, job_dicts) -> None:
+        replay = ReplayCapture(capture)
+        assert len(replay) == len(job_dicts)
+        assert list(replay.counts) == [3, 2, len(job_dicts) - 5]
+        lines = capture.read_bytes().splitlines(keepends=True)
+        assert list(replay.offsets) == [0, len(lines[0]), len(lines[0]) + len(lines[1])]
+        assert replay.batch(1) == (0.1, job_dicts[3:5])
+        assert list(replay.iter_job_dicts()) == job_dicts
+
+    def test_index_file_is_reused(self, capture) -> None:
+        first = ReplayCapture(capture)
+        assert first.index_path.exists()
+        second = ReplayCapture(capture)
+        assert list(second.offsets) == list(first.offsets)
+
+    def test_shards_are_disjoint(self, capture, job_dicts) -> None:
+        shards = [ReplayCapture(capture, index, 2) for index in range(2)]
+        ids = [job["job_id"] for shard in shards for job in shard.iter_job_dicts()]
+        assert sorted(ids) == sorted(job["job_id"] for job in job_dicts)
+
+    def test_invalid_line(self, tmp_path) -> None:
+        path = tmp_path / "broken.jsonl"
+        path.write_text("[1, 2]\n")
+        with pytest.raises(ReplayError, match="JSON object"):
+            ReplayCapture(path, index_file=False)
+
+
+class TestReplaySpeed:
+    """Recorded gaps are replayed at a multiple of real time."""
+
+    def test_speed_scales_gaps(self, capture) -> None:
+        replay = ReplayCapture(capture)
+        started = time.monotonic()
+        list(replay.iter_job_dicts(speed=4.0))
+        assert 0.05 <= time.monotonic() - started < 0.2
+        started = time.monotonic()
+        list(replay.iter_job_dicts())
+        assert time.monotonic() - started < 0.05
+
+    def test_deadline_ends_a_paced_replay(self, capture) -> None:
+        replay = ReplayCapture(capture)
+        deadline = Deadline(0.05)
+        jobs = list(replay.iter_job_dicts(speed=1.0, deadline=deadline))
+        assert len(jobs) == 3
+        assert deadline.expired
+
+
+class TestQuirkyRecords:
+    """Recorded dates that are missing, malformed or zoned are filtered safely."""
+
+    @pytest.fixture
+    def quirky(self, tmp_path, job_dicts):
+        dates = [
+            None,
+            "not a date",
+            "2025-10-31T12:00:00Z",
+            "2025-10-31T14:00:00+02:00",
+            "2025-10-30T12:00:00.000000",
+        ]
+        records = [{**job_dicts[index], "date_posted": date} for index, date in enumerate(dates)]
+        path = tmp_path / "quirky.jsonl"
+        write_capture(path, [(None, records)])
+        return path
+
+    def test_query_matches_normalised_dates(self, quirky) -> None:
+        replayed = list(ReplayCapture(quirky).iter_job_dicts())
+        query = JobQuery.from_filters({"posted_after": "2025-10-31T11:00:00Z"})
+        assert [query.matches(job) for job in replayed] == [False, False, True, True, False]
+        assert all(JobQuery.from_filters({"category": None}).matches(job) for job in replayed)
+
+    def test_manager_filters_without_raising(self, quirky, job_dicts) -> None:
+        manager = ScrapperManager(replay=ReplayCapture(quirky))
+        jobs = manager.scrape_jobs({"posted_before": "2025-10-31T00:00:00"})
+        assert [job.job_id for job in jobs] == [job_dicts[4]["job_id"]]
+
+    def test_unfiltered_scrape_skips_unconvertible_records(self, quirky, job_dicts, caplog) -> None:
+        manager = ScrapperManager(replay=ReplayCapture(quirky))
+        batches = []
+        with caplog.at_level(logging.WARNING, logger="scrapper_service.manager"):
+            jobs = manager.scrape_jobs({})
+            manager.scrape_jobs({}, on_jobs_batch=lambda batch, is_last: batches.append(batch))
+        expected = [job_dicts[index]["job_id"] for index in (2, 3, 4)]
+        assert [job.job_id for job in jobs] == expected
+        assert [job.job_id for batch in batches for job in batch] == expected
+        assert [job.date_posted for job in jobs[:2]] == [datetime(2025, 10, 31, 12, 0)] * 2
+        assert manager.last_report.delivered == 3
+        assert caplog.text.count("Skipping job") == 4
+
+    def test_columnar_scrape_stores_zoned_dates_as_utc(self, quirky, job_dicts) -> None:
+        manager = ScrapperManager(replay=ReplayCapture(quirky))
+        batches = []
+        jobs = manager.scrape_job_batches({})
+        manager.scrape_job_batches({}, on_jobs_batch=lambda batch, is_last: batches.append(batch))
+        expected = [job_dicts[index]["job_id"] for index in (2, 3, 4)]
+        assert [job.job_id for job in jobs] == expected
+        assert [job.job_id for batch in batches for job in batch] == expected
+        assert [job.date_posted for job in jobs[:2]] == [datetime(2025, 10, 31, 12, 0)] * 2
+        assert [job["date_posted"] for job in jobs.job_dicts()][:2] == [
+            "2025-10-31T12:00:00.000000"
+        ] * 2
@@ -0,0 +1,164 @@
+"""Tests for load-shaped batch delivery."""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapper_service.batching import Deadline
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.shaping import DeliveryShaper, ShapingProfile
+
+
+def batches_of(count: int, size: int = 10):
+    return [list(range(index * size, (index + 1) * size)) for index in range(count)]
+
+
+class Recorder:
+    """Batch callback that records when each batch arrived."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.started = time.monotonic()
+        self.calls = []
+
+    def __call__(self, batch, is_last: bool) -> None:
+        self.calls.append((time.monotonic() - self.started, len(batch), is_last))
+        if self.delay:
+            time.sleep(self.delay)
+
+
+class TestPacer:
+    """Due times follow the profile from one batch to the next."""
+
+    def test_latency_and_first_batch(self) -> None:
+        profile = ShapingProfile("p", latency=0.1, first_batch_latency=0.5)
+        pacer = profile.pacer(random.Random(0), started_at=0.0)
+        assert [pacer.next_due(10) for _ in range(3)] == pytest.approx([0.6, 0.7, 0.8])
+
+    def test_throughput_cap(self) -> None:
+        pacer = ShapingProfile("p", jobs_per_second=100).pacer(random.Random(0), 0.0)
+        assert [pacer.next_due(50) for _ in range(3)] == pytest.approx([0.5, 1.0, 1.5])
+
+    def test_page_pauses(self) -> None:
+        profile = ShapingProfile("p", page_size=100, page_pause=1.0)
+        pacer = profile.pacer(random.Random(0), 0.0)
+        assert [pacer.next_due(50) for _ in range(5)] == pytest.approx([0, 0, 1, 1, 2])
+
+    def test_instant_profiles_are_unshaped(self) -> None:
+        shaper = DeliveryShaper()
+        assert shaper.profile_for({"profile": "instant"}) is None
+        assert shaper.profile_for({"profile": "none"}) is None
+        assert shaper.profile_for({}) is None
+        with pytest.raises(ValueError, match="Unknown shaping profile"):
+            shaper.profile_for({"profile": "missing"})
+
+
+class TestDeliver:
+    """Batches reach the callback at their due times on the producing thread."""
+
+    def test_batches_arrive_when_due(self) -> None:
+        profile = ShapingProfile("p", latency=0.05)
+        recorder = Recorder()
+        delivered = DeliveryShaper().deliver(batches_of(4), recorder, profile)
+        assert delivered == 40
+        assert [is_last for _, _, is_last in recorder.calls] == [False, False, False, True]
+        for index, (at, _, _) in enumerate(recorder.calls):
+            assert 0.05 * (index + 1) - 0.005 <= at < 0.05 * (index + 1) + 0.04
+
+    def test_empty_source(self) -> None:
+        recorder = Recorder()
+        assert DeliveryShaper().deliver([], recorder, ShapingProfile("p", latency=1.0)) == 0
+        assert [(count, is_last) for _, count, is_last in recorder.calls] == [(0, True)]
+
+    def test_deadline_ends_with_one_whole_batch(self) -> None:
+        profile = ShapingProfile("p", latency=0.1)
+        recorder = Recorder()
+        deadline = Deadline(0.25)
+        delivered = DeliveryShaper().deliver(batches_of(10), recorder, profile, deadline)
+        assert deadline.expired
+        assert recorder.calls[-1][0] < 0.3
+        # The batches still waiting behind the final one are dropped, not merged.
+        assert [(count, is_last) for _, count, is_last in recorder.calls] == [
+            (10, False),
+            (10, False),
+            (10, True),
+        ]
+        assert delivered == 30
+
+    def test_due_batches_go_out_while_the_producer_works(self) -> None:
+        def batches():
+            yield from batches_of(2)
+            time.sleep(0.3)
+            yield from batches_of(1)
+
+        recorder = Recorder()
+        profile = ShapingProfile("p", latency=0.05)
+        DeliveryShaper().deliver(batches(), recorder, profile)
+        # The first batch is due at 0.05s, long before the producer gets back.
+        assert recorder.calls[0][0] < 0.15
+        assert [(count, is_last) for _, count, is_last in recorder.calls] == [
+            (10, False),
+            (10, False),
+            (10, True),
+        ]
+
+    def test_producer_errors_stop_the_schedule(self) -> None:
+        def batches():
+            yield from batches_of(2)
+            raise RuntimeError("provider failed")
+
+        recorder = Recorder()
+        with pytest.raises(RuntimeError, match="provider failed"):
+            DeliveryShaper().deliver(batches(), recorder, ShapingProfile("p", latency=0.05))
+        time.sleep(0.15)
+        assert recorder.calls == []
+
+    def test_linger_marker_releases_the_held_batch(self) -> None:
+        def batches():
+            yield [1, 2]
+            yield []
+            time.sleep(0.2)
+            yield [3]
+
+        recorder = Recorder()
+        DeliveryShaper().deliver(batches(), recorder, ShapingProfile("p", latency=0.01))
+        assert [(count, is_last) for _, count, is_last in recorder.calls] == [(2, False), (1, True)]
+        assert recorder.calls[0][0] < 0.1
+
+    def test_slow_streams_do_not_block_each_other(self) -> None:
+        profile = ShapingProfile("p", latency=0.02)
+        shaper = DeliveryShaper()
+        recorders = [Recorder(delay=0.02) for _ in range(8)]
+
+        def stream(recorder: Recorder) -> int:
+            return shaper.deliver(batches_of(10), recorder, profile)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(stream, recorders)) == [100] * 8
+        # One stream takes about 10 * 0.02s; delivering serially would take 8 times that.
+        assert time.monotonic() - started < 0.8
+
+    def test_callback_errors_reach_the_caller(self) -> None:
+        def failing(batch, is_last) -> None:
+            raise RuntimeError("consumer failed")
+
+        with pytest.raises(RuntimeError, match="consumer failed"):
+            DeliveryShaper().deliver(batches_of(3), failing, ShapingProfile("p", latency=0.01))
+
+
+class TestManagerShaping:
+    """A request picks its profile with the ``profile`` filter."""
+
+    def test_profile_filter_paces_the_scrape(self, corpus) -> None:
+        profiles = {"slow": ShapingProfile("slow", latency=0.05)}
+        manager = ScrapperManager(corpus, shaping=DeliveryShaper(profiles))
+        recorder = Recorder()
+        jobs = manager.scrape_jobs(
+            {"profile": "slow", "category": "Backend"}, batch_size=500, on_jobs_batch=recorder
+        )
+        assert len(jobs) == sum(count for _, count, _ in recorder.calls)
+        assert recorder.calls[0][0] >= 0.045
+        assert recorder.calls[-1][2]
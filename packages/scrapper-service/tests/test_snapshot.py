@@ -0,0 +1,78 @@
+"""Tests for memory-mapped corpus snapshots."""
+
+import json
+import struct
+
+import pytest
+
+from scrapper_service.corpus import CorpusSpec, ShardedCorpus, SyntheticCorpus
+from scrapper_service.descriptions import LENGTH_DISTRIBUTIONS
+from scrapper_service.snapshot import (
+    SNAPSHOT_VERSION,
+    MappedCorpus,
+    SnapshotError,
+    write_snapshot,
+)
+
+
+@pytest.fixture
+def mapped(corpus, tmp_path):
+    mapped = MappedCorpus(write_snapshot(corpus, tmp_path / "corpus.snap"))
+    yield mapped
+    mapped.close()
+
+
+class TestSnapshotRoundTrip:
+    """A mapped snapshot serves the same jobs as the corpus it was written from."""
+
+    def test_same_rows(self, corpus, mapped) -> None:
+        assert len(mapped) == len(corpus)
+        assert list(mapped.iter_job_dicts()) == list(corpus.iter_job_dicts())
+
+    def test_random_access(self, corpus, mapped) -> None:
+        for row in (0, 4095, 4096, len(corpus) - 1):
+            assert mapped.job_dict(row) == corpus.job_dict(row)
+
+    def test_shards_of_a_snapshot(self, corpus, mapped) -> None:
+        shards = [ShardedCorpus(mapped, index, 3) for index in range(3)]
+        assert sum(len(shard) for shard in shards) == len(corpus)
+        served = sorted(job["job_id"] for shard in shards for job in shard.iter_job_dicts())
+        assert served == sorted(job["job_id"] for job in corpus.iter_job_dicts())
+
+    def test_generated_descriptions(self, tmp_path) -> None:
+        spec = CorpusSpec(size=200, seed=3, description_lengths=LENGTH_DISTRIBUTIONS["uniform"])
+        corpus = SyntheticCorpus(spec)
+        mapped = MappedCorpus(write_snapshot(corpus, tmp_path / "long.snap"))
+        assert list(mapped.iter_job_dicts()) == list(corpus.iter_job_dicts())
+        mapped.close()
+
+    def test_empty_corpus(self, tmp_path) -> None:
+        mapped = MappedCorpus(write_snapshot(SyntheticCorpus(CorpusSpec(size=0)), tmp_path / "e"))
+        assert len(mapped) == 0
+        assert list(mapped.iter_job_dicts()) == []
+        mapped.close()
+
+
+class TestSnapshotErrors:
+    """Missing, foreign and incompatible files are rejected with `SnapshotError`."""
+
+    def test_missing_file(self, tmp_path) -> None:
+        with pytest.raises(SnapshotError):
+            MappedCorpus(tmp_path / "missing.snap")
+
+    def test_not_a_snapshot(self, tmp_path) -> None:
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not a snapshot at all")
+        with pytest.raises(SnapshotError, match="not a corpus snapshot"):
+            MappedCorpus(path)
+
+    @pytest.mark.parametrize(
+        ("version", "reason"),
+        [(SNAPSHOT_VERSION - 1, "older release"), (SNAPSHOT_VERSION + 1, "newer release")],
+    )
+    def test_other_version(self, tmp_path, version: int, reason: str) -> None:
+        header = json.dumps({"version": version}).encode("utf-8")
+        path = tmp_path / "other.snap"
+        path.write_bytes(struct.pack("<8sQ", b"SCMSNAP1", len(header)) + header)
+        with pytest.raises(SnapshotError, match=f"version {version} .*{reason}"):
+            MappedCorpus(path)
@@ -0,0 +1,77 @@
+"""Tests for worker configuration, corpus sharding and consumer creation."""
+
+import logging
+
+import pytest
+import scrapper_messaging
+
+from scrapper_service.corpus import BLOCK_SIZE
+from scrapper_service.manager import ScrapperManager
+from scrapper_service.workers import WorkerConfig, build_corpus, create_consumer, worker_configs
+
+
+class _Consumer:
+    def __init__(self, kwargs) -> None:
+        self.kwargs = kwargs
+
+
+class _PrefetchConsumer:
+    @classmethod
+    def from_url(cls, service, url=None, prefetch_count=None):
+        return _Consumer({"prefetch_count": prefetch_count})
+
+
+class _PlainConsumer:
+    @classmethod
+    def from_url(cls, service, url=None):
+        return _Consumer({})
+
+
+class TestCreateConsumer:
+    """The prefetch count is only passed to consumers that accept it."""
+
+    def test_passes_supported_prefetch(self, monkeypatch) -> None:
+        monkeypatch.setattr(scrapper_messaging, "ScrapperConsumer", _PrefetchConsumer)
+        consumer = create_consumer(ScrapperManager(), WorkerConfig(prefetch=4))
+        assert consumer.kwargs == {"prefetch_count": 4}
+
+    def test_ignores_unsupported_prefetch(self, monkeypatch, caplog) -> None:
+        monkeypatch.setattr(scrapper_messaging, "ScrapperConsumer", _PlainConsumer)
+        with caplog.at_level(logging.WARNING, logger="scrapper_service.workers"):
+            consumer = create_consumer(ScrapperManager(), WorkerConfig(prefetch=4))
+        assert consumer.kwargs == {}
+        assert "prefetch" in caplog.text
+
+    def test_omits_unset_prefetch(self, monkeypatch) -> None:
+        monkeypatch.setattr(scrapper_messaging, "ScrapperConsumer", _PrefetchConsumer)
+        consumer = create_consumer(ScrapperManager(), WorkerConfig())
+        assert consumer.kwargs == {"prefetch_count": None}
+
+
+class TestSharding:
+    """Workers across nodes serve disjoint shards that cover the corpus."""
+
+    def test_shard_indexes_span_nodes(self) -> None:
+        config = WorkerConfig(corpus_size=100, metrics_port=9100)
+        nodes = [worker_configs(config, 3, node, 2) for node in range(2)]
+        assert [[c.shard_index for c in node] for node in nodes] == [[0, 1, 2], [3, 4, 5]]
+        assert {c.shard_count for node in nodes for c in node} == {6}
+        assert [c.metrics_port for c in nodes[1]] == [9100, 9101, 9102]
+
+    def test_shards_partition_the_corpus(self) -> None:
+        config = WorkerConfig(corpus_size=2 * BLOCK_SIZE + 5, seed=11)
+        shards = [build_corpus(c) for node in range(2) for c in worker_configs(config, 2, node, 2)]
+        ids = [[job["job_id"] for job in shard.iter_job_dicts()] for shard in shards]
+        assert [len(shard_ids) for shard_ids in ids] == [BLOCK_SIZE, BLOCK_SIZE, 5, 0]
+        whole = build_corpus(config)
+        assert sorted(i for shard_ids in ids for i in shard_ids) == sorted(
+            job["job_id"] for job in whole.iter_job_dicts()
+        )
+
+    def test_canonical_listings_cannot_be_sharded(self) -> None:
+        with pytest.raises(ValueError, match="canonical listings"):
+            worker_configs(WorkerConfig(), 2)
+        with pytest.raises(ValueError, match="canonical listings"):
+            build_corpus(WorkerConfig(shard_index=1, shard_count=2))
+        assert build_corpus(WorkerConfig()) is None
+        assert len(worker_configs(WorkerConfig(replay="capture.jsonl"), 2)) == 2
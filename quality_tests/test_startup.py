@@ -0,0 +1,137 @@
+"""Quality tests for service startup cost.
+
+These tests verify that importing the scrapper-service entry point stays within
+its import-time budget without importing deferred dependencies, and that the
+first batch of a scrape arrives within the time-to-first-message budget.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+
+pytestmark = pytest.mark.quality
+
+STARTUP_PROBE = """
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import scrapper_service.__main__
+imported = time.perf_counter()
+
+from scrapper_service import startup
+
+
+def deferred_imported():
+    return [
+        name
+        for name in startup.DEFERRED_MODULES
+        if name in sys.modules and name not in sys.argv[2:]
+    ]
+
+
+imported_by_entry_point = deferred_imported()
+
+from scrapper_service.workers import WorkerConfig, build_manager
+
+config = WorkerConfig(corpus_size=int(sys.argv[1]), streaming=True)
+first = []
+
+
+def on_jobs_batch(jobs, is_last):
+    if not first:
+        first.append(time.perf_counter())
+        first.append(deferred_imported())
+
+
+build_manager(config).scrape_jobs({}, on_jobs_batch=on_jobs_batch)
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_message_seconds": first[0] - started,
+    "import_budget": startup.IMPORT_BUDGET_SECONDS,
+    "first_message_budget": startup.FIRST_MESSAGE_BUDGET_SECONDS,
+    "deferred_imported": imported_by_entry_point,
+    "deferred_imported_by_first_batch": first[1],
+}))
+"""
+
+
+_PROBES: Dict[int, Dict[str, Any]] = {}
+"""Probe results by corpus size, shared by the tests of one session."""
+
+
+class TestStartupBudget:
+    """Verify the entry point starts quickly and defers heavy dependencies.
+
+    Deferred imports are checked on every run. The wall-clock budgets depend on
+    the machine and its load, so they only run when opted in with
+    ``RUN_TIMING_TESTS=1``.
+    """
+
+    def _probe(self, packages_dir: Path, corpus_size: int) -> Dict[str, Any]:
+        """Run the startup probe in a fresh interpreter and return its measurements."""
+        if corpus_size in _PROBES:
+            return _PROBES[corpus_size]
+        source_dir = packages_dir / "scrapper-service" / "src"
+        # Deferred modules imported by the interpreter before the probe starts
+        # (e.g. by a sitecustomize) are not the entry point's doing.
+        preloaded = subprocess.run(
+            [sys.executable, "-c", "import sys; print(' '.join(sys.modules))"],
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE, str(corpus_size), *preloaded],
+            capture_output=True,
+            text=True,
+            cwd=source_dir,
+        )
+        if result.returncode != 0 and "ModuleNotFoundError" in result.stderr:
+            pytest.skip(
+                "scrapper-service dependencies are not installed:\n"
+                f"{result.stderr.strip().splitlines()[-1]}"
+            )
+        assert result.returncode == 0, f"Startup probe failed:\n{result.stderr}"
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        _PROBES[corpus_size] = probe
+        return probe
+
+    @pytest.mark.parametrize("corpus_size", [0, 100_000], ids=["canonical", "corpus-100k"])
+    def test_deferred_modules_not_imported(self, packages_dir: Path, corpus_size: int) -> None:
+        """Importing the entry point leaves deferred modules unloaded.
+
+        Serving the first batch then loads only `faker`, which renders the jobs.
+        """
+        probe = self._probe(packages_dir, corpus_size)
+
+        assert not probe["deferred_imported"], (
+            f"Importing the entry point imported {probe['deferred_imported']}; "
+            "import them where they are first used instead."
+        )
+        scrape_imported = set(probe["deferred_imported_by_first_batch"]) - {"faker"}
+        assert not scrape_imported, (
+            f"Serving the first batch imported {sorted(scrape_imported)}; "
+            "keep them off the scrape path."
+        )
+
+    @pytest.mark.timing
+    @pytest.mark.parametrize("corpus_size", [0, 100_000], ids=["canonical", "corpus-100k"])
+    def test_startup_within_budget(self, packages_dir: Path, corpus_size: int) -> None:
+        """Import and first message stay within their wall-clock budgets."""
+        probe = self._probe(packages_dir, corpus_size)
+
+        assert probe["import_seconds"] <= probe["import_budget"], (
+            f"Importing scrapper_service.__main__ took {probe['import_seconds']:.3f}s "
+            f"(budget {probe['import_budget']}s). "
+            "Run 'python -X importtime -m scrapper_service --check' to find the cost."
+        )
+        assert probe["first_message_seconds"] <= probe["first_message_budget"], (
+            f"First batch arrived after {probe['first_message_seconds']:.3f}s "
+            f"(budget {probe['first_message_budget']}s)."
+        )